@@ -0,0 +1,214 @@
+from entities.entity import Entity, EntityType
+from simulation import EldoriaSimulation
+from world.events import EventType
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import itertools
+import math
+
+# The reference engine: plain dense grid, every step simulated one by one
+REFERENCE_PARAMS = {'backend': 'dense', 'fast_forward': False, 'chunk_sleeping': False}
+
+FUZZ_SIZES = ((12, 12), (20, 16), (33, 9))
+FUZZ_DENSITIES = ((0.05, 0.1), (0.15, 0.25), (0.3, 0.4))
+
+State = Dict[Tuple[Any, ...], Dict[str, Any]]
+
+
+def _hunter_state(hunter) -> Dict[str, Any]:
+    return {
+        'position': hunter.position,
+        'skill': hunter.skill.name,
+        'stamina': hunter.stamina,
+        'resting': hunter.resting,
+        'carrying': _treasure_value(hunter.carrying),
+        'target': hunter.target.position if hunter.target is not None else None,
+        'survival_steps': hunter.survival_steps,
+        'memory': tuple((category, tuple(sorted(hunter.memory[category])))
+                        for category in hunter.memory.keys()),
+    }
+
+
+def _treasure_value(treasure) -> Optional[Tuple[str, float]]:
+    if treasure is None:
+        return None
+    return (treasure.treasure_type.name, treasure.value)
+
+
+def entity_state(entity: Entity, value: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Observable state of an entity, without its (process-global) id. value
+    overrides a treasure's stored value, e.g. with its lazily decayed one.
+    """
+    if entity.type == EntityType.TREASURE:
+        return {'treasure_type': entity.treasure_type.name,
+                'value': entity.value if value is None else value}
+    if entity.type == EntityType.KNIGHT:
+        return {'energy': entity.energy, 'resting': entity.resting}
+    if entity.type == EntityType.HUNTER:
+        return _hunter_state(entity)
+    if entity.type == EntityType.HIDEOUT:
+        return {
+            'treasure_count': entity.treasure_count,
+            'type_counts': tuple(sorted((t.name, n) for t, n in entity.type_counts.items())),
+            'total_value': entity.total_value,
+            'hunters': tuple(tuple(sorted(_hunter_state(h).items())) for h in entity.hunters),
+        }
+    return {}
+
+
+def world_state(sim: EldoriaSimulation) -> State:
+    """
+    Full state of a simulation keyed by (position, entity type), plus a
+    ('world',) entry for the step counter and running flag. Sleeping chunks
+    are read as the grid reads them, without settling: treasures at their
+    lazily decayed value, left out if they would have expired.
+    """
+    grid = sim.grid
+    state: State = {('world',): {'steps': sim.steps, 'running': sim.is_running()}}
+    for entity in grid.entities:
+        value = None
+        if entity.type == EntityType.TREASURE:
+            value = grid.treasure_value(entity, entity.position)
+            if value is None:
+                continue
+        state[(entity.position, entity.type.name)] = entity_state(entity, value)
+    return state
+
+
+def _same(a, b, rel_tol: float) -> bool:
+    if a == b:
+        return True  # The common case, compared without recursing
+    if isinstance(a, float) or isinstance(b, float):
+        if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+            return math.isclose(a, b, rel_tol=rel_tol, abs_tol=rel_tol)
+        return False
+    if isinstance(a, tuple) and isinstance(b, tuple):
+        return len(a) == len(b) and all(_same(x, y, rel_tol) for x, y in zip(a, b))
+    return a == b
+
+
+def diff_states(reference: State, candidate: State, rel_tol: float = 1e-9,
+                limit: int = 10) -> List[str]:
+    """Human-readable differences between two world states, at most limit of them"""
+    differences = []
+    for key in sorted(reference.keys() | candidate.keys(), key=repr):
+        if len(differences) >= limit:
+            break
+        ref, cand = reference.get(key), candidate.get(key)
+        if ref is None:
+            differences.append(f"{key}: only in candidate {cand}")
+        elif cand is None:
+            differences.append(f"{key}: only in reference {ref}")
+        else:
+            for field in ref:
+                if not _same(ref[field], cand.get(field), rel_tol):
+                    differences.append(f"{key}.{field}: reference {ref[field]!r}, "
+                                       f"candidate {cand.get(field)!r}")
+    return differences
+
+
+class Divergence:
+    """The first compared step at which two engines disagreed"""
+
+    def __init__(self, step: int, differences: List[str], params: Optional[dict] = None):
+        self.step = step
+        self.differences = differences
+        self.params = params or {}
+
+    def __str__(self):
+        lines = [f"Diverged at step {self.step} ({len(self.differences)} differences shown)"]
+        if self.params:
+            lines.append(f"  case: {self.params}")
+        lines += [f"  {line}" for line in self.differences]
+        return "\n".join(lines)
+
+
+class _Engine:
+    """A simulation counting its fast-forward jumps, hunter moves and naps"""
+
+    def __init__(self, params: dict, seed: int):
+        self.sim = EldoriaSimulation(seed=seed, **params)
+        self.jumps = 0
+        self.hunter_moves = 0
+        self.naps = 0  # Compared steps with at least one chunk asleep
+        self.sim.grid.events.subscribe(EventType.MOVE, self._on_moves)
+
+    def _on_moves(self, events):
+        self.hunter_moves += sum(1 for event in events if event.entity.type == EntityType.HUNTER)
+
+    def advance_to(self, step: int):
+        while self.sim.steps < step:
+            if self.sim.step(max_steps=step - self.sim.steps) > 1:
+                self.jumps += 1
+        activity = self.sim.grid.activity
+        if activity is not None and activity.asleep_since:
+            self.naps += 1
+
+
+class EquivalenceHarness:
+    """
+    Runs a reference and a candidate engine side by side from the same seed
+    and compares their full world state every compare_every steps.
+
+    Candidates that fast-forward are stepped with max_steps so they always
+    land exactly on the compared steps, which means they can only jump
+    with compare_every above 1. After run(), coverage holds the candidate's
+    fast-forward jumps, hunter moves and compared steps with a chunk
+    asleep, so callers can check the comparison exercised what it was
+    meant to.
+    """
+
+    def __init__(self, seed: int, candidate: dict, reference: Optional[dict] = None,
+                 compare_every: int = 1, rel_tol: float = 1e-9, limit: int = 10):
+        self.seed = seed
+        self.candidate = candidate
+        self.reference = REFERENCE_PARAMS if reference is None else reference
+        self.compare_every = max(1, compare_every)
+        self.rel_tol = rel_tol
+        self.limit = limit
+        self.coverage = {'jumps': 0, 'hunter_moves': 0, 'naps': 0}
+
+    def run(self, steps: int) -> Optional[Divergence]:
+        """Compare up to steps steps; None if the engines never diverged"""
+        reference = _Engine(self.reference, self.seed)
+        candidate = _Engine(self.candidate, self.seed)
+        try:
+            step = 0
+            while True:
+                differences = diff_states(world_state(reference.sim), world_state(candidate.sim),
+                                          self.rel_tol, self.limit)
+                if differences:
+                    return Divergence(step, differences)
+                if step >= steps:
+                    return None
+                step = min(step + self.compare_every, steps)
+                reference.advance_to(step)
+                candidate.advance_to(step)
+        finally:
+            self.coverage = {'jumps': candidate.jumps, 'hunter_moves': candidate.hunter_moves,
+                             'naps': candidate.naps}
+
+
+def fuzz(candidate: dict, reference: Optional[dict] = None, steps: int = 50,
+         sizes: Iterable[Tuple[int, int]] = FUZZ_SIZES,
+         densities: Iterable[Tuple[float, float]] = FUZZ_DENSITIES,
+         seeds: Iterable[int] = range(3), compare_every: int = 1,
+         coverage: Optional[Dict[str, int]] = None) -> List[Divergence]:
+    """
+    Run the harness over every size x density x seed; returns the
+    divergences found. The candidates' coverage is summed into coverage.
+    """
+    failures = []
+    for (width, height), density, seed in itertools.product(sizes, densities, seeds):
+        case = {'width': width, 'height': height, 'treasure_density': density}
+        base = REFERENCE_PARAMS if reference is None else reference
+        harness = EquivalenceHarness(seed, {**candidate, **case}, {**base, **case},
+                                     compare_every=compare_every)
+        divergence = harness.run(steps)
+        if coverage is not None:
+            for name, count in harness.coverage.items():
+                coverage[name] = coverage.get(name, 0) + count
+        if divergence is not None:
+            divergence.params = {**case, 'seed': seed}
+            failures.append(divergence)
+    return failures
@@ -0,0 +1,123 @@
+from collections import deque
+from entities.entity import EntityType
+from entities.hunter import MOVE_STAMINA_COST
+from entities.knight import DETAIN_STAMINA_COST, CHALLENGE_STAMINA_COST
+from world.events import Event, EventType
+from typing import Dict, List, Optional
+import math
+
+import numpy as np
+
+LAYERS = ('visits', 'interactions', 'pickups', 'stamina')
+
+# Rescale the decayed accumulators before their scale factor (a power of
+# 1 / decay) grows past e ** _RESCALE_EXPONENT
+_RESCALE_EXPONENT = 200.0
+
+
+class HeatmapRecorder:
+    """
+    Per-cell accumulators of movement, knight interactions, treasure pickups
+    and hunter stamina spent, fed from the grid's event bus.
+
+    Each step's event batch is turned into flat cell indices and added with
+    one np.add.at per layer, so the cost follows the number of events, not
+    the number of entities or cells. With decay < 1 older activity fades
+    geometrically; the decay is applied lazily through a shared scale factor
+    instead of touching every cell each step. Alternatively window keeps
+    only the last window steps by subtracting each step's contribution when
+    it falls out.
+    """
+
+    def __init__(self, grid, decay: float = 1.0, window: int = 0):
+        if not 0 < decay <= 1:
+            raise ValueError("decay must be in (0, 1]")
+        if decay < 1 and window:
+            raise ValueError("Use either decay or window, not both")
+
+        self.grid = grid
+        self.decay = decay
+        self.window = window
+        self.cells = grid.width * grid.height
+        self.layers = {name: np.zeros(self.cells, dtype=np.float64) for name in LAYERS}
+        self._base_step = 0  # Stored values are in units of decay ** base_step
+        self._history = deque()  # (step, layer, indices, weights) while windowing
+
+        grid.events.subscribe(EventType.MOVE, self._on_moves)
+        grid.events.subscribe([EventType.DETAIN, EventType.CHALLENGE], self._on_interactions)
+        grid.events.subscribe(EventType.PICKUP, self._on_pickups)
+
+    def close(self):
+        """Stop listening to the grid"""
+        self.grid.events.unsubscribe(EventType.MOVE, self._on_moves)
+        self.grid.events.unsubscribe([EventType.DETAIN, EventType.CHALLENGE], self._on_interactions)
+        self.grid.events.unsubscribe(EventType.PICKUP, self._on_pickups)
+
+    def _indices(self, events: List[Event]) -> np.ndarray:
+        width = self.grid.width
+        return np.fromiter((e.position[1] * width + e.position[0] for e in events),
+                           dtype=np.int64, count=len(events))
+
+    def _add(self, name: str, step: int, indices: np.ndarray, weights: Optional[np.ndarray] = None):
+        if weights is None:
+            weights = np.ones(len(indices))
+        if self.window:
+            self._history.append((step, name, indices, weights))
+            self._evict(step)
+        elif self.decay < 1:
+            if (step - self._base_step) * -math.log(self.decay) > _RESCALE_EXPONENT:
+                self._rescale(step)
+            weights = weights * self.decay ** (self._base_step - step)
+        np.add.at(self.layers[name], indices, weights)
+
+    def _rescale(self, step: int):
+        factor = self.decay ** (step - self._base_step)
+        for layer in self.layers.values():
+            layer *= factor
+        self._base_step = step
+
+    def _evict(self, now: int):
+        while self._history and self._history[0][0] < now - self.window:
+            _, name, indices, weights = self._history.popleft()
+            np.subtract.at(self.layers[name], indices, weights)
+
+    def _on_moves(self, events: List[Event]):
+        step = events[0].step
+        indices = self._indices(events)
+        self._add('visits', step, indices)
+        hunter_moves = [e for e in events if e.entity.type == EntityType.HUNTER]
+        if hunter_moves:
+            self._add('stamina', step, self._indices(hunter_moves),
+                      np.full(len(hunter_moves), float(MOVE_STAMINA_COST)))
+
+    def _on_interactions(self, events: List[Event]):
+        step = events[0].step
+        indices = self._indices(events)
+        self._add('interactions', step, indices)
+        costs = np.fromiter((DETAIN_STAMINA_COST if e.type == EventType.DETAIN else CHALLENGE_STAMINA_COST
+                             for e in events), dtype=np.float64, count=len(events))
+        self._add('stamina', step, indices, costs)
+
+    def _on_pickups(self, events: List[Event]):
+        self._add('pickups', events[0].step, self._indices(events))
+
+    def layer(self, name: str) -> np.ndarray:
+        """A layer as a (height, width) array, with decay or windowing applied up to now"""
+        now = self.grid.time
+        values = self.layers[name]
+        if self.window:
+            self._evict(now)
+            values = values.copy()
+        elif self.decay < 1:
+            values = values * self.decay ** (now - self._base_step)
+        else:
+            values = values.copy()
+        # Windowed subtraction can leave tiny negative rounding residue
+        np.maximum(values, 0, out=values)
+        return values.reshape(self.grid.height, self.grid.width)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {name: self.layer(name) for name in LAYERS}
+
+    def save(self, path: str):
+        np.savez(path, **self.arrays())
@@ -0,0 +1,151 @@
+from entities.entity import EntityType
+from entities.treasure import TreasureType
+from utils.helpers import enum_members
+from typing import Dict, List
+import glob
+import os
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional, NPZ is always available
+    pa = None
+    pq = None
+
+STAMINA_PERCENTILES = (10, 50, 90)
+
+
+def metric_columns() -> List[str]:
+    columns = ['step', 'hunters', 'active_hunters', 'knights', 'treasures',
+               'collected_treasures', 'hideouts', 'stamina_mean', 'stamina_min', 'stamina_max']
+    columns += [f'stamina_p{p}' for p in STAMINA_PERCENTILES]
+    columns += [f'value_{t.name.lower()}' for t in enum_members(TreasureType)]
+    return columns
+
+
+class MetricsRecorder:
+    """
+    Per-step metrics of a simulation stored column-wise.
+
+    Each sample goes into preallocated numpy column buffers of chunk_size
+    rows, and full buffers are written out as one file per chunk (Parquet if
+    pyarrow is installed and requested, NPZ otherwise), so memory stays flat
+    however long the run is. Only every Nth step is sampled; with
+    max_rows set the stride doubles each time that many rows have been
+    recorded, which keeps million-step runs small enough to load quickly.
+    Samples come from the grid's running counters and value totals plus
+    its hunter index, so recording never scans the treasures or wakes
+    sleeping chunks. Chunk files left in path by an earlier recording are
+    removed.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 4096, every: int = 1,
+                 max_rows: int = 0, file_format: str = 'npz'):
+        if file_format not in ('npz', 'parquet'):
+            raise ValueError(f"Unknown metrics format: {file_format}")
+        if file_format == 'parquet' and pq is None:
+            raise ValueError("Parquet output needs pyarrow")
+
+        os.makedirs(path, exist_ok=True)
+        for filename in glob.glob(os.path.join(path, "metrics_*")):
+            os.remove(filename)
+        self.path = path
+        self.chunk_size = chunk_size
+        self.every = max(1, every)
+        self.max_rows = max_rows
+        self.file_format = file_format
+        self.columns = metric_columns()
+        self.buffers = {name: np.empty(chunk_size, dtype=np.float64) for name in self.columns}
+        self.rows = 0  # Rows in the current buffers
+        self.total_rows = 0
+        self.chunks_written = 0
+        self.last_step = None
+
+    def record(self, sim) -> bool:
+        """Sample the simulation if its step is due; returns whether it was"""
+        if self.last_step is not None and sim.steps - self.last_step < self.every:
+            return False
+
+        row = self._sample(sim)
+        for name, value in row.items():
+            self.buffers[name][self.rows] = value
+        self.rows += 1
+        self.total_rows += 1
+        self.last_step = sim.steps
+
+        if self.max_rows and self.total_rows % self.max_rows == 0:
+            self.every *= 2
+        if self.rows == self.chunk_size:
+            self.flush()
+        return True
+
+    def _sample(self, sim) -> Dict[str, float]:
+        grid = sim.grid
+        counts = grid.type_counts
+        row = {
+            'step': sim.steps,
+            'hunters': counts[EntityType.HUNTER],
+            'active_hunters': grid.active_hunters,
+            'knights': counts[EntityType.KNIGHT],
+            'treasures': counts[EntityType.TREASURE],
+            'hideouts': counts[EntityType.HIDEOUT],
+            'collected_treasures': sim.collected_treasures(),
+        }
+        if grid.hunters:
+            levels = np.fromiter((h.stamina for h in grid.hunters.values()),
+                                 dtype=np.float64, count=len(grid.hunters))
+            row['stamina_mean'] = levels.mean()
+            row['stamina_min'] = levels.min()
+            row['stamina_max'] = levels.max()
+            for p, value in zip(STAMINA_PERCENTILES, np.percentile(levels, STAMINA_PERCENTILES)):
+                row[f'stamina_p{p}'] = value
+        else:
+            for name in ['stamina_mean', 'stamina_min', 'stamina_max']:
+                row[name] = np.nan
+            for p in STAMINA_PERCENTILES:
+                row[f'stamina_p{p}'] = np.nan
+        for treasure_type, total in grid.treasure_values.totals().items():
+            row[f'value_{treasure_type.name.lower()}'] = total
+        return row
+
+    def flush(self):
+        """Write the buffered rows out as the next chunk file"""
+        if not self.rows:
+            return
+        data = {name: buffer[:self.rows] for name, buffer in self.buffers.items()}
+        base = os.path.join(self.path, f"metrics_{self.chunks_written:05d}")
+        if self.file_format == 'parquet':
+            pq.write_table(pa.table(data), base + ".parquet")
+        else:
+            np.savez(base + ".npz", **data)
+        self.chunks_written += 1
+        self.rows = 0
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_metrics(path: str) -> Dict[str, np.ndarray]:
+    """Concatenate every chunk written by a MetricsRecorder into whole columns"""
+    parts: Dict[str, List[np.ndarray]] = {name: [] for name in metric_columns()}
+    for filename in sorted(glob.glob(os.path.join(path, "metrics_*"))):
+        if filename.endswith(".npz"):
+            with np.load(filename) as chunk:
+                for name in parts:
+                    parts[name].append(chunk[name])
+        elif filename.endswith(".parquet") and pq is not None:
+            table = pq.read_table(filename)
+            for name in parts:
+                parts[name].append(table.column(name).to_numpy())
+    return {
+        name: np.concatenate(chunks) if chunks else np.empty(0)
+        for name, chunks in parts.items()
+    }
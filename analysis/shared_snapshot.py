@@ -0,0 +1,287 @@
+from entities.entity import EntityType
+from entities.treasure import DECAY, MIN_VALUE
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional, Tuple
+import time
+
+import numpy as np
+
+FORMAT_VERSION = 1
+MAGIC = 0x454C4453  # "ELDS"
+
+# Header slots (int64): magic, version, sequence, step, width, height, capacity,
+# one row count per entity type, overflow flag
+_SEQUENCE = 2
+_STEP = 3
+_COUNTS = 7
+_HEADER_SLOTS = _COUNTS + len(EntityType) + 1
+_OVERFLOW = _HEADER_SLOTS - 1
+
+# Per-type entity columns (name, dtype, how to read it off the entity)
+ENTITY_COLUMNS = {
+    EntityType.TREASURE: (('id', 'i4', 'id'), ('x', 'i4', None), ('y', 'i4', None),
+                          ('value', 'f8', 'value'), ('treasure_type', 'u1', 'treasure_type')),
+    EntityType.HUNTER: (('id', 'i4', 'id'), ('x', 'i4', None), ('y', 'i4', None),
+                        ('stamina', 'f8', 'stamina'), ('skill', 'u1', 'skill')),
+    EntityType.KNIGHT: (('id', 'i4', 'id'), ('x', 'i4', None), ('y', 'i4', None),
+                        ('energy', 'f8', 'energy')),
+    EntityType.HIDEOUT: (('id', 'i4', 'id'), ('x', 'i4', None), ('y', 'i4', None),
+                         ('treasure_count', 'i8', 'treasure_count')),
+}
+
+
+# Blocks created by publishers in this process
+_published = set()
+
+# Steps after which the treasure weights are rescaled, so that DECAY**steps
+# never underflows (see SnapshotPublisher._treasure_columns)
+_REBASE_STEPS = 1000
+
+
+def _layout(width: int, height: int, capacity: int) -> Tuple[Dict[Any, Tuple[int, np.dtype, tuple]], int]:
+    """Byte offset, dtype and shape of every array in the block, and the block size"""
+    layout = {}
+    offset = 0
+
+    def place(key, dtype, shape):
+        nonlocal offset
+        dtype = np.dtype(dtype)
+        offset = -(-offset // 8) * 8  # 8-byte align every array
+        layout[key] = (offset, dtype, shape)
+        offset += dtype.itemsize * int(np.prod(shape))
+
+    place('header', 'i8', (_HEADER_SLOTS,))
+    place('types', 'u1', (height, width))
+    place('ids', 'i4', (height, width))
+    for entity_type, columns in ENTITY_COLUMNS.items():
+        for name, dtype, _ in columns:
+            place((entity_type, name), dtype, (capacity,))
+    return layout, max(offset, 1)
+
+
+def _views(buffer, layout) -> Dict[Any, np.ndarray]:
+    return {key: np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+            for key, (offset, dtype, shape) in layout.items()}
+
+
+def _column_value(entity, attribute: Optional[str], name: str):
+    if attribute is None:
+        return entity.position[0] if name == 'x' else entity.position[1]
+    value = getattr(entity, attribute)
+    return value.value if hasattr(value, 'value') else value
+
+
+class SnapshotPublisher:
+    """
+    Publishes a dense grid's type/id layers and per-type entity columns into
+    one multiprocessing.shared_memory block for readers in other processes.
+
+    Each publish() is wrapped in a sequence lock: the sequence number in the
+    header is odd while the block is being rewritten and even once it is
+    consistent, so readers never need a lock or any message from the writer.
+    Layers are copied with one memcpy each; with every=N only every Nth step
+    is published. Entity rows are in row-major cell order and are found in
+    the type and id layers rather than by walking the entities. Treasures,
+    the bulk of them, keep a per-cell weight that is refreshed only where
+    the id layer changed since the last publish, and their values are that
+    weight decayed in closed form, which is also how sleeping chunks are
+    read without settling them. Entity columns hold up to capacity rows per
+    type; beyond that the rows are truncated and the overflow flag is set.
+    """
+
+    def __init__(self, grid, name: Optional[str] = None, capacity: int = 4096, every: int = 1):
+        if not hasattr(grid, 'type_layer'):
+            raise ValueError("Snapshot publishing needs a grid with type and id layers (dense backend)")
+
+        self.grid = grid
+        self.capacity = capacity
+        self.every = max(1, every)
+        self.last_step = None
+        self._layout, size = _layout(grid.width, grid.height, capacity)
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = self.shm.name
+        _published.add(self.name)
+        self._arrays = _views(self.shm.buf, self._layout)
+
+        header = self._arrays['header']
+        header[:] = 0
+        header[:_COUNTS] = (MAGIC, FORMAT_VERSION, 0, -1, grid.width, grid.height, capacity)
+        self._types = np.frombuffer(grid.type_layer, dtype=np.uint8).reshape(grid.height, grid.width)
+        self._ids = np.frombuffer(grid.id_layer, dtype=np.int32).reshape(grid.height, grid.width)
+
+        # Treasure value = weight * DECAY**(grid.time - base), kept per cell
+        self._seen_ids = np.full(grid.width * grid.height, -1, dtype=np.int32)
+        self._weights = np.zeros(grid.width * grid.height)
+        self._treasure_types = np.zeros(grid.width * grid.height, dtype=np.uint8)
+        self._base = grid.time
+
+    def publish(self, step: int) -> bool:
+        """Copy the grid into shared memory if step is due; returns whether it was"""
+        if self.last_step is not None and step - self.last_step < self.every:
+            return False
+
+        columns = {EntityType.TREASURE: self._treasure_columns()}
+        types = self._types.ravel()
+        for entity_type in ENTITY_COLUMNS:
+            if entity_type != EntityType.TREASURE:
+                columns[entity_type] = self._object_columns(
+                    entity_type, np.flatnonzero(types == entity_type.value))
+
+        header = self._arrays['header']
+        header[_SEQUENCE] += 1  # Odd: write in progress
+        try:
+            self._arrays['types'][:] = self._types
+            self._arrays['ids'][:] = self._ids
+            overflow = False
+            for entity_type, values in columns.items():
+                count = len(values['id'])
+                if count > self.capacity:
+                    count = self.capacity
+                    overflow = True
+                for name, column in values.items():
+                    self._arrays[(entity_type, name)][:count] = column[:count]
+                header[_COUNTS + entity_type.value] = count
+            header[_OVERFLOW] = overflow
+            header[_STEP] = step
+        finally:
+            header[_SEQUENCE] += 1  # Even: consistent again
+        self.last_step = step
+        return True
+
+    def _treasure_columns(self) -> Dict[str, np.ndarray]:
+        grid = self.grid
+        ids = self._ids.ravel()
+        if grid.time - self._base > _REBASE_STEPS:
+            self._weights *= DECAY ** (grid.time - self._base)
+            self._base = grid.time
+        scale = DECAY ** (grid.time - self._base)
+
+        # Only cells whose occupant changed since the last publish are read
+        # off their entities; every other treasure just decayed
+        for index in np.flatnonzero(ids != self._seen_ids).tolist():
+            y, x = divmod(index, grid.width)
+            entity = grid.get_entity((x, y))
+            if entity is not None and entity.type == EntityType.TREASURE:
+                value = grid.treasure_value(entity, (x, y))
+                self._weights[index] = 0.0 if value is None else value / scale
+                self._treasure_types[index] = entity.treasure_type.value
+        self._seen_ids[:] = ids
+
+        cells = np.flatnonzero(self._types.ravel() == EntityType.TREASURE.value)
+        values = self._weights[cells] * scale
+        # Treasures in sleeping chunks stay in the layers past their expiry
+        alive = values > MIN_VALUE
+        cells = cells[alive]
+        y, x = np.divmod(cells, grid.width)
+        return {'id': ids[cells], 'x': x, 'y': y, 'value': values[alive],
+                'treasure_type': self._treasure_types[cells]}
+
+    def _object_columns(self, entity_type: EntityType, cells: np.ndarray) -> Dict[str, np.ndarray]:
+        # Hunters, knights and hideouts are few, so they are read one by one
+        width = self.grid.width
+        entities = [self.grid.get_entity((index % width, index // width))
+                    for index in cells.tolist()]
+        return {name: np.fromiter((_column_value(e, attribute, name) for e in entities),
+                                  dtype=dtype, count=len(entities))
+                for name, dtype, attribute in ENTITY_COLUMNS[entity_type]}
+
+    def close(self):
+        """Release and remove the shared block (readers keep their mapping until they close)"""
+        self._arrays = None
+        self.shm.close()
+        self.shm.unlink()
+        _published.discard(self.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SnapshotReader:
+    """
+    Read side of a SnapshotPublisher, attached by block name.
+
+    view() exposes zero-copy NumPy views of the shared arrays; read(func)
+    runs func on those views and retries, yielding to the writer between
+    attempts, until the sequence number shows no publish overlapped it or
+    timeout seconds have passed. snapshot() uses that to return one
+    consistent copy of the world.
+    """
+
+    def __init__(self, name: str):
+        self.shm = shared_memory.SharedMemory(name=name)
+        _untrack(self.shm)
+        header = np.ndarray((_HEADER_SLOTS,), dtype=np.int64, buffer=self.shm.buf)
+        if header[0] != MAGIC or header[1] != FORMAT_VERSION:
+            raise ValueError(f"{name} is not an Eldoria snapshot block")
+        self.width, self.height, self.capacity = (int(v) for v in header[4:_COUNTS])
+        layout, _ = _layout(self.width, self.height, self.capacity)
+        self._arrays = _views(self.shm.buf, layout)
+
+    @property
+    def sequence(self) -> int:
+        return int(self._arrays['header'][_SEQUENCE])
+
+    def view(self) -> Dict[str, Any]:
+        """Zero-copy views; only consistent if the sequence is even and unchanged afterwards"""
+        header = self._arrays['header']
+        view = {
+            'step': int(header[_STEP]),
+            'overflow': bool(header[_OVERFLOW]),
+            'types': self._arrays['types'],
+            'ids': self._arrays['ids'],
+        }
+        for entity_type, columns in ENTITY_COLUMNS.items():
+            count = int(header[_COUNTS + entity_type.value])
+            view[entity_type.name.lower()] = {
+                name: self._arrays[(entity_type, name)][:count] for name, _, _ in columns
+            }
+        return view
+
+    def read(self, func: Callable[[Dict[str, Any]], Any], timeout: float = 1.0) -> Any:
+        """func(view()) from a moment no publish was in progress"""
+        deadline = time.monotonic() + timeout
+        while True:
+            before = self.sequence
+            if not before % 2:  # Otherwise the writer is mid-publish
+                result = func(self.view())
+                if self.sequence == before:
+                    return result
+            if time.monotonic() > deadline:
+                raise TimeoutError("Snapshot kept changing while being read")
+            time.sleep(0)  # Give up the processor so the writer can finish
+
+    def snapshot(self) -> Dict[str, Any]:
+        """A consistent private copy of the latest published state"""
+        def copy(view):
+            return {key: ({name: column.copy() for name, column in value.items()}
+                          if isinstance(value, dict) else
+                          value.copy() if isinstance(value, np.ndarray) else value)
+                    for key, value in view.items()}
+        return self.read(copy)
+
+    def close(self):
+        self._arrays = None
+        self.shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _untrack(shm: shared_memory.SharedMemory):
+    # Before Python 3.13 attaching registers the block with this process's
+    # resource tracker, which would unlink it when the reader exits. Blocks
+    # published here (or by a parent we were forked from, which shares our
+    # tracker) are the publisher's to clean up, so leave those alone.
+    if shm.name in _published:
+        return
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except (ImportError, AttributeError, KeyError):
+        pass
@@ -0,0 +1,175 @@
+from typing import Tuple
+import json
+import os
+import zlib
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+KEYFRAME = 0
+DELTA = 1
+
+# One fixed-size record per recorded step, so the index can be memory-mapped
+INDEX_DTYPE = np.dtype([
+    ('step', '<i8'),
+    ('offset', '<u8'),
+    ('length', '<u4'),
+    ('kind', 'u1'),
+    ('keyframe', '<u8'),  # Record number of the keyframe this frame builds on
+])
+
+META_FILE = "meta.json"
+INDEX_FILE = "index.bin"
+FRAMES_FILE = "frames.bin"
+
+
+class TrajectoryWriter:
+    """
+    Records the type and id layers of a dense EldoriaGrid step by step.
+
+    A run is stored in a directory holding a zlib-compressed keyframe every
+    keyframe_interval records and, in between, compressed deltas of the
+    cells that changed (index, type, id). The step index is a flat array of
+    fixed-size records so readers can memory-map it.
+    """
+
+    def __init__(self, path: str, grid, keyframe_interval: int = 256, level: int = 1):
+        if not hasattr(grid, 'type_layer'):
+            raise ValueError("Trajectory recording needs a grid with type and id layers (dense backend)")
+
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.grid = grid
+        self.keyframe_interval = keyframe_interval
+        self.level = level
+        self.records = 0
+        self.last_keyframe = 0
+        self.last_step = None
+
+        cells = grid.width * grid.height
+        self._types = np.zeros(cells, dtype=np.uint8)
+        self._ids = np.zeros(cells, dtype=np.int32)
+
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump({
+                'version': FORMAT_VERSION,
+                'width': grid.width,
+                'height': grid.height,
+                'keyframe_interval': keyframe_interval,
+            }, f)
+        self._frames = open(os.path.join(path, FRAMES_FILE), "wb")
+        self._index = open(os.path.join(path, INDEX_FILE), "wb")
+        self._offset = 0
+
+    def record(self, step: int):
+        """Append the grid's current state as the frame for step"""
+        if self.last_step is not None and step <= self.last_step:
+            raise ValueError(f"Steps must increase (got {step} after {self.last_step})")
+
+        types = np.frombuffer(self.grid.type_layer, dtype=np.uint8)
+        ids = np.frombuffer(self.grid.id_layer, dtype=np.int32)
+
+        if self.records % self.keyframe_interval == 0:
+            kind = KEYFRAME
+            self.last_keyframe = self.records
+            self._types[:] = types
+            self._ids[:] = ids
+            payload = self._types.tobytes() + self._ids.tobytes()
+        else:
+            kind = DELTA
+            changed = np.flatnonzero((types != self._types) | (ids != self._ids)).astype(np.uint32)
+            self._types[changed] = types[changed]
+            self._ids[changed] = ids[changed]
+            payload = (np.uint32(len(changed)).tobytes() + changed.tobytes()
+                       + self._types[changed].tobytes() + self._ids[changed].tobytes())
+
+        data = zlib.compress(payload, self.level)
+        self._frames.write(data)
+
+        record = np.zeros(1, dtype=INDEX_DTYPE)
+        record[0] = (step, self._offset, len(data), kind, self.last_keyframe)
+        self._index.write(record.tobytes())
+        self._offset += len(data)
+        self.records += 1
+        self.last_step = step
+
+    def flush(self):
+        self._frames.flush()
+        self._index.flush()
+
+    def close(self):
+        self._frames.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TrajectoryReader:
+    """
+    Random access to a recorded run. Index and frame files are opened as
+    read-only numpy memmaps, so any number of processes can share their
+    pages. Seeking decodes one keyframe plus at most keyframe_interval - 1
+    deltas, independent of how long the run is.
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        if meta['version'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported trajectory format version {meta['version']}")
+
+        self.width = meta['width']
+        self.height = meta['height']
+        self.keyframe_interval = meta['keyframe_interval']
+
+        index_path = os.path.join(path, INDEX_FILE)
+        frames_path = os.path.join(path, FRAMES_FILE)
+        # Only whole records count; a writer may still be appending
+        records = os.path.getsize(index_path) // INDEX_DTYPE.itemsize
+        self.index = (np.memmap(index_path, dtype=INDEX_DTYPE, mode='r', shape=(records,))
+                      if records else np.zeros(0, dtype=INDEX_DTYPE))
+        self.frames = (np.memmap(frames_path, dtype=np.uint8, mode='r')
+                       if os.path.getsize(frames_path) else np.zeros(0, dtype=np.uint8))
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def steps(self) -> np.ndarray:
+        return self.index['step']
+
+    def _payload(self, record: int) -> bytes:
+        entry = self.index[record]
+        start = int(entry['offset'])
+        return zlib.decompress(self.frames[start:start + int(entry['length'])].tobytes())
+
+    def _record_for(self, step: int) -> int:
+        steps = self.index['step']
+        record = int(np.searchsorted(steps, step))
+        if record >= len(steps) or steps[record] != step:
+            raise KeyError(f"Step {step} was not recorded")
+        return record
+
+    def frame(self, step: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(types, ids) layers of a recorded step, each shaped (height, width)"""
+        record = self._record_for(step)
+        keyframe = int(self.index[record]['keyframe'])
+        cells = self.width * self.height
+
+        payload = self._payload(keyframe)
+        types = np.frombuffer(payload, dtype=np.uint8, count=cells).copy()
+        ids = np.frombuffer(payload, dtype=np.int32, count=cells, offset=cells).copy()
+
+        for delta in range(keyframe + 1, record + 1):
+            payload = self._payload(delta)
+            n = int(np.frombuffer(payload, dtype=np.uint32, count=1)[0])
+            changed = np.frombuffer(payload, dtype=np.uint32, count=n, offset=4)
+            types[changed] = np.frombuffer(payload, dtype=np.uint8, count=n, offset=4 + 4 * n)
+            ids[changed] = np.frombuffer(payload, dtype=np.int32, count=n, offset=4 + 5 * n)
+
+        return types.reshape(self.height, self.width), ids.reshape(self.height, self.width)
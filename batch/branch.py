@@ -0,0 +1,86 @@
+from simulation import EldoriaSimulation
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import os
+import pickle
+
+Variant = Callable[[EldoriaSimulation], None]
+
+
+def _run_branch(sim: EldoriaSimulation, variant: Optional[Variant], steps: int,
+                measure: Callable[[EldoriaSimulation], Any]) -> Any:
+    if variant is not None:
+        variant(sim)
+    target = sim.steps + steps
+    while sim.steps < target:
+        sim.step(max_steps=target - sim.steps)
+    return measure(sim)
+
+
+def _default_measure(sim: EldoriaSimulation) -> Dict[str, Any]:
+    return sim.get_stats()
+
+
+def run_branches(sim: EldoriaSimulation, variants: Sequence[Optional[Variant]], steps: int,
+                 measure: Callable[[EldoriaSimulation], Any] = _default_measure,
+                 processes: bool = True, workers: Optional[int] = None) -> List[Any]:
+    """
+    Branch len(variants) what-if runs off sim's current state. Each branch
+    applies its variant (e.g. adding knights), runs steps more steps and
+    returns measure(branch). Every branch starts from a copy of sim's random
+    generator, so differences between outcomes come from the variants alone.
+    sim itself is left untouched.
+
+    With processes=True (and os.fork available) each branch runs in a forked
+    child, which shares the parent's memory pages copy-on-write, so a branch
+    only pays for the state it changes. Results come back pickled. Otherwise
+    branches run one after another on sim.fork() copies.
+    """
+    if processes and hasattr(os, "fork"):
+        return _run_forked(sim, variants, steps, measure, workers or os.cpu_count() or 1)
+
+    return [_run_branch(sim.fork(), variant, steps, measure) for variant in variants]
+
+
+def _run_forked(sim: EldoriaSimulation, variants: Sequence[Optional[Variant]], steps: int,
+                measure: Callable[[EldoriaSimulation], Any], workers: int) -> List[Any]:
+    results: List[Any] = [None] * len(variants)
+    running = []  # (index, pid, read end)
+
+    def collect(index: int, pid: int, fd: int):
+        with os.fdopen(fd, "rb") as pipe:
+            data = pipe.read()
+        os.waitpid(pid, 0)
+        if not data:
+            raise RuntimeError(f"Branch {index} exited without a result")
+        ok, value = pickle.loads(data)
+        if not ok:
+            raise RuntimeError(f"Branch {index} failed: {value}")
+        results[index] = value
+
+    try:
+        for index, variant in enumerate(variants):
+            if len(running) >= workers:
+                collect(*running.pop(0))
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:  # Child: run the branch and report back, never return
+                os.close(read_fd)
+                try:
+                    payload = (True, _run_branch(sim, variant, steps, measure))
+                except BaseException as exc:
+                    payload = (False, repr(exc))
+                try:
+                    with os.fdopen(write_fd, "wb") as pipe:
+                        pipe.write(pickle.dumps(payload))
+                finally:
+                    os._exit(0)
+            os.close(write_fd)
+            running.append((index, pid, read_fd))
+        while running:
+            collect(*running.pop(0))
+    finally:
+        # Reap anything left behind by an error above
+        for _, pid, fd in running:
+            os.close(fd)
+            os.waitpid(pid, 0)
+    return results
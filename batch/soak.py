@@ -0,0 +1,195 @@
+from entities.entity import EntityType
+from simulation import EldoriaSimulation
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import gc
+import os
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, None where unknown"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        # Peak rather than current RSS, but still shows sustained growth
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    return None
+
+
+def structure_census(sim: EldoriaSimulation) -> Dict[str, int]:
+    """Sizes of the simulation structures that can grow over a long run"""
+    grid = sim.grid
+    census = {'entities': len(grid.entities)}
+    for entity_type in EntityType:
+        if entity_type != EntityType.EMPTY:
+            census[f'entities.{entity_type.name.lower()}'] = grid.type_counts[entity_type]
+
+    hunters = {e.id: e for e in grid.entities if e.type == EntityType.HUNTER}
+    for hideout in sim.hideouts:
+        hunters.update((h.id, h) for h in hideout.hunters)
+    census['hunters.memory_entries'] = sum(h.memory.size() for h in hunters.values())
+    census['hideouts.hunters'] = sum(len(h.hunters) for h in sim.hideouts)
+    census['hideouts.deposit_steps'] = sum(
+        len(h.deposit_steps) for h in sim.hideouts if h.deposit_steps is not None
+    )
+    census['hideouts.treasures'] = sum(
+        len(h.treasures) for h in sim.hideouts if h.treasures is not None
+    )
+    census['events.pending'] = grid.events.pending()
+    if grid.activity is not None:
+        census['activity.actors'] = len(grid.activity.actors)
+        census['activity.treasure_chunks'] = len(grid.activity.treasures)
+    return census
+
+
+def _slope(points: List[Tuple[int, float]]) -> float:
+    """Least-squares growth per step"""
+    if len(points) < 2:
+        return 0.0
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if spread == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+def _own_filtered(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+    # Leave out the soak runner's own samples and tracemalloc's bookkeeping
+    return snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ])
+
+
+class SoakSample:
+    def __init__(self, step: int, rss: Optional[int], traced: int, census: Dict[str, int]):
+        self.step = step
+        self.rss = rss
+        self.traced = traced
+        self.census = census
+
+
+class SoakReport:
+    """Outcome of a soak run: memory growth rates and what grew"""
+
+    def __init__(self, samples: List[SoakSample], warmup: int, threshold: float,
+                 top_growth: List[Tuple[str, int]]):
+        self.samples = samples
+        steady = [s for s in samples if s.step >= warmup]
+        self.traced_growth = _slope([(s.step, s.traced) for s in steady])
+        rss_points = [(s.step, s.rss) for s in steady if s.rss is not None]
+        self.rss_growth = _slope(rss_points) if rss_points else None
+        self.threshold = threshold
+        self.top_growth = top_growth  # (source file, bytes) from tracemalloc
+
+        self.census_growth: Dict[str, float] = {}
+        if len(steady) >= 2:
+            first, last = steady[0], steady[-1]
+            for name, value in last.census.items():
+                delta = value - first.census.get(name, 0)
+                if delta:
+                    self.census_growth[name] = delta / (last.step - first.step)
+
+    @property
+    def passed(self) -> bool:
+        return self.traced_growth <= self.threshold
+
+    def format(self) -> str:
+        verdict = "PASSED" if self.passed else "FAILED"
+        lines = [f"Soak {verdict}: {self.traced_growth:.2f} traced bytes/step "
+                 f"(threshold {self.threshold:g})"]
+        if self.rss_growth is not None:
+            lines.append(f"  RSS growth: {self.rss_growth:.2f} bytes/step")
+        if self.census_growth:
+            lines.append("  Growing structures (items/step):")
+            for name, rate in sorted(self.census_growth.items(), key=lambda item: -abs(item[1])):
+                lines.append(f"    {name}: {rate:+.4f}")
+        if self.top_growth:
+            lines.append("  Top allocation growth by source:")
+            for source, size in self.top_growth:
+                lines.append(f"    {source}: {size:+d} bytes")
+        return "\n".join(lines)
+
+
+class SoakFailure(Exception):
+    def __init__(self, report: SoakReport):
+        super().__init__(report.format())
+        self.report = report
+
+
+class SoakRun:
+    """
+    Runs one simulation for a long time while watching its memory.
+
+    Every sample_every steps the process RSS, the tracemalloc traced size and
+    a census of the growable structures (entities, hunter memories, hideout
+    histories, pending events) are recorded. After warmup steps, growth is
+    the least-squares slope of traced memory per step; if it exceeds
+    max_growth_per_step the run fails with a report naming the structures
+    and source files that grew. setup(sim) may attach instrumentation (event
+    subscribers, recorders) so it is soaked along with the world.
+    """
+
+    def __init__(self, params: Optional[Dict[str, Any]] = None, seed: int = 0,
+                 steps: int = 100000, sample_every: int = 1000, warmup: int = 1000,
+                 max_growth_per_step: float = 16.0, top: int = 10,
+                 setup: Optional[Callable[[EldoriaSimulation], None]] = None):
+        self.params = params or {}
+        self.seed = seed
+        self.steps = steps
+        self.sample_every = max(1, sample_every)
+        self.warmup = warmup
+        self.max_growth_per_step = max_growth_per_step
+        self.top = top
+        self.setup = setup
+
+    def _sample(self, sim: EldoriaSimulation) -> SoakSample:
+        gc.collect()
+        census = structure_census(sim)
+        return SoakSample(sim.steps, current_rss(), tracemalloc.get_traced_memory()[0], census)
+
+    def run(self, fail: bool = True) -> SoakReport:
+        """Soak the simulation; raises SoakFailure (unless fail=False) on excess growth"""
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            sim = EldoriaSimulation(seed=self.seed, **self.params)
+            if self.setup is not None:
+                self.setup(sim)
+
+            samples = [self._sample(sim)]
+            baseline = tracemalloc.take_snapshot() if self.warmup <= 0 else None
+            while sim.steps < self.steps:
+                due = min(self.steps, (sim.steps // self.sample_every + 1) * self.sample_every)
+                while sim.steps < due:
+                    sim.step(max_steps=due - sim.steps)
+                samples.append(self._sample(sim))
+                if baseline is None and sim.steps >= self.warmup:
+                    baseline = tracemalloc.take_snapshot()
+
+            top_growth = []
+            if baseline is not None:
+                stats = _own_filtered(tracemalloc.take_snapshot()).compare_to(
+                    _own_filtered(baseline), 'filename')
+                top_growth = [(stat.traceback[0].filename, stat.size_diff)
+                              for stat in stats[:self.top] if stat.size_diff > 0]
+        finally:
+            if started:
+                tracemalloc.stop()
+
+        report = SoakReport(samples, self.warmup, self.max_growth_per_step, top_growth)
+        if fail and not report.passed:
+            raise SoakFailure(report)
+        return report
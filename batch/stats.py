@@ -0,0 +1,45 @@
+from math import sqrt
+
+
+class RunningStats:
+    """Streaming mean and variance (Welford), without keeping samples"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 with fewer than two samples)"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return sqrt(self.variance)
+
+    def confidence_halfwidth(self, z: float = 1.96) -> float:
+        """Half-width of the normal-approximation confidence interval of the mean"""
+        if self.count < 2:
+            return float('inf')
+        return z * self.stddev / sqrt(self.count)
+
+    def as_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'stddev': self.stddev,
+            'min': self.min,
+            'max': self.max,
+            'ci_halfwidth': self.confidence_halfwidth(),
+        }
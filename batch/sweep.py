@@ -0,0 +1,153 @@
+from batch.stats import RunningStats
+from simulation import EldoriaSimulation
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import product
+import os
+from typing import Dict, List, Any, Optional, Sequence
+
+DEFAULT_METRICS = ('collected_treasures', 'steps')
+
+
+def run_simulation(params: Dict[str, Any], seed: int, max_steps: int) -> Dict[str, float]:
+    """Run one seeded simulation to termination (or max_steps) and return its outcome"""
+    sim = EldoriaSimulation(seed=seed, **params)
+    while sim.is_running() and sim.steps < max_steps:
+        sim.step(max_steps - sim.steps)
+    return sim.get_stats()
+
+
+class SweepResult:
+    """Streaming aggregate of all runs of one parameter configuration"""
+
+    def __init__(self, params: Dict[str, Any], metrics: Sequence[str]):
+        self.params = params
+        self.stats = {metric: RunningStats() for metric in metrics}
+        self.runs = 0
+        self.converged = False
+
+    def add(self, outcome: Dict[str, float]):
+        self.runs += 1
+        for metric, stats in self.stats.items():
+            stats.add(outcome[metric])
+
+    def is_precise(self, rel_tolerance: float, abs_tolerance: float) -> bool:
+        """True once every metric's confidence interval is tight enough"""
+        for stats in self.stats.values():
+            allowed = max(rel_tolerance * abs(stats.mean), abs_tolerance)
+            if stats.confidence_halfwidth() > allowed:
+                return False
+        return True
+
+    def summary(self) -> dict:
+        return {
+            'params': self.params,
+            'runs': self.runs,
+            'converged': self.converged,
+            'metrics': {metric: stats.as_dict() for metric, stats in self.stats.items()},
+        }
+
+
+class ParameterSweep:
+    """
+    Runs seeded simulations over the cartesian product of a parameter grid.
+
+    param_grid maps EldoriaSimulation keyword arguments to the values to try,
+    e.g. {'hideout_count': [(3, 5), (6, 8)], 'treasure_density': [(0.1, 0.1)]}.
+    Outcomes are folded into running mean/variance as they arrive, nothing
+    per run is retained, and a configuration stops being sampled once it has
+    min_runs runs and the confidence interval of every metric is within
+    rel_tolerance of its mean (or abs_tolerance), or after max_runs.
+    With workers=0 runs execute in-process, one after another. In parallel,
+    outcomes are folded in run order as soon as every earlier run of the
+    configuration is in, so both modes see the same prefix of runs and give
+    identical results.
+    """
+
+    def __init__(self, param_grid: Dict[str, Sequence[Any]],
+                 base_params: Optional[Dict[str, Any]] = None,
+                 metrics: Sequence[str] = DEFAULT_METRICS,
+                 max_steps: int = 1000, min_runs: int = 5, max_runs: int = 100,
+                 rel_tolerance: float = 0.05, abs_tolerance: float = 0.5,
+                 workers: Optional[int] = None, base_seed: int = 0):
+        self.param_grid = param_grid
+        self.base_params = base_params or {}
+        self.metrics = tuple(metrics)
+        self.max_steps = max_steps
+        self.min_runs = min_runs
+        self.max_runs = max_runs
+        self.rel_tolerance = rel_tolerance
+        self.abs_tolerance = abs_tolerance
+        self.workers = workers
+        self.base_seed = base_seed
+
+    def configurations(self) -> List[Dict[str, Any]]:
+        names = list(self.param_grid)
+        return [
+            dict(self.base_params, **dict(zip(names, values)))
+            for values in product(*(self.param_grid[name] for name in names))
+        ]
+
+    def _seed(self, config_index: int, run_index: int) -> int:
+        # Distinct and reproducible per (configuration, run)
+        return self.base_seed + config_index * self.max_runs + run_index
+
+    def _done(self, result: SweepResult) -> bool:
+        if result.runs >= self.min_runs and result.is_precise(self.rel_tolerance, self.abs_tolerance):
+            result.converged = True
+            return True
+        return result.runs >= self.max_runs
+
+    def run(self) -> List[SweepResult]:
+        results = [SweepResult(params, self.metrics) for params in self.configurations()]
+        if self.workers == 0:
+            self._run_inline(results)
+        else:
+            self._run_parallel(results)
+        return results
+
+    def _run_inline(self, results: List[SweepResult]):
+        for index, result in enumerate(results):
+            while not self._done(result):
+                outcome = run_simulation(result.params, self._seed(index, result.runs), self.max_steps)
+                result.add(outcome)
+
+    def _run_parallel(self, results: List[SweepResult]):
+        launched = [0] * len(results)
+        pending = {}
+        # Finished outcomes by run index, waiting for the runs before them
+        arrived: List[Dict[int, Dict[str, float]]] = [{} for _ in results]
+        workers = self.workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            slots = workers * 2
+
+            def top_up():
+                # Round-robin over configurations that still need samples,
+                # never running ahead of what early stopping could use
+                progress = True
+                while len(pending) < slots and progress:
+                    progress = False
+                    for index, result in enumerate(results):
+                        if len(pending) >= slots:
+                            break
+                        if self._done(result) or launched[index] >= self.max_runs:
+                            continue
+                        if launched[index] - result.runs >= max(1, self.min_runs):
+                            continue
+                        future = pool.submit(run_simulation, result.params,
+                                             self._seed(index, launched[index]), self.max_steps)
+                        pending[future] = (index, launched[index])
+                        launched[index] += 1
+                        progress = True
+
+            top_up()
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index, run = pending.pop(future)
+                    arrived[index][run] = future.result()
+                    result = results[index]
+                    # Fold in run order and stop exactly where inline runs would;
+                    # later runs that were already launched are not used
+                    while not self._done(result) and result.runs in arrived[index]:
+                        result.add(arrived[index].pop(result.runs))
+                top_up()
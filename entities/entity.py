@@ -1,5 +1,6 @@
 from enum import Enum
 from typing import Tuple, Optional
+from itertools import count
 
 
 class EntityType(Enum):
@@ -11,7 +12,10 @@ class EntityType(Enum):
 
 
 class Entity:
+    _ids = count(1)  # 0 marks an empty cell in id layers
+
     def __init__(self, entity_type: EntityType, position: Tuple[int, int]):
+        self.id = next(Entity._ids)
         self.type = entity_type
         self.position = position
         self.symbol = " "
@@ -20,4 +24,24 @@ class Entity:
         return self.symbol
 
     def update(self, grid):
-        pass
\ No newline at end of file
+        pass
+
+    def idle_steps(self, grid) -> float:
+        """
+        Number of upcoming steps whose outcome for this entity is known in
+        closed form (no movement, no randomness, no mode change before the
+        last of them). 0 means the entity must be stepped normally.
+        """
+        return 0
+
+    def skip_steps(self, steps: int, grid) -> bool:
+        """
+        Apply steps idle steps at once (steps <= idle_steps(grid)).
+        Returns False if the entity should be removed, like update().
+        Subclasses override this with a closed form; the default replays
+        update() step by step.
+        """
+        for _ in range(steps):
+            if not self.update(grid):
+                return False
+        return True
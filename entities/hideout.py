@@ -1,17 +1,35 @@
 from entities.entity import Entity, EntityType
-from entities.treasure import Treasure
+from entities.treasure import Treasure, TreasureType
 from entities.hunter import TreasureHunter, HunterSkill
-from typing import List, Tuple, Dict
-import random
+from entities.memory import HunterMemory
+from utils.helpers import enum_members, pairwise_wrapped_distances, get_offset_stencil
+from typing import List, Tuple, Dict, Optional
+from world.events import EventType
+from array import array
+
+HISTORY_MODES = (None, 'timestamps', 'full')
 
 
 class Hideout(Entity):
-    def __init__(self, position: Tuple[int, int]):
+    def __init__(self, position: Tuple[int, int], history: Optional[str] = None):
         super().__init__(EntityType.HIDEOUT, position)
+        if history not in HISTORY_MODES:
+            raise ValueError(f"Unknown history mode: {history}")
+
         self.symbol = "H"
         self.hunters: List[TreasureHunter] = []
-        self.treasures: List[Treasure] = []
         self.capacity = 5
+        self.assign_targets = True  # Split known treasures among members each step
+
+        # Deposits are kept as running aggregates per treasure type. With
+        # history='timestamps' the deposit steps are also kept in a compact
+        # array, and history='full' additionally retains every Treasure.
+        self.history = history
+        self.treasure_count = 0
+        self.type_counts: Dict[TreasureType, int] = {t: 0 for t in enum_members(TreasureType)}
+        self.type_values: Dict[TreasureType, float] = {t: 0.0 for t in enum_members(TreasureType)}
+        self.deposit_steps: Optional[array] = array('q') if history else None
+        self.treasures: Optional[List[Treasure]] = [] if history == 'full' else None
 
     def add_hunter(self, hunter: TreasureHunter):
         if len(self.hunters) < self.capacity:
@@ -25,39 +43,135 @@ class Hideout(Entity):
             return True
         return False
 
-    def add_treasure(self, treasure: Treasure):
-        self.treasures.append(treasure)
+    def add_treasure(self, treasure: Treasure, step: int = 0):
+        self.treasure_count += 1
+        self.type_counts[treasure.treasure_type] += 1
+        # Value as deposited, i.e. after decay on the way here
+        self.type_values[treasure.treasure_type] += treasure.value
+
+        if self.deposit_steps is not None:
+            self.deposit_steps.append(step)
+        if self.treasures is not None:
+            self.treasures.append(treasure)
+
+    def spawn_position(self, grid) -> Optional[Tuple[int, int]]:
+        """A free cell beside the hideout for a new member, None if boxed in"""
+        x, y = self.position
+        for dx, dy in get_offset_stencil(1, "manhattan"):
+            position = ((x + dx) % grid.width, (y + dy) % grid.height)
+            if grid.is_empty(position):
+                return position
+        return None
+
+    @property
+    def total_value(self) -> float:
+        return sum(self.type_values.values())
 
     def update(self, grid):
         # Try to recruit new hunter if there's space and diverse skills
         if self.capacity > len(self.hunters) >= 2:
-            skills = {hunter.skill for hunter in self.hunters}
-            if len(skills) >= 2 and random.random() < 0.2:
+            present = {hunter.skill for hunter in self.hunters}
+            # Declaration order keeps the draw reproducible (set order is not)
+            skills = [skill for skill in enum_members(HunterSkill) if skill in present]
+            if len(skills) >= 2 and grid.rng.random() < 0.2:
                 # Recruit new hunter
-                new_skill = random.choice(list(skills))
-                new_hunter = TreasureHunter(self.position, new_skill)
-                if grid.add_entity(new_hunter, self.position):
+                new_skill = grid.rng.choice(skills)
+                template = self.hunters[0].memory
+                spawn = self.spawn_position(grid)
+                new_hunter = TreasureHunter(spawn or self.position, new_skill,
+                                            template.capacity, template.ttl)
+                if spawn is not None and grid.add_entity(new_hunter, spawn):
                     self.hunters.append(new_hunter)
+                    if grid.events.active:
+                        grid.events.emit(EventType.RECRUIT, grid.time, self, self.position, new_hunter)
+
+        # Share information among hunters, then split the known treasures
+        self._share_information()
+        if self.assign_targets:
+            self._assign_targets(grid)
+        return True
+
+    def _can_recruit(self) -> bool:
+        if not self.capacity > len(self.hunters) >= 2:
+            return False
+        return len({hunter.skill for hunter in self.hunters}) >= 2
 
-        # Share information among hunters
+    def idle_steps(self, grid) -> float:
+        # Recruitment draws a random number every step it is possible
+        return 0 if self._can_recruit() else float('inf')
+
+    def skip_steps(self, steps: int, grid) -> bool:
+        # Sharing is idempotent while nobody observes anything new
         self._share_information()
+        return True
 
     def _share_information(self):
         if len(self.hunters) < 2:
             return
 
-        # Combine all memories
-        combined_treasures = {}
-        combined_hideouts = {}
-        combined_knights = {}
+        # Combine all memories, keeping the freshest sighting per position
+        template = self.hunters[0].memory
+        combined = HunterMemory(template.capacity, template.ttl)
+        combined.now = max(hunter.memory.now for hunter in self.hunters)
 
         for hunter in self.hunters:
-            combined_treasures.update(hunter.memory['treasures'])
-            combined_hideouts.update(hunter.memory['hideouts'])
-            combined_knights.update(hunter.memory['knights'])
+            combined.merge(hunter.memory)
 
         # Share with all hunters
         for hunter in self.hunters:
-            hunter.memory['treasures'].update(combined_treasures)
-            hunter.memory['hideouts'].update(combined_hideouts)
-            hunter.memory['knights'].update(combined_knights)
\ No newline at end of file
+            hunter.memory.merge(combined)
+
+    def _assign_targets(self, grid):
+        """
+        Give every searching hunter a different known treasure. After sharing
+        all members know the same treasures, so left alone they would all
+        chase the most valuable one. Hunter/treasure pairs are taken greedily
+        by value per unit of wrapped distance. Hunters left over (more
+        hunters than treasures) choose for themselves among the treasures
+        nobody was sent after.
+        """
+        searching = []
+        for hunter in self.hunters:
+            hunter.target = None
+            hunter.claimed = frozenset()
+            if hunter.is_searching():
+                searching.append(hunter)
+        if not searching:
+            return
+
+        # Treasures still where they were seen, in a stable order
+        known: Dict[Tuple[int, int], Tuple[Treasure, float]] = {}
+        for hunter in searching:
+            for pos, treasure in hunter.memory['treasures'].items():
+                if pos not in known:
+                    value = grid.treasure_value(treasure, pos)
+                    if value is not None:
+                        known[pos] = (treasure, value)
+        if not known:
+            return
+
+        treasures = [treasure for treasure, _ in known.values()]
+        values = [value for _, value in known.values()]
+        distances = pairwise_wrapped_distances([hunter.position for hunter in searching],
+                                               list(known), grid.width, grid.height)
+        pairs = sorted(
+            (-value / (1.0 + float(distance)), i, j)
+            for i, row in enumerate(distances)
+            for j, (value, distance) in enumerate(zip(values, row))
+        )
+
+        remaining = min(len(searching), len(treasures))
+        assigned, taken = set(), set()
+        for _, i, j in pairs:
+            if i in assigned or j in taken:
+                continue
+            searching[i].target = treasures[j]
+            assigned.add(i)
+            taken.add(j)
+            remaining -= 1
+            if not remaining:
+                break
+
+        claimed = frozenset(treasures[j].position for j in taken)
+        for hunter in searching:
+            hunter.claimed = claimed
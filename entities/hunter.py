@@ -1,9 +1,14 @@
 from enum import Enum
 from entities.entity import Entity, EntityType
 from entities.treasure import Treasure
-from typing import Tuple, List, Dict, Optional
-import random
-from math import sqrt
+from typing import Tuple, List, Dict, Optional, FrozenSet
+from entities.memory import HunterMemory
+from utils.helpers import get_offset_stencil, nearest_index
+from world.events import EventType
+from math import ceil
+
+# Stamina spent per cell moved
+MOVE_STAMINA_COST = 2
 
 
 class HunterSkill(Enum):
@@ -13,16 +18,17 @@ class HunterSkill(Enum):
 
 
 class TreasureHunter(Entity):
-    def __init__(self, position: Tuple[int, int], skill: HunterSkill):
+    def __init__(self, position: Tuple[int, int], skill: HunterSkill,
+                 memory_capacity: int = 64, memory_ttl: int = 50):
         super().__init__(EntityType.HUNTER, position)
         self.skill = skill
         self.stamina = 100.0  # Percentage
         self.carrying = None  # Currently carried treasure
-        self.memory = {
-            'treasures': {},  # position: treasure
-            'hideouts': {},  # position: hideout
-            'knights': {}  # position: last seen
-        }
+        self.target: Optional[Treasure] = None  # Assigned by the hideout, if any
+        # Positions of treasures the hideout assigned to teammates
+        self.claimed: FrozenSet[Tuple[int, int]] = frozenset()
+        # treasures / hideouts / knights by position, with last-seen steps
+        self.memory = HunterMemory(memory_capacity, memory_ttl)
         self.resting = False
         self.survival_steps = 0
 
@@ -34,6 +40,8 @@ class TreasureHunter(Entity):
             self.symbol = "S"
 
     def update(self, grid):
+        self.memory.advance(grid.time)
+
         if self.stamina <= 0:
             self.survival_steps += 1
             return self.survival_steps <= 3
@@ -56,6 +64,40 @@ class TreasureHunter(Entity):
 
         return True
 
+    def spend_stamina(self, amount: float, grid):
+        """Lose stamina, telling the grid when this hunter collapses"""
+        if self.stamina <= 0:
+            return
+        self.stamina = max(0, self.stamina - amount)
+        if self.stamina <= 0:
+            grid.hunter_collapsed(self)
+
+    def is_searching(self) -> bool:
+        """Whether the next update goes looking for treasure"""
+        return self.stamina > 6 and not self.resting and self.carrying is None
+
+    def idle_steps(self, grid) -> float:
+        if self.stamina <= 0:
+            # Collapsed, only counting down to removal, which must happen
+            # in a normal update so it lands on the right step
+            return max(0, 3 - self.survival_steps)
+        if self.resting:
+            # Resting until stamina reaches 80, the last rest step included
+            return max(1, ceil(80 - self.stamina))
+        return 0
+
+    def skip_steps(self, steps: int, grid) -> bool:
+        # Age the memory as the last of the skipped updates would have
+        self.memory.advance(grid.time + steps - 1)
+        if self.stamina <= 0:
+            self.survival_steps += steps
+            return self.survival_steps <= 3
+
+        self.stamina = min(100.0, self.stamina + steps)
+        if self.stamina >= 80:
+            self.resting = False
+        return True
+
     def _rest(self):
         self.stamina = min(100.0, self.stamina + 1.0)
         if self.stamina >= 80:  # Resume activity when reasonably rested
@@ -65,7 +107,7 @@ class TreasureHunter(Entity):
         # Find nearest hideout
         nearest = self._find_nearest_hideout(grid)
         if nearest:
-            if self.position == nearest.position:
+            if self._within_reach(nearest.position, grid):
                 self.resting = True
             else:
                 self._move_towards(nearest.position, grid)
@@ -76,9 +118,12 @@ class TreasureHunter(Entity):
     def _return_to_hideout(self, grid):
         nearest = self._find_nearest_hideout(grid)
         if nearest:
-            if self.position == nearest.position:
+            # The hideout occupies its cell, so deposit from next to it
+            if self._within_reach(nearest.position, grid):
                 # Deposit treasure
-                nearest.add_treasure(self.carrying)
+                nearest.add_treasure(self.carrying, grid.time)
+                if grid.events.active:
+                    grid.events.emit(EventType.DEPOSIT, grid.time, self, nearest.position, self.carrying)
                 self.carrying = None
             else:
                 self._move_towards(nearest.position, grid)
@@ -87,17 +132,55 @@ class TreasureHunter(Entity):
             self._random_move(grid)
 
     def _search_for_treasure(self, grid):
-        # Check memory for known treasures
-        if self.memory['treasures']:
+        # Follow the hideout's assignment while the treasure is still there
+        target = self.target
+        if target is not None:
+            if grid.treasure_value(target, target.position) is not None:
+                self._go_for(target, grid)
+                return
+            self.target = None
+
+        # Check memory for known treasures nobody else was sent after
+        treasures = self.memory['treasures']
+        candidates = {}
+        for pos, treasure in list(treasures.items()):
+            if pos in self.claimed:
+                continue
+            value = grid.treasure_value(treasure, pos)
+            if value is None:
+                # Collected or expired since it was seen
+                del treasures[pos]
+            else:
+                candidates[pos] = (value, treasure)
+
+        if candidates:
             # Go for highest value treasure
-            highest_value_pos = max(
-                self.memory['treasures'].items(),
-                key=lambda item: item[1].value
-            )[0]
-            self._move_towards(highest_value_pos, grid)
-        else:
-            # Explore randomly
-            self._random_move(grid)
+            _, treasure = max(candidates.values(), key=lambda item: item[0])
+            self._go_for(treasure, grid)
+            return
+
+        # Explore randomly
+        self._random_move(grid)
+
+    def _go_for(self, treasure: Treasure, grid):
+        if not self._within_reach(treasure.position, grid):
+            self._move_towards(treasure.position, grid)
+            return
+
+        # Treasures occupy their cell, so pick up from next to it
+        position = treasure.position
+        grid.remove_entity(position)
+        self.memory.forget(position)
+        self.carrying = treasure
+        self.target = None
+        if grid.events.active:
+            grid.events.emit(EventType.PICKUP, grid.time, self, position, treasure)
+
+    def _within_reach(self, position: Tuple[int, int], grid) -> bool:
+        """Whether position is this hunter's cell or one of its four neighbours"""
+        dx = abs(position[0] - self.position[0]) % grid.width
+        dy = abs(position[1] - self.position[1]) % grid.height
+        return min(dx, grid.width - dx) + min(dy, grid.height - dy) <= 1
 
     def _move_towards(self, target_pos, grid):
         dx = (target_pos[0] - self.position[0]) % grid.width
@@ -123,11 +206,11 @@ class TreasureHunter(Entity):
         if grid.is_empty((new_x, new_y)):
             grid.move_entity(self.position, (new_x, new_y))
             self.position = (new_x, new_y)
-            self.stamina = max(0, self.stamina - 2)
+            self.spend_stamina(MOVE_STAMINA_COST, grid)
 
     def _random_move(self, grid):
         directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-        random.shuffle(directions)
+        grid.rng.shuffle(directions)
 
         for dx, dy in directions:
             new_x = (self.position[0] + dx) % grid.width
@@ -136,50 +219,32 @@ class TreasureHunter(Entity):
             if grid.is_empty((new_x, new_y)):
                 grid.move_entity(self.position, (new_x, new_y))
                 self.position = (new_x, new_y)
-                self.stamina = max(0, self.stamina - 2)
+                self.spend_stamina(MOVE_STAMINA_COST, grid)
                 break
 
     def _find_nearest_hideout(self, grid):
         if not self.memory['hideouts']:
             return None
 
-        min_dist = float('inf')
-        nearest = None
-
-        for pos, hideout in self.memory['hideouts'].items():
-            dist = self._distance_to(pos)
-            if dist < min_dist:
-                min_dist = dist
-                nearest = hideout
-
-        return nearest
-
-    def _distance_to(self, pos):
-        dx = min(abs(pos[0] - self.position[0]),
-                 abs(pos[0] - self.position[0] - self.grid.width),
-                 abs(pos[0] - self.position[0] + self.grid.width))
-        dy = min(abs(pos[1] - self.position[1]),
-                 abs(pos[1] - self.position[1] - self.grid.height),
-                 abs(pos[1] - self.position[1] + self.grid.height))
-        return sqrt(dx * dx + dy * dy)
+        positions = list(self.memory['hideouts'])
+        index = nearest_index(self.position, positions, grid.width, grid.height)
+        return self.memory['hideouts'][positions[index]]
 
     def _update_memory(self, grid):
-        self.memory = {'treasures': {}, 'hideouts': {}}
-        # Scan 3-cell radius
+        # Scan 3-cell radius, refreshing what is seen and forgetting
+        # anything remembered at cells that turn out to be empty
         scan_radius = 3
-        for dx in range(-scan_radius, scan_radius + 1):
-            for dy in range(-scan_radius, scan_radius + 1):
-                if dx == 0 and dy == 0:
-                    continue
-
-                x = (self.position[0] + dx) % grid.width
-                y = (self.position[1] + dy) % grid.height
-                pos = (x, y)
-                entity = grid.get_entity(pos)
-
-                if entity and entity.type == EntityType.TREASURE:
-                    self.memory['treasures'][pos] = entity
-                elif entity and entity.type == EntityType.HIDEOUT:
-                    self.memory['hideouts'][pos] = entity
-                elif entity and entity.type == EntityType.KNIGHT:
-                    self.memory['knights'][pos] = entity
\ No newline at end of file
+        for dx, dy in get_offset_stencil(scan_radius):
+            x = (self.position[0] + dx) % grid.width
+            y = (self.position[1] + dy) % grid.height
+            pos = (x, y)
+            entity = grid.get_entity(pos)
+
+            if entity is None:
+                self.memory.forget(pos)
+            elif entity.type == EntityType.TREASURE:
+                self.memory['treasures'][pos] = entity
+            elif entity.type == EntityType.HIDEOUT:
+                self.memory['hideouts'][pos] = entity
+            elif entity.type == EntityType.KNIGHT:
+                self.memory['knights'][pos] = entity
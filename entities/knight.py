@@ -1,6 +1,12 @@
 from entities.entity import Entity, EntityType
 from typing import Tuple, Optional
-import random
+from utils.helpers import nearest_index
+from world.events import EventType
+from math import ceil
+
+# Stamina a caught hunter loses
+DETAIN_STAMINA_COST = 5
+CHALLENGE_STAMINA_COST = 20
 
 
 class Knight(Entity):
@@ -30,6 +36,28 @@ class Knight(Entity):
 
         return True
 
+    def idle_steps(self, grid) -> float:
+        if self.energy <= 20:
+            # Exhausted knights only regain energy when not retreating, so
+            # one that is already at (or has no) garrison stays put for good
+            garrison = self._find_nearest_hideout(grid)
+            if garrison is None or self.position == garrison.position:
+                return float('inf')
+            return 0
+        if self.resting:
+            return max(1, ceil((100 - self.energy) / 10))
+        return 0
+
+    def skip_steps(self, steps: int, grid) -> bool:
+        if self.energy <= 20:
+            self.resting = True
+            return True
+
+        self.energy = min(100.0, self.energy + 10.0 * steps)
+        if self.energy >= 100:
+            self.resting = False
+        return True
+
     def _retreat_to_garrison(self, grid):
         # For simplicity, we'll treat hideouts as garrisons
         garrison = self._find_nearest_hideout(grid)
@@ -43,18 +71,12 @@ class Knight(Entity):
             self.resting = True
 
     def _find_hunter_in_range(self, grid, radius):
-        for dx in range(-radius, radius + 1):
-            for dy in range(-radius, radius + 1):
-                if dx == 0 and dy == 0:
-                    continue
-
-                x = (self.position[0] + dx) % grid.width
-                y = (self.position[1] + dy) % grid.height
-                entity = grid.get_entity((x, y))
-
-                if entity and entity.type == EntityType.HUNTER:
-                    return entity
-        return None
+        # Chase the closest hunter in range (first in scan order on ties)
+        hunters = grid.get_entities_in_radius(self.position, radius, EntityType.HUNTER)
+        if not hunters:
+            return None
+        index = nearest_index(self.position, [h.position for h in hunters], grid.width, grid.height)
+        return hunters[index]
 
     def _chase_hunter(self, hunter, grid):
         # Move towards hunter
@@ -63,25 +85,29 @@ class Knight(Entity):
 
         # If caught the hunter
         if self.position == hunter.position:
-            self._interact_with_hunter(hunter)
+            self._interact_with_hunter(hunter, grid)
 
-    def _interact_with_hunter(self, hunter):
+    def _interact_with_hunter(self, hunter, grid):
         # Randomly choose to detain or challenge
-        if random.random() < 0.5:
+        if grid.rng.random() < 0.5:
             # Detain
-            hunter.stamina = max(0, hunter.stamina - 5)
+            event = EventType.DETAIN
+            hunter.spend_stamina(DETAIN_STAMINA_COST, grid)
             if hunter.carrying:
                 hunter.carrying = None
         else:
             # Challenge
-            hunter.stamina = max(0, hunter.stamina - 20)
+            event = EventType.CHALLENGE
+            hunter.spend_stamina(CHALLENGE_STAMINA_COST, grid)
             if hunter.carrying:
                 hunter.carrying = None
+        if grid.events.active:
+            grid.events.emit(event, grid.time, self, self.position, hunter)
 
     def _patrol(self, grid):
         # Random patrol movement
         directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-        random.shuffle(directions)
+        grid.rng.shuffle(directions)
 
         for dx, dy in directions:
             new_x = (self.position[0] + dx) % grid.width
@@ -0,0 +1,118 @@
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Tuple, Iterator, Optional
+from entities.entity import Entity
+
+CATEGORIES = ('treasures', 'hideouts', 'knights')
+
+
+class MemoryStore(MutableMapping):
+    """
+    Bounded position -> entity map for one category of a hunter's memory.
+
+    Every entry carries the step it was last seen at. Entries older than ttl
+    steps are invisible and dropped lazily, and once capacity is exceeded the
+    least recently seen entry is evicted.
+    """
+
+    def __init__(self, owner: 'HunterMemory'):
+        self.owner = owner
+        self.entries: 'OrderedDict[Tuple[int, int], Tuple[Entity, int]]' = OrderedDict()
+
+    def _is_fresh(self, seen: int) -> bool:
+        return self.owner.now - seen <= self.owner.ttl
+
+    def remember(self, position: Tuple[int, int], entity: Entity, seen: Optional[int] = None):
+        if seen is None:
+            seen = self.owner.now
+        current = self.entries.get(position)
+        if current is not None and current[1] > seen:
+            return  # Already have a fresher sighting
+
+        self.entries[position] = (entity, seen)
+        self.entries.move_to_end(position)
+        if len(self.entries) > self.owner.capacity:
+            self.entries.popitem(last=False)
+
+    def expire(self):
+        """Drop entries past their TTL from the least recently seen end"""
+        entries = self.entries
+        while entries:
+            position, (_, seen) = next(iter(entries.items()))
+            if self._is_fresh(seen):
+                break
+            del entries[position]
+
+    def merge(self, other: 'MemoryStore'):
+        for position, (entity, seen) in other.entries.items():
+            if self._is_fresh(seen):
+                self.remember(position, entity, seen)
+
+    def last_seen(self, position: Tuple[int, int]) -> Optional[int]:
+        entry = self.entries.get(position)
+        return entry[1] if entry is not None else None
+
+    def __getitem__(self, position):
+        entity, seen = self.entries[position]
+        if not self._is_fresh(seen):
+            raise KeyError(position)
+        return entity
+
+    def __setitem__(self, position, entity):
+        self.remember(position, entity)
+
+    def __delitem__(self, position):
+        del self.entries[position]
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return (pos for pos, (_, seen) in list(self.entries.items()) if self._is_fresh(seen))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __bool__(self):
+        return any(True for _ in self)
+
+    def __repr__(self):
+        return f"MemoryStore({dict(self.items())!r})"
+
+
+class HunterMemory:
+    """
+    A hunter's memory of treasures, hideouts and knights, indexed like the
+    plain dict it replaces (memory['treasures'][pos] -> entity) but bounded
+    per category by capacity and ttl.
+    """
+
+    def __init__(self, capacity: int = 64, ttl: int = 50):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.now = 0
+        self.stores = {category: MemoryStore(self) for category in CATEGORIES}
+
+    def __getitem__(self, category: str) -> MemoryStore:
+        return self.stores[category]
+
+    def __contains__(self, category: str) -> bool:
+        return category in self.stores
+
+    def keys(self):
+        return self.stores.keys()
+
+    def advance(self, now: int):
+        """Move the memory clock forward and drop expired entries"""
+        self.now = now
+        for store in self.stores.values():
+            store.expire()
+
+    def forget(self, position: Tuple[int, int]):
+        """Forget anything remembered at a position seen to be empty"""
+        for store in self.stores.values():
+            store.entries.pop(position, None)
+
+    def merge(self, other: 'HunterMemory'):
+        for category, store in self.stores.items():
+            store.merge(other.stores[category])
+
+    def size(self) -> int:
+        return sum(len(store.entries) for store in self.stores.values())
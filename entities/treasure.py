@@ -2,6 +2,12 @@ from enum import Enum
 from entities.entity import Entity, EntityType
 from typing import Tuple
 
+# Treasures whose value falls to this or below crumble away
+MIN_VALUE = 0.1
+
+# Fraction of its value a treasure keeps each step
+DECAY = 0.999
+
 
 class TreasureType(Enum):
     BRONZE = 1
@@ -22,10 +28,37 @@ class Treasure(Entity):
         else:
             self.symbol = "G"
 
+    @property
+    def value(self) -> float:
+        return self._value
+
+    @value.setter
+    def value(self, value: float):
+        # Decay is counted from the last value set, in closed form, so that
+        # stepping, skipping and lazy reads all give bit-identical values
+        self._value = value
+        self._base = value
+        self._age = 0
+
     def update(self, grid):
         # Treasure loses 0.1% of its value each step
-        self.value *= 0.999
-        return self.value > 0.1  # Returns False if treasure should be removed
+        self._age += 1
+        self._value = self._base * DECAY ** self._age
+        return self._value > MIN_VALUE  # Returns False if treasure should be removed
+
+    def idle_steps(self, grid) -> float:
+        return float('inf')
+
+    def skip_steps(self, steps: int, grid) -> bool:
+        self._age += steps
+        self._value = self._base * DECAY ** self._age
+        return self._value > MIN_VALUE
+
+    def value_after(self, steps: int) -> float:
+        """Value steps updates from now, without changing the treasure"""
+        if not steps:
+            return self._value
+        return self._base * DECAY ** (self._age + steps)
 
     def get_value_increase(self):
         if self.treasure_type == TreasureType.BRONZE:
@@ -5,7 +5,13 @@ from entities.entity import EntityType
 from entities.hunter import HunterSkill
 from entities.treasure import TreasureType
 from simulation import EldoriaSimulation
-from PIL import Image, ImageTk
+from gui.pacing import StepPacer
+from gui.sprite_atlas import SpriteAtlas
+try:
+    from analysis.heatmap import HeatmapRecorder, LAYERS as HEATMAP_LAYERS
+except ImportError:  # Heatmaps need numpy
+    HeatmapRecorder = None
+    HEATMAP_LAYERS = ()
 import random
 import time
 from threading import Thread
@@ -21,6 +27,8 @@ class EldoriaGUI:
         self.is_running = False
         self.speed = 500  # ms between updates
         self.cell_size = 30
+        self.pacer = StepPacer(target_fps=30)
+        self.heatmap = None
 
         # Load images
         self.load_icons()
@@ -34,26 +42,18 @@ class EldoriaGUI:
         self.create_simulation(20, 20)
 
     def load_icons(self):
-        """Load and resize icons for grid display"""
-        icon_size = (self.cell_size, self.cell_size)
-
-        # Create simple colored icons if real images aren't available
-        self.icons = {
-            'empty': self.create_colored_icon('gray'),
-            'hunter_N': self.create_colored_icon('blue'),
-            'hunter_E': self.create_colored_icon('green'),
-            'hunter_S': self.create_colored_icon('purple'),
-            'knight': self.create_colored_icon('red'),
-            'hideout': self.create_colored_icon('brown'),
-            'treasure_B': self.create_colored_icon('#CD7F32'),  # bronze
-            'treasure_S': self.create_colored_icon('#C0C0C0'),  # silver
-            'treasure_G': self.create_colored_icon('#FFD700'),  # gold
-        }
-
-    def create_colored_icon(self, color):
-        """Create a simple colored square icon"""
-        image = Image.new('RGB', (self.cell_size, self.cell_size), color)
-        return ImageTk.PhotoImage(image)
+        """Load icons for the legend; grid sprites follow the drawn cell size"""
+        self.atlas = SpriteAtlas()
+        self.icons = self.atlas.sprites(self.cell_size)
+        self.sprite_size = None
+        self.cell_sprites = {}
+
+    def update_sprites(self, cell_width, cell_height):
+        """Switch to sprites matching the cell size, only when it changes"""
+        size = max(1, int(min(cell_width, cell_height)))
+        if size != self.sprite_size:
+            self.sprite_size = size
+            self.cell_sprites = self.atlas.sprites(size)
 
     def create_control_panel(self):
         """Create the control panel frame"""
@@ -85,6 +85,26 @@ class EldoriaGUI:
         # Step control
         ttk.Button(control_frame, text="Step", command=self.step_simulation).grid(row=5, column=0, columnspan=2, pady=5)
 
+        # Steps run between repaints; turbo runs as fast as possible and tunes the batch to ~30 fps
+        ttk.Label(control_frame, text="Steps/Frame:").grid(row=6, column=0, sticky="w")
+        self.steps_per_frame_var = tk.IntVar(value=1)
+        ttk.Spinbox(control_frame, from_=1, to=10000, textvariable=self.steps_per_frame_var).grid(row=6, column=1)
+
+        self.turbo_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(control_frame, text="Turbo (as fast as possible)",
+                        variable=self.turbo_var).grid(row=7, column=0, columnspan=2, sticky="w")
+
+        # Heatmap overlay
+        self.heatmap_var = tk.BooleanVar(value=False)
+        self.heatmap_layer_var = tk.StringVar(value=HEATMAP_LAYERS[0] if HEATMAP_LAYERS else "")
+        heatmap_check = ttk.Checkbutton(control_frame, text="Heatmap:", variable=self.heatmap_var,
+                                        command=self.toggle_heatmap)
+        heatmap_check.grid(row=8, column=0, sticky="w")
+        ttk.Combobox(control_frame, textvariable=self.heatmap_layer_var, values=HEATMAP_LAYERS,
+                     state="readonly", width=12).grid(row=8, column=1)
+        if HeatmapRecorder is None:
+            heatmap_check.state(["disabled"])
+
     def create_grid_canvas(self):
         """Create the canvas for displaying the grid"""
         self.canvas_frame = ttk.LabelFrame(self.root, text="Eldoria Kingdom", padding=10)
@@ -92,6 +112,7 @@ class EldoriaGUI:
 
         self.canvas = tk.Canvas(self.canvas_frame, bg='white', borderwidth=0, highlightthickness=0)
         self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Configure>", self.on_canvas_resize)
 
         # Configure grid weights to allow resizing
         self.root.grid_rowconfigure(0, weight=1)
@@ -110,7 +131,8 @@ class EldoriaGUI:
             'knights': tk.StringVar(),
             'treasures': tk.StringVar(),
             'collected_treasures': tk.StringVar(),
-            'hideouts': tk.StringVar()
+            'hideouts': tk.StringVar(),
+            'steps_per_sec': tk.StringVar()
         }
 
         for i, (label, var) in enumerate(self.stats_vars.items()):
@@ -141,6 +163,8 @@ class EldoriaGUI:
             self.toggle_simulation()  # Stop current simulation
 
         self.simulation = EldoriaSimulation(width, height)
+        self.heatmap = None
+        self.toggle_heatmap()
         self.draw_grid()
         self.update_stats()
 
@@ -162,15 +186,45 @@ class EldoriaGUI:
 
     def run_simulation(self):
         """Run the simulation in a separate thread"""
+        self.pacer.reset()
+        last_frame = time.perf_counter()
         while self.is_running and self.simulation.is_running():
-            self.step_simulation()
-            time.sleep(self.speed / 1000)
+            turbo = self.turbo_var.get()
+            self.pacer.auto = turbo
+            if not turbo:
+                self.pacer.steps_per_frame = self.get_steps_per_frame()
+
+            started = time.perf_counter()
+            steps = self.advance_simulation(self.pacer.steps_per_frame)
+            step_seconds = time.perf_counter() - started
+
+            self.draw_grid()
+            self.update_stats()
+            if not turbo:
+                time.sleep(self.speed / 1000)
+
+            now = time.perf_counter()
+            self.pacer.record_frame(steps, step_seconds, now - last_frame)
+            last_frame = now
 
         if not self.simulation.is_running():
             self.is_running = False
             self.start_button.config(text="Start")
             messagebox.showinfo("Simulation Ended", "The simulation has completed!")
 
+    def advance_simulation(self, count):
+        """Run up to count steps without drawing; returns the steps taken"""
+        taken = 0
+        while taken < count and self.simulation.is_running():
+            taken += self.simulation.step(max_steps=count - taken)
+        return taken
+
+    def get_steps_per_frame(self):
+        try:
+            return max(1, self.steps_per_frame_var.get())
+        except tk.TclError:  # Spinbox holds a partial edit
+            return self.pacer.steps_per_frame
+
     def step_simulation(self):
         """Advance the simulation by one step"""
         if self.simulation:
@@ -178,10 +232,25 @@ class EldoriaGUI:
             self.draw_grid()
             self.update_stats()
 
+    def toggle_heatmap(self):
+        """Start or stop recording heatmaps for the current simulation"""
+        if self.heatmap_var.get() and self.heatmap is None and self.simulation:
+            self.heatmap = HeatmapRecorder(self.simulation.grid, decay=0.99)
+        elif not self.heatmap_var.get() and self.heatmap is not None:
+            self.heatmap.close()
+            self.heatmap = None
+        if self.simulation:
+            self.draw_grid()
+
     def update_speed(self, *args):
         """Update simulation speed from slider"""
         self.speed = self.speed_var.get()
 
+    def on_canvas_resize(self, event):
+        """Redraw at the new cell size when the canvas changes size"""
+        if self.simulation:
+            self.draw_grid()
+
     def draw_grid(self):
         """Draw the current state of the grid"""
         if not self.simulation:
@@ -197,6 +266,7 @@ class EldoriaGUI:
 
         cell_width = canvas_width / grid_width
         cell_height = canvas_height / grid_height
+        self.update_sprites(cell_width, cell_height)
 
         # Draw grid cells
         for x in range(grid_width):
@@ -214,13 +284,16 @@ class EldoriaGUI:
 
                 # Draw entity icon if present
                 if icon_key:
-                    icon = self.icons[icon_key]
+                    icon = self.cell_sprites[icon_key]
                     self.canvas.create_image(
                         x1 + cell_width / 2,
                         y1 + cell_height / 2,
                         image=icon
                     )
 
+        if self.heatmap is not None:
+            self.draw_heatmap(cell_width, cell_height)
+
         # Draw grid lines
         for x in range(grid_width + 1):
             self.canvas.create_line(
@@ -235,6 +308,20 @@ class EldoriaGUI:
                 fill="gray80"
             )
 
+    def draw_heatmap(self, cell_width, cell_height):
+        """Shade cells by the selected heatmap layer, brightest at its maximum"""
+        values = self.heatmap.layer(self.heatmap_layer_var.get())
+        peak = values.max()
+        if peak <= 0:
+            return
+        for y, x in zip(*values.nonzero()):
+            heat = int(255 * values[y, x] / peak)
+            color = f"#ff{255 - heat:02x}00"
+            x1 = x * cell_width
+            y1 = y * cell_height
+            self.canvas.create_rectangle(x1, y1, x1 + cell_width, y1 + cell_height,
+                                         fill=color, outline="", stipple="gray50")
+
     def get_icon_key(self, entity):
         """Determine which icon to use for an entity"""
         if not entity:
@@ -266,6 +353,7 @@ class EldoriaGUI:
             return
 
         stats = self.simulation.get_stats()
+        stats['steps_per_sec'] = f"{self.pacer.steps_per_second:.0f}"
         for key, var in self.stats_vars.items():
             var.set(str(stats[key]))
 
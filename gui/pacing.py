@@ -0,0 +1,61 @@
+from typing import Optional
+
+# Weight of the newest sample in the moving averages
+_SMOOTHING = 0.2
+
+# Auto-tuning never changes the batch by more than this factor per frame
+_MAX_GROWTH = 2.0
+
+
+class StepPacer:
+    """
+    Decides how many simulation steps to run between two repaints.
+
+    With auto=False every frame runs a fixed steps_per_frame. With auto=True
+    the pacer measures the average cost of a step and of the rest of a frame
+    (drawing, stats, sleeping) and picks the batch that fills the frame
+    budget of target_fps, so cheap worlds run thousands of steps per frame
+    while big ones still repaint smoothly. Achieved throughput is tracked as
+    steps_per_second.
+    """
+
+    def __init__(self, steps_per_frame: int = 1, target_fps: float = 30.0,
+                 auto: bool = False, max_steps_per_frame: int = 10000):
+        self.steps_per_frame = max(1, steps_per_frame)
+        self.target_fps = target_fps
+        self.auto = auto
+        self.max_steps_per_frame = max_steps_per_frame
+        self.steps_per_second = 0.0
+        self._step_cost: Optional[float] = None  # Seconds per step
+        self._overhead: Optional[float] = None  # Seconds per frame outside stepping
+
+    def reset(self):
+        self.steps_per_second = 0.0
+        self._step_cost = None
+        self._overhead = None
+
+    def record_frame(self, steps: int, step_seconds: float, frame_seconds: float):
+        """
+        Feed back one frame: the steps it ran, the time spent stepping, and the
+        wall time since the previous frame (stepping included).
+        """
+        if frame_seconds > 0:
+            self.steps_per_second = _average(self.steps_per_second or None, steps / frame_seconds)
+        if steps <= 0:
+            return
+
+        self._step_cost = _average(self._step_cost, step_seconds / steps)
+        self._overhead = _average(self._overhead, max(0.0, frame_seconds - step_seconds))
+
+        if self.auto and self._step_cost > 0:
+            budget = 1.0 / self.target_fps - self._overhead
+            wanted = max(1.0, budget / self._step_cost)
+            current = self.steps_per_frame
+            wanted = min(max(wanted, current / _MAX_GROWTH), current * _MAX_GROWTH)
+            self.steps_per_frame = int(min(max(1, round(wanted)), self.max_steps_per_frame))
+
+
+def _average(previous: Optional[float], sample: float) -> float:
+    if previous is None:
+        return sample
+    return previous + _SMOOTHING * (sample - previous)
@@ -0,0 +1,65 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    from PIL import Image, ImageTk
+except ImportError:  # Only needed by the default renderer
+    Image = None
+    ImageTk = None
+
+# Simple colored squares stand in for real artwork
+ICON_COLORS = {
+    'empty': 'gray',
+    'hunter_N': 'blue',
+    'hunter_E': 'green',
+    'hunter_S': 'purple',
+    'knight': 'red',
+    'hideout': 'brown',
+    'treasure_B': '#CD7F32',  # bronze
+    'treasure_S': '#C0C0C0',  # silver
+    'treasure_G': '#FFD700',  # gold
+}
+
+
+def render_square(color: str, size: int):
+    """A size x size Tk image filled with color"""
+    return ImageTk.PhotoImage(Image.new('RGB', (size, size), color))
+
+
+class SpriteAtlas:
+    """
+    Icons rendered at the pixel size they are drawn at.
+
+    Sprites are created on first use for each (icon, size) pair and kept in
+    an LRU cache, so flipping between a few window or grid sizes reuses the
+    images instead of allocating new ones on every redraw. Tk only keeps a
+    PhotoImage alive while Python holds a reference, so callers should keep
+    the dict returned by sprites() for as long as its images are on screen.
+    """
+
+    def __init__(self, colors: Optional[Dict[str, str]] = None, capacity: int = 64,
+                 render: Callable[[str, int], object] = render_square):
+        self.colors = dict(ICON_COLORS if colors is None else colors)
+        self.capacity = capacity
+        self.render = render
+        self._cache: "OrderedDict[Tuple[str, int], object]" = OrderedDict()
+
+    def get(self, icon: str, size: int):
+        key = (icon, size)
+        sprite = self._cache.get(key)
+        if sprite is not None:
+            self._cache.move_to_end(key)
+            return sprite
+
+        sprite = self.render(self.colors[icon], size)
+        self._cache[key] = sprite
+        if len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+        return sprite
+
+    def sprites(self, size: int) -> Dict[str, object]:
+        """Every icon at one size"""
+        return {icon: self.get(icon, size) for icon in self.colors}
+
+    def __len__(self):
+        return len(self._cache)
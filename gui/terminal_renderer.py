@@ -0,0 +1,169 @@
+from entities.entity import EntityType
+from typing import List, Optional, Tuple
+from queue import Queue, Empty, Full
+from threading import Thread
+import sys
+
+# One character per entity type
+GLYPHS = {
+    EntityType.EMPTY: ".",
+    EntityType.TREASURE: "$",
+    EntityType.HUNTER: "@",
+    EntityType.HIDEOUT: "H",
+    EntityType.KNIGHT: "K",
+}
+
+CLEAR_SCREEN = "\x1b[2J"
+CLEAR_BELOW = "\x1b[J"
+CLEAR_LINE = "\x1b[K"
+
+# Changed cells closer than this are redrawn as one run
+_RUN_MERGE_GAP = 4
+
+
+def _build_glyph_table() -> bytes:
+    table = bytearray(b"?" * 256)
+    for entity_type, glyph in GLYPHS.items():
+        table[entity_type.value] = ord(glyph)
+    return bytes(table)
+
+
+GLYPH_TABLE = _build_glyph_table()
+
+
+def _move_to(row: int, col: int) -> str:
+    return f"\x1b[{row + 1};{col + 1}H"
+
+
+def _changed_runs(old: bytes, new: bytes) -> List[Tuple[int, int]]:
+    """(start, end) column spans where two equally long rows differ"""
+    runs = []
+    start = end = -1
+    for col in range(len(new)):
+        if old[col] != new[col]:
+            if start >= 0 and col - end <= _RUN_MERGE_GAP:
+                end = col + 1
+            else:
+                if start >= 0:
+                    runs.append((start, end))
+                start, end = col, col + 1
+    if start >= 0:
+        runs.append((start, end))
+    return runs
+
+
+class TerminalRenderer:
+    """
+    ANSI terminal view of an EldoriaGrid.
+
+    Rows are built from the grid's type layer with a single bytes.translate
+    per row, and only cells that changed since the last drawn frame are
+    rewritten using cursor-addressed escapes. The view is a scrollable
+    viewport onto the (wrapping) world, and render() can skip steps so that
+    only every Nth one is drawn; a step that jumps past the next due
+    multiple (e.g. after fast-forwarding) is drawn as well. With
+    threaded=True the diffing and writing happen on a background thread; if
+    it falls behind, intermediate frames are dropped instead of blocking the
+    simulation loop.
+    """
+
+    def __init__(self, grid, viewport: Tuple[int, int] = (80, 24), every: int = 1,
+                 stream=None, threaded: bool = True):
+        self.grid = grid
+        self.view_width = min(viewport[0], grid.width)
+        self.view_height = min(viewport[1], grid.height)
+        self.origin = (0, 0)
+        self.every = max(1, every)
+        self.stream = stream or sys.stdout
+        self.frames_drawn = 0
+        self._next_due: Optional[int] = None  # First due step after the last drawn one
+
+        self._drawn_rows: Optional[List[bytes]] = None
+        self._force_full = True
+        self._queue: Optional[Queue] = None
+        self._writer: Optional[Thread] = None
+        if threaded:
+            self._queue = Queue(maxsize=1)
+            self._writer = Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+
+    def scroll(self, dx: int, dy: int):
+        """Move the viewport, wrapping around the world edges"""
+        x, y = self.origin
+        self.origin = ((x + dx) % self.grid.width, (y + dy) % self.grid.height)
+        self._force_full = True
+
+    def due(self, step: int) -> bool:
+        """Whether render(step) would draw"""
+        if step % self.every == 0:
+            return True
+        return self._next_due is not None and step >= self._next_due
+
+    def render(self, step: int, status: str = "") -> bool:
+        """Draw the current state if step is due; returns whether it was drawn"""
+        if not self.due(step):
+            return False
+        self._next_due = (step // self.every + 1) * self.every
+
+        x0, y0 = self.origin
+        grid = self.grid
+        rows = [
+            grid.get_type_row((y0 + r) % grid.height, x0, self.view_width).translate(GLYPH_TABLE)
+            for r in range(self.view_height)
+        ]
+        frame = (rows, status, self._force_full)
+        self._force_full = False
+
+        if self._queue is None:
+            self._draw(frame)
+            return True
+
+        try:
+            self._queue.put_nowait(frame)
+        except Full:
+            # Replace the frame the writer has not picked up yet
+            try:
+                dropped = self._queue.get_nowait()
+                if dropped[2]:
+                    frame = (rows, status, True)
+            except Empty:
+                pass
+            self._queue.put_nowait(frame)
+        return True
+
+    def close(self):
+        """Flush the last pending frame and stop the writer thread"""
+        if self._queue is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._queue = None
+        self.stream.write(_move_to(self.view_height + 2, 0))
+        self.stream.flush()
+
+    def _write_loop(self):
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            self._draw(frame)
+
+    def _draw(self, frame):
+        rows, status, full = frame
+        out = []
+        if full or self._drawn_rows is None:
+            out.append(CLEAR_SCREEN)
+            for r, row in enumerate(rows):
+                out.append(_move_to(r, 0) + row.decode("ascii"))
+        else:
+            for r, (old, new) in enumerate(zip(self._drawn_rows, rows)):
+                if old == new:
+                    continue
+                for start, end in _changed_runs(old, new):
+                    out.append(_move_to(r, start) + new[start:end].decode("ascii"))
+
+        out.append(_move_to(self.view_height, 0) + CLEAR_LINE + status)
+        out.append(_move_to(self.view_height + 1, 0) + CLEAR_BELOW)
+        self._drawn_rows = rows
+        self.frames_drawn += 1
+        self.stream.write("".join(out))
+        self.stream.flush()
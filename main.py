@@ -1,4 +1,7 @@
 from simulation import EldoriaSimulation
+from gui.terminal_renderer import TerminalRenderer
+from world.termination import StepBudget, NoCollection
+import shutil
 import time
 
 
@@ -9,32 +12,45 @@ def main():
 
     sim = EldoriaSimulation(width, height)
 
-    print("\nInitial grid:")
-    sim.grid.display()
-
     auto_mode = input("Run automatically? (y/n): ").lower() == 'y'
-    max_steps = 100 if auto_mode else 0
+    if auto_mode:
+        # Nobody is watching every step, so jump over quiet stretches
+        sim.fast_forward = True
+        sim.add_termination_policy(StepBudget(100))
+        sim.add_termination_policy(NoCollection(50))
+    render_every = int(input("Render every N steps (default 1): ") or 1) if auto_mode else 1
+
+    # Leave room below the board for the stats line and prompts
+    columns, lines = shutil.get_terminal_size()
+    renderer = TerminalRenderer(sim.grid, viewport=(columns, lines - 4),
+                                every=render_every, threaded=auto_mode)
+    renderer.render(0, "Initial grid")
 
     step_count = 0
-    while sim.is_running() and (not max_steps or step_count < max_steps):
+    while sim.is_running():
         if not auto_mode:
             input("\nPress Enter for next step...")
 
-        sim.step()
-        step_count += 1
+        step_count += sim.step()
 
-        print(f"\nStep {step_count}:")
-        sim.grid.display()
+        if not renderer.due(step_count):
+            continue
 
         stats = sim.get_stats()
-        print(
-            f"\nStats: Active Hunters: {stats['active_hunters']}, Treasures: {stats['treasures']}, Collected: {stats['collected_treasures']}")
+        renderer.render(
+            step_count,
+            f"Step {step_count} | Active Hunters: {stats['active_hunters']}, "
+            f"Treasures: {stats['treasures']}, Collected: {stats['collected_treasures']}"
+        )
 
         if auto_mode:
             time.sleep(0.5)
 
+    renderer.close()
     print("\nSimulation ended!")
     final_stats = sim.get_stats()
+    if sim.termination_reason:
+        print(f"Stopped early: {sim.termination_reason}")
     print(f"Final stats after {final_stats['steps']} steps:")
     print(f"- Total hunters: {final_stats['hunters']} (active: {final_stats['active_hunters']})")
     print(f"- Knights: {final_stats['knights']}")
@@ -0,0 +1,327 @@
+from simulation import EldoriaSimulation
+from array import array
+from typing import Any, Dict, Optional, Tuple
+import argparse
+import asyncio
+import json
+import math
+import struct
+import sys
+import zlib
+
+# Server -> client message kinds
+HELLO = 0
+KEYFRAME = 1
+DELTA = 2
+STATS = 3
+ERROR = 4
+
+# Sizes a viewer may ask "new" for; smaller worlds cannot fit their hideouts
+MIN_WORLD_SIZE = 10
+MAX_WORLD_SIZE = 4096
+
+# Every message is a 4-byte big-endian length followed by a kind byte
+_HEADER = struct.Struct(">IB")
+_STEP = struct.Struct(">Q")
+_SIZE = struct.Struct(">II")
+
+
+def _message(kind: int, payload: bytes) -> bytes:
+    return _HEADER.pack(len(payload) + 1, kind) + payload
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _int_field(command: dict, name: str, default: int, low: int, high: Optional[int] = None) -> int:
+    """An integer control field, ValueError if it is not a number in [low, high]"""
+    value = command.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{name} must be a number")
+    value = int(value)
+    if value < low or (high is not None and value > high):
+        limits = f"from {low}" if high is None else f"from {low} to {high}"
+        raise ValueError(f"{name} must be {limits}")
+    return value
+
+
+def _type_layer(grid) -> bytes:
+    if hasattr(grid, "type_layer"):
+        return bytes(grid.type_layer)
+    return b"".join(grid.get_type_row(y, 0, grid.width) for y in range(grid.height))
+
+
+def _changed_cells(old: bytes, new: bytes, width: int) -> array:
+    """Row-major indices of cells that differ, comparing whole rows first"""
+    changed = array("I")
+    for start in range(0, len(new), width):
+        end = start + width
+        if old[start:end] == new[start:end]:
+            continue
+        for index in range(start, end):
+            if old[index] != new[index]:
+                changed.append(index)
+    return changed
+
+
+class _Client:
+    def __init__(self, writer: asyncio.StreamWriter, queue_size: int):
+        self.writer = writer
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.needs_keyframe = True
+        self.dropped = 0
+
+
+class SimulationServer:
+    """
+    Steps an EldoriaSimulation and streams it to any number of local viewers
+    over TCP.
+
+    Each step is encoded once: a zlib-compressed delta of the cells whose
+    entity type changed (or a full keyframe), followed by a JSON stats
+    message. Every viewer has a small bounded queue. When a queue is full the
+    frame is dropped for that viewer only, and the viewer gets a keyframe as
+    soon as it catches up, so slow viewers never slow the simulation down.
+    Viewers send newline-delimited JSON controls mirroring the GUI buttons:
+    {"cmd": "start"}, {"cmd": "stop"}, {"cmd": "step"},
+    {"cmd": "speed", "ms": 200} and {"cmd": "new", "width": 30, "height": 30}.
+    New worlds are built from params, the EldoriaSimulation keyword
+    arguments of the served world, with only the requested size replaced.
+    Controls may be applied before start(); they take effect once it runs.
+    A malformed control is answered with an ERROR message to its viewer.
+    Keyframes carry the world size, so a viewer that missed the HELLO of a
+    new world still decodes it correctly.
+    """
+
+    def __init__(self, simulation: EldoriaSimulation, host: str = "127.0.0.1",
+                 port: int = 8765, speed: int = 500, queue_size: int = 4,
+                 params: Optional[Dict[str, Any]] = None):
+        self.simulation = simulation
+        self.params = params or {}
+        self.host = host
+        self.port = port
+        self.speed = speed  # ms between steps while running
+        self.queue_size = queue_size
+        self.clients = set()
+        self.running = False
+        self._pending_steps = 0
+        self._wake: Optional[asyncio.Event] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._layer = _type_layer(simulation.grid)
+
+    async def start(self):
+        self._wake = asyncio.Event()
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._loop_task = asyncio.create_task(self._simulation_loop())
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self):
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for client in list(self.clients):
+            client.writer.close()
+
+    def control(self, command: dict):
+        """Apply a control message (also usable in-process); ValueError if malformed"""
+        cmd = command.get("cmd")
+        if cmd == "start":
+            self.running = True
+        elif cmd == "stop":
+            self.running = False
+        elif cmd == "step":
+            self._pending_steps += 1
+        elif cmd == "speed":
+            self.speed = _int_field(command, "ms", self.speed, 0)
+        elif cmd == "new":
+            grid = self.simulation.grid
+            params = dict(self.params)
+            for name, current in (("width", grid.width), ("height", grid.height)):
+                params[name] = _int_field(command, name, current, MIN_WORLD_SIZE, MAX_WORLD_SIZE)
+            self.simulation = EldoriaSimulation(**params)
+            self._layer = _type_layer(self.simulation.grid)
+            for client in self.clients:
+                client.needs_keyframe = True
+                self._offer(client, self._hello())
+            self.running = False
+        else:
+            raise ValueError(f"Unknown command: {cmd!r}")
+        if self._wake is not None:
+            self._wake.set()  # Before start() the loop sees the change when it begins
+
+    def _hello(self) -> bytes:
+        grid = self.simulation.grid
+        payload = json.dumps({"width": grid.width, "height": grid.height}).encode()
+        return _message(HELLO, payload)
+
+    def _keyframe(self) -> bytes:
+        grid = self.simulation.grid
+        payload = _STEP.pack(self.simulation.steps) + _SIZE.pack(grid.width, grid.height) + self._layer
+        return _message(KEYFRAME, zlib.compress(payload, 1))
+
+    @staticmethod
+    def _advance(sim: EldoriaSimulation, previous: bytes) -> Tuple[bytes, bytes, bytes]:
+        """Step once and encode the delta and stats (runs off the event loop)"""
+        sim.step()
+        layer = _type_layer(sim.grid)
+        changed = _changed_cells(previous, layer, sim.grid.width)
+        types = bytes(layer[i] for i in changed)
+        payload = (_STEP.pack(sim.steps) + struct.pack(">I", len(changed))
+                   + _little_endian(changed) + types)
+        delta = _message(DELTA, zlib.compress(payload, 1))
+        stats = _message(STATS, json.dumps(sim.get_stats()).encode())
+        return layer, delta, stats
+
+    async def _simulation_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if self.running and not self.simulation.is_running():
+                self.running = False
+            if not (self.running or self._pending_steps):
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+
+            # Single steps are taken even after the world has ended, like the GUI's Step button
+            if self._pending_steps:
+                self._pending_steps -= 1
+            sim = self.simulation
+            layer, delta, stats = await loop.run_in_executor(None, self._advance, sim, self._layer)
+            if sim is not self.simulation:
+                continue  # Replaced by a new simulation while stepping
+            self._layer = layer
+
+            keyframe = None
+            for client in list(self.clients):
+                if client.needs_keyframe and not client.queue.full():
+                    keyframe = keyframe or self._keyframe()
+                    client.needs_keyframe = False
+                    self._offer(client, keyframe)
+                elif not client.needs_keyframe and not self._offer(client, delta):
+                    # Missing a delta breaks the chain until the next keyframe
+                    client.needs_keyframe = True
+                self._offer(client, stats)
+
+            if self.running:
+                await asyncio.sleep(self.speed / 1000)
+
+    def _offer(self, client: _Client, message: bytes) -> bool:
+        try:
+            client.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            client.dropped += 1
+            return False
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client = _Client(writer, self.queue_size)
+        self.clients.add(client)
+        self._offer(client, self._hello())
+        self._offer(client, self._keyframe())
+        client.needs_keyframe = False
+        sender = asyncio.create_task(self._send_loop(client))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    self.control(json.loads(line))
+                except (ValueError, TypeError, AttributeError) as error:
+                    # A malformed control is refused, the viewer stays connected
+                    reply = json.dumps({"error": str(error) or type(error).__name__})
+                    self._offer(client, _message(ERROR, reply.encode()))
+        finally:
+            self.clients.discard(client)
+            sender.cancel()
+            writer.close()
+
+    async def _send_loop(self, client: _Client):
+        try:
+            while True:
+                message = await client.queue.get()
+                client.writer.write(message)
+                await client.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+
+async def read_message(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    """Read one server message, returns (kind, payload)"""
+    header = await reader.readexactly(_HEADER.size)
+    length, kind = _HEADER.unpack(header)
+    return kind, await reader.readexactly(length - 1)
+
+
+class FrameDecoder:
+    """Client-side view of the streamed type layer"""
+
+    def __init__(self):
+        self.width = 0
+        self.height = 0
+        self.step = None
+        self.layer = bytearray()
+        self.stats = {}
+        self.error = None  # The last control the server refused
+
+    def apply(self, kind: int, payload: bytes):
+        if kind == HELLO:
+            info = json.loads(payload)
+            self.width, self.height = info["width"], info["height"]
+            self.layer = bytearray(self.width * self.height)
+        elif kind == KEYFRAME:
+            data = zlib.decompress(payload)
+            self.step = _STEP.unpack_from(data)[0]
+            self.width, self.height = _SIZE.unpack_from(data, _STEP.size)
+            self.layer = bytearray(data[_STEP.size + _SIZE.size:])
+        elif kind == DELTA:
+            data = zlib.decompress(payload)
+            self.step = _STEP.unpack_from(data)[0]
+            count = struct.unpack_from(">I", data, _STEP.size)[0]
+            offset = _STEP.size + 4
+            indices = array("I")
+            indices.frombytes(data[offset:offset + 4 * count])
+            if sys.byteorder == "big":
+                indices.byteswap()
+            types = data[offset + 4 * count:]
+            for index, value in zip(indices, types):
+                self.layer[index] = value
+        elif kind == STATS:
+            self.stats = json.loads(payload)
+        elif kind == ERROR:
+            self.error = json.loads(payload)["error"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream an Eldoria simulation to local viewers")
+    parser.add_argument("--width", type=int, default=20)
+    parser.add_argument("--height", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", type=int, default=500, help="ms between steps")
+    args = parser.parse_args()
+
+    async def serve():
+        params = {"width": args.width, "height": args.height}
+        server = SimulationServer(EldoriaSimulation(**params), port=args.port,
+                                  speed=args.speed, params=params)
+        await server.start()
+        print(f"Serving on {server.host}:{server.port}")
+        await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,100 +1,268 @@
 from entities.entity import EntityType
 from world.grid import EldoriaGrid
+from world.sparse_grid import SparseEldoriaGrid
+from world.chunks import ChunkedTreasureField
+from world.termination import TerminationPolicy
+from world.events import EventBus
+from world.template_cache import WorldTemplateCache, template_key
 from entities.treasure import Treasure, TreasureType
 from entities.hunter import TreasureHunter, HunterSkill
 from entities.knight import Knight
 from entities.hideout import Hideout
+import copy
 import random
-from typing import Tuple
+from utils.helpers import random_enum_value, enum_members, WeightedSampler, np
+from typing import Tuple, Optional, Dict, List
+
+# Below this expected fraction of occupied cells the sparse backend is used
+SPARSE_OCCUPANCY_THRESHOLD = 0.05
+
+# Scan radius of hunters and knights plus one step of movement
+PERCEPTION_RADIUS = 4
+
+# Shortest quiescent window worth jumping over, and the longest single jump
+MIN_FAST_FORWARD = 2
+MAX_FAST_FORWARD = 10000
 
 
 class EldoriaSimulation:
-    def __init__(self, width: int = 20, height: int = 20):
-        self.grid = EldoriaGrid(width, height)
+    def __init__(self, width: int = 20, height: int = 20,
+                 treasure_density: Tuple[float, float] = (0.15, 0.25),
+                 backend: str = "auto", lazy_treasures: bool = False,
+                 seed: Optional[int] = None, chunk_size: int = 32,
+                 treasure_weights: Optional[Dict[TreasureType, float]] = None,
+                 hideout_history: Optional[str] = None, fast_forward: bool = False,
+                 chunk_sleeping: bool = False,
+                 hideout_count: Tuple[int, int] = (3, 5),
+                 hunters_per_hideout: Tuple[int, int] = (1, 3),
+                 knight_ratio: Tuple[float, float] = (0.05, 0.10),
+                 termination: Optional[List[TerminationPolicy]] = None,
+                 template_cache: Optional[WorldTemplateCache] = None):
+        # Private generator for everything random in this world. Unseeded
+        # worlds derive it from the global random, so seeding that still works
+        self.rng = random.Random(seed if seed is not None else random.getrandbits(64))
+        self.treasure_density = treasure_density
+        self.hideout_count = hideout_count
+        self.hunters_per_hideout = hunters_per_hideout
+        self.knight_ratio = knight_ratio
+        self.hideout_history = hideout_history
+        # Jump over quiescent stretches, so step() may advance many steps;
+        # off by default so that one step() call is one world step
+        self.fast_forward = fast_forward
+        self.treasure_sampler = WeightedSampler(
+            treasure_weights or {t: 1.0 for t in enum_members(TreasureType)}, self.rng
+        )
+        self.lazy_treasures = lazy_treasures
+        self.grid = self._create_grid(width, height, backend)
+        self.grid.rng = self.rng
+        self.treasure_field = None
+        if lazy_treasures:
+            field_seed = seed if seed is not None else self.rng.getrandbits(64)
+            self.treasure_field = ChunkedTreasureField(
+                width, height, field_seed, treasure_density, chunk_size,
+                treasure_weights
+            )
         self.steps = 0
-        self.initialize_world()
+        self.hideouts: List[Hideout] = []
+        if template_cache is not None and seed is not None:
+            # Seeded worlds are reproducible, so identical setups can be reused
+            key = template_key(self._template_params(width, height, seed, chunk_size,
+                                                     treasure_weights))
+            if not template_cache.load(key, self):
+                self.initialize_world()
+                template_cache.store(key, self)
+        else:
+            self.initialize_world()
+        if chunk_sleeping:
+            self.grid.enable_chunk_sleeping(chunk_size, PERCEPTION_RADIUS)
+
+        self.termination: List[TerminationPolicy] = []
+        self.termination_reason: Optional[str] = None
+        for policy in termination or []:
+            self.add_termination_policy(policy)
+
+    def _template_params(self, width: int, height: int, seed: int, chunk_size: int,
+                         treasure_weights: Optional[Dict[TreasureType, float]]) -> dict:
+        """Everything initialize_world's outcome depends on"""
+        weights = treasure_weights or {t: 1.0 for t in enum_members(TreasureType)}
+        return {
+            'width': width,
+            'height': height,
+            'seed': seed,
+            'treasure_density': self.treasure_density,
+            'hideout_count': self.hideout_count,
+            'hunters_per_hideout': self.hunters_per_hideout,
+            'knight_ratio': self.knight_ratio,
+            'treasure_weights': sorted((t.name, w) for t, w in weights.items()),
+            'lazy_treasures': self.lazy_treasures,
+            'chunk_size': chunk_size if self.lazy_treasures else None,
+            # Bulk treasure sampling draws differently with numpy
+            'numpy': np is not None,
+        }
+
+    def _create_grid(self, width: int, height: int, backend: str) -> EldoriaGrid:
+        """Pick the dense or sparse grid backend from the expected occupancy"""
+        if backend == "auto":
+            # Upper bound: every hideout full of hunters, plus treasures and knights
+            max_hideouts = self.hideout_count[1]
+            max_hunters = max_hideouts * self.hunters_per_hideout[1]
+            expected_entities = max_hideouts + max_hunters * (1 + self.knight_ratio[1]) + 1
+            if not self.lazy_treasures:
+                expected_entities += width * height * self.treasure_density[1]
+            occupancy = expected_entities / (width * height)
+            backend = "sparse" if occupancy < SPARSE_OCCUPANCY_THRESHOLD else "dense"
+
+        if backend == "dense":
+            return EldoriaGrid(width, height)
+        if backend == "sparse":
+            return SparseEldoriaGrid(width, height)
+        raise ValueError(f"Unknown grid backend: {backend}")
 
     def initialize_world(self):
-        # Place hideouts (3-5)
-        num_hideouts = random.randint(3, 5)
+        # Place hideouts (3-5 by default)
+        num_hideouts = self.rng.randint(*self.hideout_count)
         for _ in range(num_hideouts):
             pos = self._get_random_empty_position()
-            hideout = Hideout(pos)
+            hideout = Hideout(pos, self.hideout_history)
             self.grid.add_entity(hideout, pos)
+            self.hideouts.append(hideout)
 
-            # Add 1-3 hunters to each hideout
-            num_hunters = random.randint(1, 3)
+            # Add 1-3 hunters to each hideout, on free cells beside it; a
+            # hideout has only four, so any more hunters are not enlisted
+            num_hunters = self.rng.randint(*self.hunters_per_hideout)
             for _ in range(num_hunters):
-                skill = random.choice(list(HunterSkill))
-                hunter = TreasureHunter(pos, skill)
-                self.grid.add_entity(hunter, pos)
+                skill = random_enum_value(HunterSkill, self.rng)
+                spawn = hideout.spawn_position(self.grid)
+                if spawn is None:
+                    continue
+                hunter = TreasureHunter(spawn, skill)
+                self.grid.add_entity(hunter, spawn)
                 hideout.add_hunter(hunter)
 
-        # Place treasures (15-25% of grid)
-        num_treasures = random.randint(
-            int(self.grid.width * self.grid.height * 0.15),
-            int(self.grid.width * self.grid.height * 0.25)
-        )
-        for _ in range(num_treasures):
-            pos = self._get_random_empty_position()
-            treasure_type = random.choice(list(TreasureType))
-            treasure = Treasure(pos, treasure_type)
-            self.grid.add_entity(treasure, pos)
+        # Place treasures (15-25% of grid by default), or leave them to be
+        # generated chunk by chunk as the world is explored
+        if self.treasure_field is None:
+            self._place_treasures()
 
-        # Place knights (5-10% of hunters)
+        # Place knights (5-10% of hunters by default)
+        min_ratio, max_ratio = self.knight_ratio
         num_hunters = sum(1 for e in self.grid.entities if e.type == EntityType.HUNTER)
-        num_knights = random.randint(
-            max(1, int(num_hunters * 0.05)),
-            max(1, int(num_hunters * 0.10))
+        num_knights = self.rng.randint(
+            max(1, int(num_hunters * min_ratio)),
+            max(1, int(num_hunters * max_ratio))
         )
         for _ in range(num_knights):
             pos = self._get_random_empty_position()
             knight = Knight(pos)
             self.grid.add_entity(knight, pos)
 
+        self._materialize_perceived_chunks()
+
+    def _place_treasures(self):
+        min_density, max_density = self.treasure_density
+        num_treasures = self.rng.randint(
+            int(self.grid.width * self.grid.height * min_density),
+            int(self.grid.width * self.grid.height * max_density)
+        )
+        treasure_types = self.treasure_sampler.sample_many(num_treasures)
+        for treasure_type in treasure_types:
+            pos = self._get_random_empty_position()
+            treasure = Treasure(pos, treasure_type)
+            self.grid.add_entity(treasure, pos)
+
+    def _materialize_perceived_chunks(self):
+        """Generate the treasure chunks any hunter or knight can see this step"""
+        if self.treasure_field is None:
+            return
+        # Collected first, since materializing adds treasures to the grid
+        actors = [entity for entity in self.grid.entities
+                  if entity.type == EntityType.HUNTER or entity.type == EntityType.KNIGHT]
+        for entity in actors:
+            self.treasure_field.materialize_around(self.grid, entity.position, PERCEPTION_RADIUS)
+
     def _get_random_empty_position(self) -> Tuple[int, int]:
         while True:
-            x = random.randint(0, self.grid.width - 1)
-            y = random.randint(0, self.grid.height - 1)
+            x = self.rng.randint(0, self.grid.width - 1)
+            y = self.rng.randint(0, self.grid.height - 1)
             if self.grid.is_empty((x, y)):
                 return (x, y)
 
-    def step(self):
+    def step(self, max_steps: Optional[int] = None) -> int:
+        """
+        Advance the world and return the number of steps taken. This is 1
+        unless fast-forwarding jumped over a quiescent window, in which case
+        it is at most max_steps.
+        """
+        if self.fast_forward:
+            limit = MAX_FAST_FORWARD if max_steps is None else min(max_steps, MAX_FAST_FORWARD)
+            for policy in self.termination:
+                due = policy.steps_until_due(self)
+                if due is not None:
+                    limit = min(limit, due)
+            window = self.grid.quiescent_window(limit)
+            if window >= MIN_FAST_FORWARD:
+                self.grid.fast_forward(window)
+                self.steps += window
+                self._check_termination()
+                return window
+
+        self._materialize_perceived_chunks()
         self.grid.update()
         self.steps += 1
+        self._check_termination()
+        return 1
+
+    def add_termination_policy(self, policy: TerminationPolicy):
+        policy.reset(self)
+        self.termination.append(policy)
+
+    def _check_termination(self):
+        if self.termination_reason is not None:
+            return
+        for policy in self.termination:
+            reason = policy.check(self)
+            if reason is not None:
+                self.termination_reason = reason
+                return
+
+    def fork(self) -> 'EldoriaSimulation':
+        """
+        An independent copy of the simulation at its current step, e.g. to
+        branch what-if variants off a shared prefix. Event subscribers are
+        not carried over; the child starts with an empty event bus. The
+        child gets a copy of the random generator too, so an unchanged
+        fork replays exactly what the parent would do next.
+        """
+        return copy.deepcopy(self, {id(self.grid.events): EventBus()})
+
+    def collected_treasures(self) -> int:
+        return sum(hideout.treasure_count for hideout in self.hideouts)
 
     def is_running(self) -> bool:
+        if self.termination_reason is not None:
+            return False
+
         # Check if there are still treasures or active hunters
-        has_treasures = any(
-            e.type == EntityType.TREASURE for e in self.grid.entities
+        has_treasures = self.grid.type_counts[EntityType.TREASURE] > 0 or (
+            self.treasure_field is not None and self.treasure_field.has_unexplored_chunks()
         )
-        has_active_hunters = any(
-            e.type == EntityType.HUNTER and e.stamina > 0 for e in self.grid.entities
-        )
-        return has_treasures and has_active_hunters
+        return has_treasures and self.grid.active_hunters > 0
 
-    def get_stats(self) -> dict:
-        stats = {
+    def get_stats(self, settle: bool = False) -> dict:
+        """
+        Entity counts from the grid's counters. Treasures in sleeping chunks
+        are counted until their chunk wakes up; settle=True catches every
+        chunk up first (O(all treasures)) for exact counts.
+        """
+        if settle:
+            self.grid.settle()
+        counts = self.grid.type_counts
+        return {
             'steps': self.steps,
-            'hunters': 0,
-            'active_hunters': 0,
-            'knights': 0,
-            'treasures': 0,
-            'collected_treasures': 0,
-            'hideouts': 0
-        }
-
-        for entity in self.grid.entities:
-            if entity.type == EntityType.HUNTER:
-                stats['hunters'] += 1
-                if entity.stamina > 0:
-                    stats['active_hunters'] += 1
-            elif entity.type == EntityType.KNIGHT:
-                stats['knights'] += 1
-            elif entity.type == EntityType.TREASURE:
-                stats['treasures'] += 1
-            elif entity.type == EntityType.HIDEOUT:
-                stats['hideouts'] += 1
-                stats['collected_treasures'] += len(entity.treasures)
-
-        return stats
\ No newline at end of file
+            'hunters': counts[EntityType.HUNTER],
+            'active_hunters': self.grid.active_hunters,
+            'knights': counts[EntityType.KNIGHT],
+            'treasures': counts[EntityType.TREASURE],
+            'collected_treasures': self.collected_treasures(),
+            'hideouts': counts[EntityType.HIDEOUT],
+        }
\ No newline at end of file
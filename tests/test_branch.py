@@ -0,0 +1,80 @@
+import os
+import unittest
+from batch.branch import run_branches
+from entities.knight import Knight
+from simulation import EldoriaSimulation
+from world.events import EventType
+
+
+def add_knights(count):
+    def variant(sim):
+        for _ in range(count):
+            pos = sim._get_random_empty_position()
+            sim.grid.add_entity(Knight(pos), pos)
+    return variant
+
+
+class TestFork(unittest.TestCase):
+    def setUp(self):
+        self.sim = EldoriaSimulation(16, 16, seed=6, fast_forward=False)
+        for _ in range(10):
+            self.sim.step()
+
+    def test_fork_is_independent(self):
+        child = self.sim.fork()
+        self.assertEqual(child.steps, 10)
+        self.assertEqual(child.grid.state_hash(include_attributes=True),
+                         self.sim.grid.state_hash(include_attributes=True))
+        self.assertIsNot(next(iter(child.grid.entities)), next(iter(self.sim.grid.entities)))
+
+        before = self.sim.grid.state_hash(include_attributes=True)
+        for _ in range(5):
+            child.step()
+        self.assertEqual(self.sim.grid.state_hash(include_attributes=True), before)
+        self.assertEqual(self.sim.steps, 10)
+
+    def test_fork_drops_subscribers(self):
+        self.sim.grid.events.subscribe(EventType.MOVE, lambda batch: None)
+        self.assertFalse(self.sim.fork().grid.events.active)
+
+    def test_fork_continues_like_parent(self):
+        child = self.sim.fork()
+        for _ in range(5):
+            child.step()
+        for _ in range(5):
+            self.sim.step()
+        self.assertEqual(child.grid.state_hash(include_attributes=True),
+                         self.sim.grid.state_hash(include_attributes=True))
+
+
+class TestBranches(unittest.TestCase):
+    def setUp(self):
+        self.sim = EldoriaSimulation(16, 16, seed=6)
+
+    def run_modes(self, **kwargs):
+        modes = [False] + ([True] if hasattr(os, "fork") else [])
+        return [run_branches(self.sim, [None, add_knights(3), None], 20, processes=p, **kwargs)
+                for p in modes]
+
+    def test_variants(self):
+        for results in self.run_modes():
+            self.assertEqual(len(results), 3)
+            self.assertEqual(results[1]['knights'], results[0]['knights'] + 3)
+            # Unchanged branches replay the same random stream
+            self.assertEqual(results[0], results[2])
+        self.assertEqual(self.sim.steps, 0)
+
+    def test_process_and_inline_agree(self):
+        outcomes = self.run_modes(workers=2)
+        self.assertEqual(outcomes[0], outcomes[-1])
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs os.fork")
+    def test_branch_error(self):
+        def broken(sim):
+            raise ValueError("bad variant")
+        with self.assertRaises(RuntimeError):
+            run_branches(self.sim, [broken], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
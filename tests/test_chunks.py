@@ -0,0 +1,156 @@
+import random
+import unittest
+from world.chunks import ChunkedTreasureField, chunks_in_window
+from world.grid import EldoriaGrid
+from world.sparse_grid import SparseEldoriaGrid
+from entities.entity import EntityType
+from entities.knight import Knight
+from entities.treasure import Treasure, TreasureType
+from simulation import EldoriaSimulation
+
+
+def treasure_layout(grid):
+    return sorted(
+        (e.position, e.treasure_type.name) for e in grid.entities
+        if e.type == EntityType.TREASURE
+    )
+
+
+class TestChunkedTreasureField(unittest.TestCase):
+    def test_generation_is_order_independent(self):
+        first_grid = SparseEldoriaGrid(256, 256)
+        first = ChunkedTreasureField(256, 256, seed=42, chunk_size=32)
+        first.materialize_around(first_grid, (10, 10), 3)
+        first.materialize_around(first_grid, (200, 150), 3)
+
+        second_grid = SparseEldoriaGrid(256, 256)
+        second = ChunkedTreasureField(256, 256, seed=42, chunk_size=32)
+        second.materialize_around(second_grid, (200, 150), 3)
+        second.materialize_around(second_grid, (10, 10), 3)
+
+        self.assertEqual(treasure_layout(first_grid), treasure_layout(second_grid))
+        self.assertEqual(first.generated, {(0, 0), (6, 4)})
+
+    def test_window_across_chunk_edge_and_wrap(self):
+        grid = SparseEldoriaGrid(100, 100)
+        field = ChunkedTreasureField(100, 100, seed=1, chunk_size=32)
+        field.materialize_around(grid, (0, 31), 3)
+        # x wraps to the partial last chunk, y crosses into the next chunk
+        self.assertEqual(field.generated, {(0, 0), (0, 1), (3, 0), (3, 1)})
+        self.assertTrue(field.has_unexplored_chunks())
+
+    def test_window_wraps_through_partial_last_chunk(self):
+        # 100 is not a multiple of 32: chunk 3 only spans x 96..99
+        self.assertEqual(chunks_in_window((98, 10), 4, 32, 100, 100), [(0, 0), (2, 0), (3, 0)])
+        self.assertEqual(chunks_in_window((1, 50), 4, 32, 100, 100), [(0, 1), (3, 1)])
+        self.assertEqual(chunks_in_window((5, 5), 60, 32, 100, 100),
+                         [(cx, cy) for cx in range(4) for cy in range(4)])
+
+    def test_chunk_density(self):
+        grid = SparseEldoriaGrid(64, 64)
+        field = ChunkedTreasureField(64, 64, seed=3, density=(0.2, 0.2), chunk_size=32)
+        added = field.materialize_around(grid, (5, 5), 1)
+        self.assertLessEqual(added, int(32 * 32 * 0.2))
+        self.assertGreater(added, 150)
+
+
+class TestLazySimulation(unittest.TestCase):
+    def test_huge_world_starts_with_explored_area_only(self):
+        sim = EldoriaSimulation(100000, 100000, lazy_treasures=True, seed=5)
+        self.assertIsInstance(sim.grid, SparseEldoriaGrid)
+        self.assertLess(len(sim.treasure_field.generated), 50)
+        self.assertLess(len(sim.grid.entities), 50 * 32 * 32)
+        self.assertTrue(sim.treasure_field.has_unexplored_chunks())
+
+    def test_seed_leaves_global_random_alone(self):
+        random.seed(4)
+        expected = random.random()
+        random.seed(4)
+        EldoriaSimulation(200, 200, lazy_treasures=True, seed=11).step()
+        self.assertEqual(random.random(), expected)
+
+    def test_same_seed_same_world(self):
+        first = EldoriaSimulation(200, 200, lazy_treasures=True, seed=11)
+        second = EldoriaSimulation(200, 200, lazy_treasures=True, seed=11)
+        self.assertEqual(treasure_layout(first.grid), treasure_layout(second.grid))
+
+
+class TestChunkSleeping(unittest.TestCase):
+    def setUp(self):
+        self.grid = EldoriaGrid(64, 64)
+        self.near = Treasure((3, 3), TreasureType.GOLD)
+        self.far = Treasure((40, 40), TreasureType.SILVER)
+        self.grid.add_entity(self.near, (3, 3))
+        self.grid.add_entity(self.far, (40, 40))
+        self.knight = Knight((1, 1))
+        self.knight.energy = 10.0  # Stays put
+        self.grid.add_entity(self.knight, (1, 1))
+        self.grid.enable_chunk_sleeping(chunk_size=16, radius=4)
+
+    def test_far_chunks_sleep_and_catch_up(self):
+        for _ in range(10):
+            self.grid.update()
+        self.assertAlmostEqual(self.near.value, 100.0 * 0.999 ** 10)
+        self.assertEqual(self.far.value, 100.0)
+
+        self.grid.settle()
+        self.assertAlmostEqual(self.far.value, 100.0 * 0.999 ** 10)
+
+    def test_wakes_when_approached(self):
+        for _ in range(5):
+            self.grid.update()
+        self.grid.move_entity((1, 1), (38, 38))
+        self.grid.update()
+        self.assertAlmostEqual(self.far.value, 100.0 * 0.999 ** 6)
+
+    def test_expired_treasures_removed_on_wake(self):
+        self.far.value = 0.1002
+        for _ in range(5):
+            self.grid.update()
+        self.assertIn(self.far, self.grid.entities)
+        self.grid.settle()
+        self.assertNotIn(self.far, self.grid.entities)
+        self.assertTrue(self.grid.is_empty((40, 40)))
+
+    def test_reads_do_not_wake_chunks(self):
+        self.far.value = 0.1002
+        awake = EldoriaGrid(64, 64)
+        for treasure in (self.near, self.far):
+            copy = Treasure(treasure.position, treasure.treasure_type)
+            copy.value = treasure.value
+            awake.add_entity(copy, copy.position)
+        knight = Knight((1, 1))
+        knight.energy = 10.0
+        awake.add_entity(knight, (1, 1))
+        for _ in range(5):
+            self.grid.update()
+            awake.update()
+
+        self.assertEqual(self.grid.state_hash(include_attributes=True),
+                         awake.state_hash(include_attributes=True))
+        self.assertEqual(self.far.value, 0.1002)
+        self.assertIn(self.far, self.grid.entities)
+
+    def test_actor_in_partial_last_chunk_wakes_it(self):
+        grid = EldoriaGrid(100, 100)
+        inside = Treasure((97, 12), TreasureType.GOLD)
+        across = Treasure((1, 10), TreasureType.GOLD)
+        for treasure in (inside, across):
+            grid.add_entity(treasure, treasure.position)
+        knight = Knight((98, 10))
+        knight.energy = 10.0
+        grid.add_entity(knight, (98, 10))
+        grid.enable_chunk_sleeping(chunk_size=32, radius=4)
+        grid.update()
+        self.assertAlmostEqual(inside.value, 100.0 * 0.999)
+        self.assertAlmostEqual(across.value, 100.0 * 0.999)
+
+    def test_simulation_option(self):
+        sim = EldoriaSimulation(64, 64, seed=3, chunk_sleeping=True)
+        self.assertIsNotNone(sim.grid.activity)
+        sim.step()
+        self.assertEqual(sim.get_stats()['steps'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import random
+import unittest
+from analysis.equivalence import EquivalenceHarness, fuzz, world_state, diff_states
+from simulation import EldoriaSimulation
+
+
+class TestEquivalence(unittest.TestCase):
+    def assertEquivalent(self, candidate, steps=40, seeds=range(2), compare_every=1):
+        coverage = {}
+        failures = fuzz(candidate, steps=steps, seeds=seeds, compare_every=compare_every,
+                        coverage=coverage)
+        self.assertEqual(failures, [], "\n".join(str(f) for f in failures))
+        self.assertGreater(coverage['hunter_moves'], 0)
+        return coverage
+
+    def test_sparse_backend(self):
+        self.assertEquivalent({'backend': 'sparse', 'fast_forward': False})
+
+    def test_fast_forward(self):
+        # Jumps need compared steps far enough apart, and time for hunters to tire
+        coverage = self.assertEquivalent({'backend': 'dense', 'fast_forward': True},
+                                         steps=150, seeds=range(1), compare_every=10)
+        self.assertGreater(coverage['jumps'], 0)
+
+    def test_chunk_sleeping(self):
+        coverage = self.assertEquivalent({'backend': 'sparse', 'fast_forward': True,
+                                          'chunk_sleeping': True, 'chunk_size': 8},
+                                         steps=150, seeds=range(1), compare_every=5)
+        self.assertGreater(coverage['jumps'], 0)
+        self.assertGreater(coverage['naps'], 0)
+
+    def test_reports_first_divergence(self):
+        harness = EquivalenceHarness(3, {'backend': 'dense', 'knight_ratio': (1.0, 1.0),
+                                         'hunters_per_hideout': (3, 3)}, limit=3)
+        divergence = harness.run(10)
+        self.assertIsNotNone(divergence)
+        self.assertEqual(divergence.step, 0)
+        self.assertEqual(len(divergence.differences), 3)
+        self.assertIn("Diverged at step 0", str(divergence))
+
+    def test_diff_tolerates_rounding(self):
+        sim = EldoriaSimulation(12, 12, seed=1)
+        state = world_state(sim)
+        key = next(k for k in state if k[-1] == 'TREASURE')
+        nudged = {k: dict(v) for k, v in state.items()}
+        nudged[key]['value'] *= 1 + 1e-12
+        self.assertEqual(diff_states(state, nudged), [])
+        nudged[key]['value'] *= 1.01
+        self.assertEqual(len(diff_states(state, nudged)), 1)
+
+    def test_outer_random_state_preserved(self):
+        random.seed(99)
+        expected = random.random()
+        random.seed(99)
+        EquivalenceHarness(5, {'backend': 'sparse'}).run(5)
+        self.assertEqual(random.random(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
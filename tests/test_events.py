@@ -0,0 +1,61 @@
+import unittest
+from world.grid import EldoriaGrid
+from world.events import EventType
+from entities.treasure import Treasure, TreasureType
+from entities.knight import Knight
+from entities.hunter import TreasureHunter, HunterSkill
+
+
+class TestEventBus(unittest.TestCase):
+    def setUp(self):
+        self.grid = EldoriaGrid(10, 10)
+        self.batches = []
+
+    def record(self, batch):
+        self.batches.append(batch)
+
+    def test_no_subscribers_buffers_nothing(self):
+        self.grid.add_entity(Knight((2, 2)), (2, 2))
+        self.grid.move_entity((2, 2), (3, 2))
+        self.assertFalse(self.grid.events.active)
+        self.assertEqual(self.grid.events.pending(), 0)
+
+    def test_moves_batched_per_step(self):
+        self.grid.events.subscribe(EventType.MOVE, self.record)
+        for x in range(3):
+            self.grid.add_entity(Knight((x, 5)), (x, 5))
+        self.grid.update()
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(len(self.batches[0]), 3)
+        event = self.batches[0][0]
+        self.assertEqual(event.type, EventType.MOVE)
+        self.assertEqual(event.step, 0)
+        self.assertEqual(event.position, event.entity.position)
+
+        self.grid.events.unsubscribe(EventType.MOVE, self.record)
+        self.grid.update()
+        self.assertEqual(len(self.batches), 1)
+
+    def test_expire(self):
+        self.grid.events.subscribe([EventType.EXPIRE, EventType.DEATH], self.record)
+        treasure = Treasure((4, 4), TreasureType.GOLD)
+        treasure.value = 0.1
+        self.grid.add_entity(treasure, (4, 4))
+        self.grid.update()
+        self.assertEqual([(e.type, e.position) for e in self.batches[0]],
+                         [(EventType.EXPIRE, (4, 4))])
+
+    def test_knight_interaction(self):
+        self.grid.events.subscribe([EventType.DETAIN, EventType.CHALLENGE], self.record)
+        knight = Knight((1, 1))
+        hunter = TreasureHunter((1, 2), HunterSkill.STEALTH)
+        knight._interact_with_hunter(hunter, self.grid)
+        self.grid.events.dispatch()
+        event = self.batches[0][0]
+        self.assertIn(event.type, (EventType.DETAIN, EventType.CHALLENGE))
+        self.assertIs(event.entity, knight)
+        self.assertIs(event.data, hunter)
+
+
+if __name__ == "__main__":
+    unittest.main()
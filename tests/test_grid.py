@@ -1,6 +1,8 @@
 import unittest
 from world.grid import EldoriaGrid
 from entities.entity import Entity, EntityType
+from entities.treasure import Treasure, TreasureType
+from simulation import EldoriaSimulation
 
 
 class TestEldoriaGrid(unittest.TestCase):
@@ -29,5 +31,37 @@ class TestEldoriaGrid(unittest.TestCase):
         self.assertEqual(self.grid.get_entity((9, 9)), self.entity)
 
 
+
+class TestTreasureValueTotals(unittest.TestCase):
+    def scanned(self, grid):
+        totals = {t: 0.0 for t in TreasureType}
+        for entity in grid.entities:
+            if entity.type == EntityType.TREASURE:
+                totals[entity.treasure_type] += entity.value_after(grid.lag(entity))
+        return totals
+
+    def assertTotalsMatch(self, grid):
+        totals = grid.treasure_values.totals()
+        for treasure_type, expected in self.scanned(grid).items():
+            self.assertAlmostEqual(totals[treasure_type], expected, places=6)
+
+    def test_add_and_remove(self):
+        grid = EldoriaGrid(10, 10)
+        gold = Treasure((1, 1), TreasureType.GOLD)
+        grid.add_entity(gold, (1, 1))
+        grid.update()
+        grid.add_entity(Treasure((2, 2), TreasureType.GOLD), (2, 2))
+        self.assertAlmostEqual(grid.treasure_values.totals()[TreasureType.GOLD], 199.9)
+        grid.remove_entity((1, 1))
+        self.assertAlmostEqual(grid.treasure_values.totals()[TreasureType.GOLD], 100.0)
+
+    def test_follows_long_runs(self):
+        sim = EldoriaSimulation(40, 40, seed=5, chunk_sleeping=True, chunk_size=8, fast_forward=True)
+        while sim.steps < 2500:
+            sim.step()
+            if sim.steps % 250 == 0:
+                self.assertTotalsMatch(sim.grid)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
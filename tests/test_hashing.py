@@ -0,0 +1,71 @@
+import unittest
+from functools import reduce
+from world.grid import EldoriaGrid
+from world.hashing import cell_key
+from entities.treasure import Treasure, TreasureType
+from entities.knight import Knight
+from entities.hunter import TreasureHunter, HunterSkill
+from simulation import EldoriaSimulation
+
+
+def recomputed_hash(grid):
+    return reduce(lambda h, e: h ^ cell_key(e.position, e.type), grid.entities, 0)
+
+
+class TestStateHash(unittest.TestCase):
+    def test_incremental_updates(self):
+        grid = EldoriaGrid(10, 10)
+        empty = grid.state_hash()
+        grid.add_entity(Treasure((1, 1), TreasureType.GOLD), (1, 1))
+        grid.add_entity(Knight((2, 2)), (2, 2))
+        with_knight = grid.state_hash()
+        self.assertNotEqual(with_knight, empty)
+
+        grid.move_entity((2, 2), (3, 2))
+        self.assertNotEqual(grid.state_hash(), with_knight)
+        grid.move_entity((3, 2), (2, 2))
+        self.assertEqual(grid.state_hash(), with_knight)
+
+        grid.remove_entity((1, 1))
+        grid.remove_entity((2, 2))
+        self.assertEqual(grid.state_hash(), empty)
+
+    def test_attributes(self):
+        grid = EldoriaGrid(10, 10)
+        treasure = Treasure((1, 1), TreasureType.GOLD)
+        grid.add_entity(treasure, (1, 1))
+        before = grid.state_hash(include_attributes=True)
+        treasure.value *= 0.5
+        self.assertEqual(grid.state_hash(), grid.zobrist)
+        self.assertNotEqual(grid.state_hash(include_attributes=True), before)
+
+    def test_kinds_and_carried_treasure(self):
+        def world(treasure_type, skill, carrying):
+            grid = EldoriaGrid(10, 10)
+            grid.add_entity(Treasure((1, 1), treasure_type), (1, 1))
+            hunter = TreasureHunter((4, 4), skill)
+            hunter.carrying = carrying
+            grid.add_entity(hunter, (4, 4))
+            return grid.state_hash(include_attributes=True)
+
+        base = world(TreasureType.GOLD, HunterSkill.STEALTH, None)
+        self.assertEqual(world(TreasureType.GOLD, HunterSkill.STEALTH, None), base)
+        variants = [world(TreasureType.BRONZE, HunterSkill.STEALTH, None),
+                    world(TreasureType.GOLD, HunterSkill.NAVIGATION, None),
+                    world(TreasureType.GOLD, HunterSkill.STEALTH, Treasure((0, 0), TreasureType.GOLD)),
+                    world(TreasureType.GOLD, HunterSkill.STEALTH, Treasure((0, 0), TreasureType.SILVER))]
+        self.assertEqual(len({base, *variants}), 5)
+
+    def test_matches_across_backends_and_runs(self):
+        hashes = []
+        for backend in ("dense", "sparse", "dense"):
+            sim = EldoriaSimulation(24, 18, backend=backend, seed=4, fast_forward=False)
+            for _ in range(30):
+                sim.step()
+                self.assertEqual(sim.grid.state_hash(), recomputed_hash(sim.grid))
+            hashes.append(sim.grid.state_hash(include_attributes=True))
+        self.assertEqual(len(set(hashes)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
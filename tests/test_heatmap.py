@@ -0,0 +1,73 @@
+import unittest
+
+try:
+    import numpy as np
+    from analysis.heatmap import HeatmapRecorder
+except ImportError:
+    np = None
+
+from world.grid import EldoriaGrid
+from world.events import EventType
+from entities.knight import Knight
+from entities.hunter import TreasureHunter, HunterSkill
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestHeatmapRecorder(unittest.TestCase):
+    def setUp(self):
+        self.grid = EldoriaGrid(8, 6)
+
+    def test_visits_and_stamina(self):
+        heatmap = HeatmapRecorder(self.grid)
+        self.grid.add_entity(TreasureHunter((1, 1), HunterSkill.STEALTH), (1, 1))
+        self.grid.add_entity(Knight((5, 4)), (5, 4))
+        self.grid.move_entity((1, 1), (2, 1))
+        self.grid.move_entity((5, 4), (5, 5))
+        self.grid.update()
+
+        visits = heatmap.layer('visits')
+        self.assertEqual(visits.shape, (6, 8))
+        self.assertEqual(visits[1, 2], 1)
+        self.assertGreaterEqual(visits.sum(), 2)
+        self.assertEqual(heatmap.layer('stamina')[1, 2], 2)
+
+    def test_interactions(self):
+        heatmap = HeatmapRecorder(self.grid)
+        knight = Knight((3, 3))
+        knight.position = (3, 3)
+        knight._interact_with_hunter(TreasureHunter((3, 3), HunterSkill.NAVIGATION), self.grid)
+        self.grid.events.dispatch()
+        self.assertEqual(heatmap.layer('interactions')[3, 3], 1)
+        self.assertIn(heatmap.layer('stamina')[3, 3], (5, 20))
+
+    def test_decay(self):
+        heatmap = HeatmapRecorder(self.grid, decay=0.5)
+        self.grid.events.emit(EventType.PICKUP, 0, None, (2, 2))
+        self.grid.events.dispatch()
+        self.assertEqual(heatmap.layer('pickups')[2, 2], 1)
+        self.grid.time = 3
+        self.assertAlmostEqual(heatmap.layer('pickups')[2, 2], 0.125)
+
+        # Far-apart steps rescale instead of overflowing
+        self.grid.time = 2000
+        self.grid.events.emit(EventType.PICKUP, 2000, None, (2, 2))
+        self.grid.events.dispatch()
+        self.assertAlmostEqual(heatmap.layer('pickups')[2, 2], 1)
+
+    def test_window(self):
+        heatmap = HeatmapRecorder(self.grid, window=2)
+        for step in range(4):
+            self.grid.time = step
+            self.grid.events.emit(EventType.PICKUP, step, None, (step, 0))
+            self.grid.events.dispatch()
+        self.grid.time = 4
+        self.assertEqual(heatmap.layer('pickups')[0].tolist(), [0, 0, 1, 1, 0, 0, 0, 0])
+
+    def test_close_unsubscribes(self):
+        heatmap = HeatmapRecorder(self.grid)
+        heatmap.close()
+        self.assertFalse(self.grid.events.active)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import random
+from collections import Counter
+from entities.hunter import HunterSkill
+from utils import helpers
+from utils.helpers import (
+    get_offset_stencil, get_adjacent_positions, get_positions_in_radius,
+    calculate_wrapped_distance, wrapped_distances, pairwise_wrapped_distances,
+    nearest_index, enum_members, random_enum_value, WeightedSampler
+)
+
+
+class TestNeighbourhoods(unittest.TestCase):
+    def test_stencils_are_cached(self):
+        self.assertIs(get_offset_stencil(3), get_offset_stencil(3))
+        self.assertEqual(len(get_offset_stencil(3)), 48)
+        self.assertEqual(len(get_offset_stencil(2, "manhattan")), 12)
+        self.assertNotIn((0, 0), get_offset_stencil(1))
+        with self.assertRaises(ValueError):
+            get_offset_stencil(1, "euclid")
+
+    def test_adjacent_positions_wrap(self):
+        positions = get_adjacent_positions((0, 0), 10, 10)
+        self.assertEqual(len(positions), 8)
+        self.assertIn((9, 9), positions)
+        self.assertIn((1, 0), positions)
+
+    def test_positions_in_radius(self):
+        positions = get_positions_in_radius((5, 5), 2, 10, 10)
+        self.assertIn((7, 5), positions)
+        self.assertNotIn((7, 6), positions)
+
+
+class TestBatchDistances(unittest.TestCase):
+    def setUp(self):
+        self.positions = [(x * 7 % 50, x * 13 % 40) for x in range(60)]
+
+    def test_one_to_many_matches_scalar(self):
+        distances = wrapped_distances((3, 4), self.positions, 50, 40)
+        for pos, dist in zip(self.positions, distances):
+            self.assertAlmostEqual(dist, calculate_wrapped_distance((3, 4), pos, 50, 40))
+
+    def test_many_to_many_shape(self):
+        matrix = pairwise_wrapped_distances(self.positions[:3], self.positions, 50, 40)
+        self.assertEqual(len(matrix), 3)
+        self.assertEqual(len(matrix[0]), len(self.positions))
+        self.assertAlmostEqual(matrix[2][5],
+                               calculate_wrapped_distance(self.positions[2], self.positions[5], 50, 40))
+
+    def test_nearest_index(self):
+        self.assertIsNone(nearest_index((0, 0), [], 10, 10))
+        self.assertEqual(nearest_index((0, 0), [(5, 5), (9, 9), (1, 9)], 10, 10), 1)
+        expected = min(range(len(self.positions)),
+                       key=lambda i: calculate_wrapped_distance((0, 0), self.positions[i], 50, 40))
+        self.assertEqual(nearest_index((0, 0), self.positions, 50, 40), expected)
+
+    def batch_results(self):
+        return (
+            [float(d) for d in wrapped_distances((0, 0), [(9, 0), (3, 4), (6, 32)], 50, 40)],
+            [[float(d) for d in row]
+             for row in pairwise_wrapped_distances([(0, 0), (49, 39)], [(9, 0), (3, 4)], 50, 40)],
+            nearest_index((0, 0), self.positions, 50, 40),
+            nearest_index((17, 3), self.positions, 50, 40),
+        )
+
+    def test_without_numpy(self):
+        with_numpy = self.batch_results()
+        saved = helpers.np
+        helpers.np = None
+        try:
+            self.assertIsInstance(wrapped_distances((0, 0), self.positions, 50, 40), list)
+            without_numpy = self.batch_results()
+        finally:
+            helpers.np = saved
+
+        distances, matrix, nearest, _ = without_numpy
+        self.assertEqual(distances, [9.0, 5.0, 10.0])
+        self.assertEqual(matrix[0], [9.0, 5.0])
+        self.assertAlmostEqual(matrix[1][1], 41 ** 0.5)
+        self.assertEqual(nearest, 0)  # (0, 0) itself is the first position
+        # The vectorized results (when numpy is installed) agree
+        self.assertEqual(with_numpy[:2], without_numpy[:2])
+        self.assertEqual(with_numpy[2:], without_numpy[2:])
+
+
+class TestWeightedSampler(unittest.TestCase):
+    def test_distribution(self):
+        sampler = WeightedSampler({"a": 1.0, "b": 3.0, "c": 0.0}, rng=random.Random(1))
+        counts = Counter(sampler.sample() for _ in range(20000))
+        self.assertEqual(counts["c"], 0)
+        self.assertAlmostEqual(counts["b"] / 20000, 0.75, delta=0.02)
+
+    def test_sample_many(self):
+        sampler = WeightedSampler({"a": 2.0, "b": 2.0, "c": 4.0}, rng=random.Random(2))
+        draws = sampler.sample_many(40000)
+        self.assertEqual(len(draws), 40000)
+        self.assertAlmostEqual(Counter(draws)["c"] / 40000, 0.5, delta=0.02)
+
+    def test_reproducible_from_rng(self):
+        weights = {"a": 1.0, "b": 2.0}
+        first = WeightedSampler(weights, rng=random.Random(3)).sample_many(100)
+        second = WeightedSampler(weights, rng=random.Random(3)).sample_many(100)
+        self.assertEqual(first, second)
+
+    def test_invalid_weights(self):
+        with self.assertRaises(ValueError):
+            WeightedSampler({})
+        with self.assertRaises(ValueError):
+            WeightedSampler({"a": 0.0})
+
+    def test_enum_members_cached(self):
+        self.assertIs(enum_members(HunterSkill), enum_members(HunterSkill))
+        self.assertEqual(enum_members(HunterSkill)[0], HunterSkill.NAVIGATION)
+        self.assertIn(random_enum_value(HunterSkill), enum_members(HunterSkill))
+
+
+if __name__ == "__main__":
+    unittest.main()
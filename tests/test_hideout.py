@@ -0,0 +1,146 @@
+import unittest
+from entities.hideout import Hideout
+from entities.hunter import TreasureHunter, HunterSkill
+from entities.treasure import Treasure, TreasureType
+from world.grid import EldoriaGrid
+from simulation import EldoriaSimulation
+
+
+class TestHideoutTreasures(unittest.TestCase):
+    def setUp(self):
+        self.gold = Treasure((1, 1), TreasureType.GOLD)
+        self.bronze = Treasure((2, 2), TreasureType.BRONZE)
+        self.bronze.value = 50.0
+
+    def test_aggregates_without_retaining_treasures(self):
+        hideout = Hideout((0, 0))
+        hideout.add_treasure(self.gold, 3)
+        hideout.add_treasure(self.bronze, 7)
+
+        self.assertEqual(hideout.treasure_count, 2)
+        self.assertEqual(hideout.type_counts[TreasureType.GOLD], 1)
+        self.assertEqual(hideout.type_counts[TreasureType.SILVER], 0)
+        self.assertAlmostEqual(hideout.type_values[TreasureType.BRONZE], 50.0)
+        self.assertAlmostEqual(hideout.total_value, 150.0)
+        self.assertIsNone(hideout.treasures)
+        self.assertIsNone(hideout.deposit_steps)
+
+    def test_timestamp_history(self):
+        hideout = Hideout((0, 0), history='timestamps')
+        hideout.add_treasure(self.gold, 3)
+        hideout.add_treasure(self.bronze, 7)
+        self.assertEqual(list(hideout.deposit_steps), [3, 7])
+        self.assertIsNone(hideout.treasures)
+
+    def test_full_history(self):
+        hideout = Hideout((0, 0), history='full')
+        hideout.add_treasure(self.gold, 3)
+        self.assertEqual(hideout.treasures, [self.gold])
+        self.assertEqual(list(hideout.deposit_steps), [3])
+
+    def test_unknown_history_mode(self):
+        with self.assertRaises(ValueError):
+            Hideout((0, 0), history='everything')
+
+
+class TestHideoutAssignment(unittest.TestCase):
+    def setUp(self):
+        self.grid = EldoriaGrid(20, 20)
+        self.hideout = Hideout((10, 10))
+        self.grid.add_entity(self.hideout, (10, 10))
+
+        self.near = Treasure((3, 3), TreasureType.SILVER)
+        self.far = Treasure((16, 16), TreasureType.SILVER)
+        for treasure in (self.near, self.far):
+            self.grid.add_entity(treasure, treasure.position)
+
+        self.first = TreasureHunter((2, 2), HunterSkill.NAVIGATION)
+        self.second = TreasureHunter((17, 17), HunterSkill.ENDURANCE)
+        for hunter in (self.first, self.second):
+            self.grid.add_entity(hunter, hunter.position)
+            self.hideout.add_hunter(hunter)
+        # Only the first hunter has seen the treasures; sharing spreads them
+        self.first.memory['treasures'][self.near.position] = self.near
+        self.first.memory['treasures'][self.far.position] = self.far
+
+    def test_hunters_get_distinct_nearby_treasures(self):
+        self.hideout.update(self.grid)
+        self.assertIs(self.first.target, self.near)
+        self.assertIs(self.second.target, self.far)
+
+        self.first.update(self.grid)
+        self.second.update(self.grid)
+        self.assertEqual(self.first.position, (2, 3))
+        self.assertEqual(self.second.position, (17, 16))
+
+    def test_busy_hunters_are_not_assigned(self):
+        self.second.resting = True
+        self.hideout.update(self.grid)
+        self.assertIsNone(self.second.target)
+        # The nearer treasure is worth more per step to the remaining hunter
+        self.assertIs(self.first.target, self.near)
+
+    def test_more_hunters_than_treasures(self):
+        self.grid.remove_entity(self.far.position)
+        self.hideout.update(self.grid)
+        self.assertIs(self.first.target, self.near)
+        self.assertIsNone(self.second.target)
+        self.assertEqual(self.second.claimed, {self.near.position})
+
+    def test_fallback_skips_claimed_treasures(self):
+        hunter = TreasureHunter((5, 16), HunterSkill.STEALTH)
+        self.grid.add_entity(hunter, (5, 16))
+        self.far.value = 50.0
+        hunter.memory['treasures'][self.near.position] = self.near
+        hunter.memory['treasures'][self.far.position] = self.far
+        hunter.claimed = frozenset([self.near.position])
+        hunter.update(self.grid)
+        # Heads for the cheaper treasure (west across the wrap), not the claimed one
+        self.assertEqual(hunter.position, (4, 16))
+
+    def test_stale_target_is_dropped(self):
+        self.hideout.update(self.grid)
+        self.grid.remove_entity(self.far.position)
+        self.second.update(self.grid)
+        self.assertIsNone(self.second.target)
+
+
+class TestAssignmentInSimulation(unittest.TestCase):
+    def run_world(self, seed, assign, steps=150):
+        sim = EldoriaSimulation(20, 20, seed=seed, hunters_per_hideout=(3, 3))
+        for hideout in sim.hideouts:
+            hideout.assign_targets = assign
+        shared = 0
+        while sim.steps < steps and sim.is_running():
+            sim.step()
+            for hideout in sim.hideouts:
+                targets = [id(h.target) for h in hideout.hunters if h.target is not None]
+                self.assertEqual(len(targets), len(set(targets)))
+                shared += len(targets) > 1
+        return sim.collected_treasures(), shared
+
+    def test_hunters_spread_and_collect_more(self):
+        assigned = [self.run_world(seed, True) for seed in range(3)]
+        unassigned = [self.run_world(seed, False) for seed in range(3)]
+        # Several members of a hideout were out on distinct targets at once
+        self.assertGreater(sum(shared for _, shared in assigned), 0)
+        self.assertGreater(sum(collected for collected, _ in assigned),
+                           sum(collected for collected, _ in unassigned))
+
+    def test_only_placed_hunters_are_enlisted(self):
+        # A hideout has four neighbour cells, so a fifth hunter has no spawn
+        sim = EldoriaSimulation(30, 30, seed=3, hunters_per_hideout=(5, 5))
+        for hideout in sim.hideouts:
+            self.assertLessEqual(len(hideout.hunters), 4)
+            for hunter in hideout.hunters:
+                self.assertIs(sim.grid.get_entity(hunter.position), hunter)
+        for _ in range(30):
+            sim.step()
+            for hideout in sim.hideouts:
+                for hunter in hideout.hunters:
+                    if hunter.target is not None:
+                        self.assertIs(sim.grid.get_entity(hunter.position), hunter)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -83,6 +83,17 @@ class TestTreasureHunter(unittest.TestCase):
         self.assertIn((12, 12), self.hunter.memory['treasures'])
         self.assertIn((15, 15), self.hunter.memory['hideouts'])
 
+    def test_nearest_hideout(self):
+        far_hideout = Hideout((1, 1))
+        self.grid.add_entity(far_hideout, (1, 1))
+        self.hunter.memory['hideouts'][(15, 15)] = self.hideout
+        self.hunter.memory['hideouts'][(1, 1)] = far_hideout
+        self.assertIs(self.hunter._find_nearest_hideout(self.grid), self.hideout)
+
+        # Wrapping makes (1, 1) the closer one from the far corner
+        self.hunter.position = (19, 19)
+        self.assertIs(self.hunter._find_nearest_hideout(self.grid), far_hideout)
+
     def test_hunter_collapse(self):
         # Test hunter collapse when stamina reaches 0
         self.hunter.stamina = 0.0
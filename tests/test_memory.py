@@ -0,0 +1,87 @@
+import unittest
+from entities.memory import HunterMemory
+from entities.entity import EntityType
+from entities.hunter import TreasureHunter, HunterSkill
+from entities.hideout import Hideout
+from entities.knight import Knight
+from entities.treasure import Treasure, TreasureType
+from world.grid import EldoriaGrid
+
+
+class TestHunterMemory(unittest.TestCase):
+    def setUp(self):
+        self.memory = HunterMemory(capacity=3, ttl=10)
+        self.treasures = [Treasure((i, 0), TreasureType.GOLD) for i in range(5)]
+
+    def test_capacity_evicts_least_recently_seen(self):
+        for i, treasure in enumerate(self.treasures[:3]):
+            self.memory.advance(i)
+            self.memory['treasures'][(i, 0)] = treasure
+        # Refresh the oldest entry, then overflow
+        self.memory['treasures'][(0, 0)] = self.treasures[0]
+        self.memory['treasures'][(3, 0)] = self.treasures[3]
+        self.assertEqual(set(self.memory['treasures']), {(0, 0), (2, 0), (3, 0)})
+
+    def test_ttl_expiry(self):
+        self.memory['treasures'][(0, 0)] = self.treasures[0]
+        self.memory.advance(10)
+        self.assertIn((0, 0), self.memory['treasures'])
+        self.memory.advance(11)
+        self.assertNotIn((0, 0), self.memory['treasures'])
+        self.assertFalse(self.memory['treasures'])
+        self.assertEqual(self.memory.size(), 0)
+
+    def test_merge_keeps_freshest_sighting(self):
+        other = HunterMemory(capacity=3, ttl=10)
+        self.memory['knights'][(1, 1)] = self.treasures[0]
+        other.advance(5)
+        other['knights'][(1, 1)] = self.treasures[1]
+        self.memory.advance(5)
+        self.memory.merge(other)
+        self.assertIs(self.memory['knights'][(1, 1)], self.treasures[1])
+        self.assertEqual(self.memory['knights'].last_seen((1, 1)), 5)
+
+        # An older sighting never overwrites a newer one
+        stale = HunterMemory(capacity=3, ttl=10)
+        stale['knights'][(1, 1)] = self.treasures[2]
+        self.memory.merge(stale)
+        self.assertIs(self.memory['knights'][(1, 1)], self.treasures[1])
+
+
+class TestHunterMemoryInWorld(unittest.TestCase):
+    def setUp(self):
+        self.grid = EldoriaGrid(20, 20)
+        self.hunter = TreasureHunter((10, 10), HunterSkill.STEALTH)
+        self.grid.add_entity(self.hunter, (10, 10))
+
+    def test_scan_records_knights_and_forgets_empty_cells(self):
+        knight = Knight((11, 11))
+        self.grid.add_entity(knight, (11, 11))
+        self.hunter._update_memory(self.grid)
+        self.assertIs(self.hunter.memory['knights'][(11, 11)], knight)
+
+        self.grid.remove_entity((11, 11))
+        self.hunter._update_memory(self.grid)
+        self.assertNotIn((11, 11), self.hunter.memory['knights'])
+
+    def test_stale_treasure_is_dropped_when_targeted(self):
+        treasure = Treasure((18, 18), TreasureType.GOLD)
+        self.hunter.memory['treasures'][(18, 18)] = treasure
+        self.hunter._search_for_treasure(self.grid)
+        self.assertNotIn((18, 18), self.hunter.memory['treasures'])
+
+    def test_sharing_is_bounded(self):
+        hideout = Hideout((0, 0))
+        members = [TreasureHunter((0, 0), HunterSkill.NAVIGATION, memory_capacity=4)
+                   for _ in range(3)]
+        for i, member in enumerate(members):
+            hideout.add_hunter(member)
+            for j in range(4):
+                member.memory['treasures'][(i, j)] = Treasure((i, j), TreasureType.BRONZE)
+        hideout._share_information()
+        for member in members:
+            self.assertEqual(len(member.memory['treasures']), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+    from analysis.metrics import MetricsRecorder, load_metrics
+except ImportError:
+    np = None
+
+from simulation import EldoriaSimulation
+from entities.hunter import TreasureHunter, HunterSkill
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestMetricsRecorder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        # Only the two hunters added below, so their stamina is known
+        self.sim = EldoriaSimulation(15, 15, seed=2, hunters_per_hideout=(0, 0))
+        for stamina in [50.0, 0.0]:
+            pos = self.sim._get_random_empty_position()
+            hunter = TreasureHunter(pos, HunterSkill.ENDURANCE)
+            hunter.stamina = stamina
+            hunter.resting = True
+            self.sim.grid.add_entity(hunter, pos)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_chunks_roundtrip(self):
+        with MetricsRecorder(self.tmp.name, chunk_size=4) as recorder:
+            recorder.record(self.sim)
+            for _ in range(9):
+                self.sim.step()
+                recorder.record(self.sim)
+        self.assertEqual(recorder.chunks_written, 3)
+
+        columns = load_metrics(self.tmp.name)
+        np.testing.assert_array_equal(columns['step'], np.arange(10))
+        self.assertEqual(columns['active_hunters'][0], 1)
+        self.assertEqual(columns['stamina_min'][0], 0.0)
+        self.assertAlmostEqual(columns['stamina_p50'][0], 25.0)
+        treasure_value = sum(columns[f'value_{name}'][0] for name in ('bronze', 'silver', 'gold'))
+        self.assertAlmostEqual(treasure_value, 100.0 * columns['treasures'][0])
+
+    def test_downsampling(self):
+        recorder = MetricsRecorder(self.tmp.name, every=2, max_rows=3)
+        for _ in range(30):
+            self.sim.step()
+            recorder.record(self.sim)
+        recorder.close()
+        steps = load_metrics(self.tmp.name)['step']
+        self.assertEqual(list(steps[:4]), [1, 3, 5, 9])
+        self.assertEqual(recorder.every, 8)
+
+    def test_reused_directory_starts_empty(self):
+        with MetricsRecorder(self.tmp.name, chunk_size=2) as recorder:
+            for _ in range(6):
+                self.sim.step()
+                recorder.record(self.sim)
+        with MetricsRecorder(self.tmp.name, chunk_size=2) as recorder:
+            recorder.record(self.sim)
+        self.assertEqual(list(load_metrics(self.tmp.name)['step']), [self.sim.steps])
+
+    def test_record_leaves_chunks_asleep(self):
+        sim = EldoriaSimulation(40, 40, seed=3, chunk_sleeping=True, chunk_size=8,
+                                hunters_per_hideout=(0, 0))
+        for _ in range(5):
+            sim.step()
+        asleep = dict(sim.grid.activity.asleep_since)
+        self.assertTrue(asleep)
+        with MetricsRecorder(self.tmp.name) as recorder:
+            recorder.record(sim)
+        self.assertEqual(sim.grid.activity.asleep_since, asleep)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from gui.pacing import StepPacer
+
+
+class TestStepPacer(unittest.TestCase):
+    def test_fixed_batch(self):
+        pacer = StepPacer(steps_per_frame=5)
+        pacer.record_frame(5, 0.001, 0.1)
+        self.assertEqual(pacer.steps_per_frame, 5)
+        self.assertAlmostEqual(pacer.steps_per_second, 50.0)
+
+    def test_auto_tunes_to_frame_budget(self):
+        # 1 ms per step and 3 ms of drawing: 30 fps leaves ~30 steps per frame
+        pacer = StepPacer(target_fps=30, auto=True)
+        for _ in range(50):
+            steps = pacer.steps_per_frame
+            pacer.record_frame(steps, steps * 0.001, steps * 0.001 + 0.003)
+        self.assertAlmostEqual(pacer.steps_per_frame, 30, delta=1)
+        self.assertGreater(pacer.steps_per_second, 800)
+
+    def test_auto_growth_is_bounded(self):
+        pacer = StepPacer(target_fps=30, auto=True, max_steps_per_frame=100)
+        pacer.record_frame(1, 1e-6, 1e-6)
+        self.assertEqual(pacer.steps_per_frame, 2)
+        for _ in range(20):
+            pacer.record_frame(pacer.steps_per_frame, 1e-6, 1e-6)
+        self.assertEqual(pacer.steps_per_frame, 100)
+
+        # Slow steps shrink the batch, but never below one step
+        for _ in range(20):
+            pacer.record_frame(pacer.steps_per_frame, 1.0, 1.0)
+        self.assertEqual(pacer.steps_per_frame, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
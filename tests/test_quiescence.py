@@ -0,0 +1,123 @@
+import unittest
+from world.grid import EldoriaGrid
+from entities.hunter import TreasureHunter, HunterSkill
+from entities.knight import Knight
+from entities.treasure import Treasure, TreasureType
+from entities.hideout import Hideout
+from entities.entity import Entity, EntityType
+from simulation import EldoriaSimulation
+
+
+def build_world():
+    grid = EldoriaGrid(15, 15)
+    hideout = Hideout((2, 2))
+    grid.add_entity(hideout, (2, 2))
+    hunter = TreasureHunter((3, 2), HunterSkill.ENDURANCE)
+    hunter.resting = True
+    hunter.stamina = 40.0
+    grid.add_entity(hunter, (3, 2))
+    hideout.add_hunter(hunter)
+
+    knight = Knight((10, 10))
+    knight.resting = True
+    knight.energy = 55.0
+    grid.add_entity(knight, (10, 10))
+    tired = Knight((12, 12))
+    tired.energy = 10.0
+    grid.add_entity(tired, (12, 12))
+
+    grid.add_entity(Treasure((7, 7), TreasureType.GOLD), (7, 7))
+    dying = Treasure((8, 8), TreasureType.BRONZE)
+    dying.value = 0.1005
+    grid.add_entity(dying, (8, 8))
+    return grid, hunter, knight, tired
+
+
+class TestQuiescence(unittest.TestCase):
+    def test_window_is_bounded_by_first_wake_up(self):
+        grid, hunter, knight, _ = build_world()
+        # Knight wakes after 5 steps (55 -> 105), hunter after 40
+        self.assertEqual(grid.quiescent_window(1000), 5)
+        knight.resting = False
+        self.assertEqual(grid.quiescent_window(1000), 0)
+
+    def test_fast_forward_matches_stepping(self):
+        stepped = build_world()
+        skipped = build_world()
+        window = skipped[0].quiescent_window(1000)
+        for _ in range(window):
+            stepped[0].update()
+        skipped[0].fast_forward(window)
+
+        for (grid_a, *entities_a), (grid_b, *entities_b) in [(stepped, skipped)]:
+            self.assertEqual(grid_a.time, grid_b.time)
+            self.assertEqual(len(grid_a.entities), len(grid_b.entities))
+            self.assertIsNone(grid_b.get_entity((8, 8)))
+            self.assertAlmostEqual(grid_a.get_entity((7, 7)).value,
+                                   grid_b.get_entity((7, 7)).value, places=9)
+            for a, b in zip(entities_a, entities_b):
+                self.assertEqual(a.resting, b.resting)
+            self.assertAlmostEqual(entities_a[0].stamina, entities_b[0].stamina)
+            self.assertAlmostEqual(entities_a[1].energy, entities_b[1].energy)
+
+    def test_collapsed_hunter_expires(self):
+        grid = EldoriaGrid(5, 5)
+        hunter = TreasureHunter((1, 1), HunterSkill.STEALTH)
+        hunter.stamina = 0
+        grid.add_entity(hunter, (1, 1))
+        grid.fast_forward(4)
+        self.assertNotIn(hunter, grid.entities)
+
+    def test_collapsed_hunter_removed_on_its_step(self):
+        grid = EldoriaGrid(5, 5)
+        hunter = TreasureHunter((1, 1), HunterSkill.STEALTH)
+        hunter.stamina = 0
+        grid.add_entity(hunter, (1, 1))
+        self.assertEqual(grid.quiescent_window(1000), 3)
+        grid.fast_forward(3)
+        self.assertEqual(grid.quiescent_window(1000), 0)
+        grid.update()
+        self.assertNotIn(hunter, grid.entities)
+        self.assertEqual(hunter.survival_steps, 4)
+
+    def test_skipping_ages_hunter_memory(self):
+        stepped = build_world()
+        skipped = build_world()
+        for grid, hunter, *_ in (stepped, skipped):
+            hunter.memory['treasures'][(7, 7)] = grid.get_entity((7, 7))
+            hunter.memory.ttl = 2
+        for _ in range(4):
+            stepped[0].update()
+        skipped[0].fast_forward(4)
+        self.assertEqual(list(stepped[1].memory['treasures']), [])
+        self.assertEqual(list(skipped[1].memory['treasures']), [])
+        self.assertEqual(stepped[1].memory.now, skipped[1].memory.now)
+
+    def test_default_skip_replays_updates(self):
+        class Countdown(Entity):
+            def __init__(self, position):
+                super().__init__(EntityType.KNIGHT, position)
+                self.left = 3
+
+            def update(self, grid):
+                self.left -= 1
+                return self.left > 0
+
+        grid = EldoriaGrid(5, 5)
+        entity = Countdown((0, 0))
+        self.assertTrue(entity.skip_steps(2, grid))
+        self.assertEqual(entity.left, 1)
+        self.assertFalse(entity.skip_steps(2, grid))
+
+    def test_simulation_steps_one_at_a_time_by_default(self):
+        sim = EldoriaSimulation(15, 15, seed=4)
+        self.assertFalse(sim.fast_forward)
+        grid, *_ = build_world()
+        sim.grid = grid
+        self.assertEqual(sim.step(), 1)
+        sim.fast_forward = True
+        self.assertEqual(sim.step(), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import multiprocessing
+import unittest
+
+try:
+    import numpy as np
+    from analysis.shared_snapshot import SnapshotPublisher, SnapshotReader, _SEQUENCE
+except ImportError:
+    np = None
+
+from entities.entity import EntityType
+from simulation import EldoriaSimulation
+from world.sparse_grid import SparseEldoriaGrid
+
+
+def read_in_child(name, queue):
+    with SnapshotReader(name) as reader:
+        snapshot = reader.snapshot()
+        queue.put((snapshot['step'], snapshot['types'].tobytes(), len(snapshot['treasure']['id'])))
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestSharedSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.sim = EldoriaSimulation(24, 16, seed=3, backend="dense", fast_forward=False)
+        self.publisher = SnapshotPublisher(self.sim.grid, capacity=512)
+
+    def tearDown(self):
+        self.publisher.close()
+
+    def test_layers_and_columns(self):
+        self.sim.step()
+        self.assertTrue(self.publisher.publish(self.sim.steps))
+        with SnapshotReader(self.publisher.name) as reader:
+            snapshot = reader.snapshot()
+            self.assertEqual(snapshot['step'], 1)
+            self.assertEqual(snapshot['types'].shape, (16, 24))
+            self.assertEqual(snapshot['types'].tobytes(), bytes(self.sim.grid.type_layer))
+            self.assertEqual(snapshot['ids'].ravel().tolist(), self.sim.grid.id_layer.tolist())
+
+            # Rows come in row-major cell order
+            def in_cell_order(type_name):
+                entities = [e for e in self.sim.grid.entities if e.type.name == type_name]
+                return sorted(entities, key=lambda e: (e.position[1], e.position[0]))
+
+            knights = in_cell_order('KNIGHT')
+            self.assertEqual(snapshot['knight']['id'].tolist(), [k.id for k in knights])
+            self.assertEqual(snapshot['knight']['x'].tolist(), [k.position[0] for k in knights])
+            treasures = in_cell_order('TREASURE')
+            self.assertEqual(snapshot['treasure']['id'].tolist(), [t.id for t in treasures])
+            np.testing.assert_allclose(snapshot['treasure']['value'], [t.value for t in treasures])
+            self.assertEqual(snapshot['treasure']['treasure_type'].tolist(),
+                             [t.treasure_type.value for t in treasures])
+            self.assertFalse(snapshot['overflow'])
+            self.assertEqual(reader.sequence % 2, 0)
+
+    def test_every_and_overflow(self):
+        publisher = SnapshotPublisher(self.sim.grid, capacity=2, every=5)
+        try:
+            self.assertTrue(publisher.publish(0))
+            self.assertFalse(publisher.publish(3))
+            self.assertTrue(publisher.publish(5))
+            with SnapshotReader(publisher.name) as reader:
+                snapshot = reader.snapshot()
+                self.assertTrue(snapshot['overflow'])
+                self.assertEqual(len(snapshot['treasure']['id']), 2)
+        finally:
+            publisher.close()
+
+    def test_values_follow_decay_and_sleeping_chunks(self):
+        sim = EldoriaSimulation(48, 40, seed=6, backend="dense", chunk_sleeping=True,
+                                chunk_size=8, hunters_per_hideout=(0, 0))
+        with SnapshotPublisher(sim.grid, capacity=2048) as publisher, \
+                SnapshotReader(publisher.name) as reader:
+            for _ in range(1200):  # Past a rebase of the treasure weights
+                sim.step()
+                if sim.steps % 200 == 0:
+                    publisher.publish(sim.steps)
+            self.assertTrue(sim.grid.activity.asleep_since)
+            snapshot = reader.snapshot()
+            expected = {}
+            for entity in sim.grid.entities:
+                if entity.type == EntityType.TREASURE:
+                    value = sim.grid.treasure_value(entity, entity.position)
+                    if value is not None:
+                        expected[entity.id] = value
+            self.assertEqual(sorted(snapshot['treasure']['id'].tolist()), sorted(expected))
+            np.testing.assert_allclose(snapshot['treasure']['value'],
+                                       [expected[i] for i in snapshot['treasure']['id'].tolist()])
+            # Publishing reads sleeping chunks without waking them
+            self.assertTrue(sim.grid.activity.asleep_since)
+
+    def test_read_times_out_while_writer_is_stuck(self):
+        with SnapshotReader(self.publisher.name) as reader:
+            self.publisher._arrays["header"][_SEQUENCE] += 1  # Odd: as if mid-publish
+            with self.assertRaises(TimeoutError):
+                reader.read(lambda view: view['step'], timeout=0.01)
+
+    def test_other_process(self):
+        self.publisher.publish(7)
+        context = multiprocessing.get_context()
+        queue = context.Queue()
+        child = context.Process(target=read_in_child, args=(self.publisher.name, queue))
+        child.start()
+        step, types, treasures = queue.get(timeout=30)
+        child.join()
+        self.assertEqual(step, 7)
+        self.assertEqual(types, bytes(self.sim.grid.type_layer))
+        self.assertEqual(treasures, self.sim.grid.type_counts[EntityType.TREASURE])
+
+    def test_needs_dense_grid(self):
+        with self.assertRaises(ValueError):
+            SnapshotPublisher(SparseEldoriaGrid(10, 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
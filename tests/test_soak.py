@@ -0,0 +1,43 @@
+import unittest
+from batch.soak import SoakRun, SoakFailure, structure_census, current_rss
+from simulation import EldoriaSimulation
+from world.events import EventType
+
+
+class TestSoak(unittest.TestCase):
+    def test_census(self):
+        sim = EldoriaSimulation(16, 16, seed=2, hideout_history='full')
+        census = structure_census(sim)
+        self.assertEqual(census['entities'], len(sim.grid.entities))
+        self.assertEqual(census['entities.hideout'], len(sim.hideouts))
+        self.assertEqual(census['hideouts.treasures'], 0)
+
+    def test_rss(self):
+        rss = current_rss()
+        if rss is not None:
+            self.assertGreater(rss, 0)
+
+    def test_steady_world_passes(self):
+        report = SoakRun({'width': 16, 'height': 16}, steps=600, sample_every=100,
+                         warmup=100, max_growth_per_step=256).run()
+        self.assertTrue(report.passed)
+        self.assertEqual(report.samples[-1].step, 600)
+
+    def test_leak_is_reported(self):
+        retained = []
+
+        def leak(sim):
+            sim.grid.events.subscribe(EventType.MOVE, lambda batch: retained.append([b"x" * 256] * 8))
+
+        soak = SoakRun({'width': 16, 'height': 16, 'fast_forward': False}, steps=600,
+                       sample_every=100, warmup=100, max_growth_per_step=32, setup=leak)
+        with self.assertRaises(SoakFailure) as caught:
+            soak.run()
+        report = caught.exception.report
+        self.assertFalse(report.passed)
+        self.assertIn("FAILED", str(caught.exception))
+        self.assertTrue(any("test_soak.py" in source for source, _ in report.top_growth))
+
+
+if __name__ == "__main__":
+    unittest.main()
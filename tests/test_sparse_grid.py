@@ -0,0 +1,66 @@
+import unittest
+import random
+from world.grid import EldoriaGrid
+from world.sparse_grid import SparseEldoriaGrid
+from entities.entity import Entity, EntityType
+from simulation import EldoriaSimulation
+
+
+class TestSparseEldoriaGrid(unittest.TestCase):
+    def setUp(self):
+        self.grid = SparseEldoriaGrid(100000, 100000)
+        self.entity = Entity(EntityType.TREASURE, (0, 0))
+
+    def test_add_move_remove(self):
+        self.assertTrue(self.grid.add_entity(self.entity, (0, 0)))
+        self.assertFalse(self.grid.add_entity(Entity(EntityType.KNIGHT, (0, 0)), (0, 0)))
+        self.assertTrue(self.grid.move_entity((0, 0), (99999, 99999)))
+        self.assertTrue(self.grid.is_empty((0, 0)))
+        self.assertEqual(self.grid.get_entity((99999, 99999)), self.entity)
+        self.assertTrue(self.grid.remove_entity((99999, 99999)))
+        self.assertEqual(len(self.grid.cells), 0)
+        self.assertEqual(self.grid.buckets[EntityType.TREASURE], {})
+
+    def test_removal_keeps_insertion_order(self):
+        entities = [Entity(EntityType.TREASURE, (i, i)) for i in range(5)]
+        for entity in entities:
+            self.grid.add_entity(entity, entity.position)
+        self.grid.remove_entity((2, 2))
+        self.grid.remove_entity((0, 0))
+        self.assertEqual(list(self.grid.entities), [entities[1], entities[3], entities[4]])
+        self.assertFalse(self.grid.remove_entity((0, 0)))
+        self.assertEqual(len(self.grid.entities), 3)
+
+    def test_radius_query_wraps(self):
+        hunter = Entity(EntityType.HUNTER, (0, 0))
+        self.grid.add_entity(hunter, (99998, 1))
+        self.grid.add_entity(self.entity, (2, 2))
+        self.assertEqual(self.grid.get_entities_in_radius((0, 0), 3, EntityType.HUNTER), [hunter])
+        self.assertEqual(self.grid.get_entities_in_radius((0, 0), 3), [hunter, self.entity])
+        self.assertEqual(self.grid.get_entities_in_radius((0, 0), 1), [])
+
+    def test_matches_dense_backend(self):
+        rng = random.Random(7)
+        dense = EldoriaGrid(12, 9)
+        sparse = SparseEldoriaGrid(12, 9, bucket_size=4)
+        for _ in range(40):
+            pos = (rng.randrange(12), rng.randrange(9))
+            entity_type = rng.choice([EntityType.TREASURE, EntityType.HUNTER])
+            entity = Entity(entity_type, pos)
+            self.assertEqual(dense.add_entity(entity, pos), sparse.add_entity(entity, pos))
+
+        for x in range(12):
+            for y in range(9):
+                for radius in (1, 3, 5):
+                    self.assertEqual(dense.get_entities_in_radius((x, y), radius),
+                                     sparse.get_entities_in_radius((x, y), radius))
+
+    def test_simulation_selects_backend(self):
+        self.assertIsInstance(EldoriaSimulation(20, 20).grid, EldoriaGrid)
+        self.assertNotIsInstance(EldoriaSimulation(20, 20).grid, SparseEldoriaGrid)
+        sim = EldoriaSimulation(100000, 100000, treasure_density=(0.0, 0.0))
+        self.assertIsInstance(sim.grid, SparseEldoriaGrid)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from gui.sprite_atlas import SpriteAtlas, ICON_COLORS
+
+
+class TestSpriteAtlas(unittest.TestCase):
+    def setUp(self):
+        self.rendered = []
+
+        def render(color, size):
+            self.rendered.append((color, size))
+            return (color, size)
+
+        self.atlas = SpriteAtlas(capacity=len(ICON_COLORS) * 2, render=render)
+
+    def test_sprites_match_size(self):
+        sprites = self.atlas.sprites(24)
+        self.assertEqual(sprites['knight'], ('red', 24))
+        self.assertEqual(len(self.rendered), len(ICON_COLORS))
+
+    def test_cached_per_size(self):
+        self.atlas.sprites(24)
+        self.atlas.sprites(24)
+        self.assertEqual(len(self.rendered), len(ICON_COLORS))
+        self.atlas.sprites(12)
+        self.assertEqual(len(self.rendered), 2 * len(ICON_COLORS))
+
+    def test_least_recently_used_size_evicted(self):
+        self.atlas.sprites(24)
+        self.atlas.sprites(12)
+        self.atlas.sprites(24)  # Refresh 24 so 12 is the oldest
+        self.atlas.sprites(8)
+        self.assertEqual(len(self.atlas), 2 * len(ICON_COLORS))
+
+        count = len(self.rendered)
+        self.atlas.sprites(24)
+        self.assertEqual(len(self.rendered), count)
+        self.atlas.sprites(12)
+        self.assertEqual(len(self.rendered), count + len(ICON_COLORS))
+
+
+if __name__ == "__main__":
+    unittest.main()
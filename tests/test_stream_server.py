@@ -0,0 +1,154 @@
+import asyncio
+import json
+import unittest
+from server.stream_server import (
+    SimulationServer, FrameDecoder, _Client, read_message, HELLO, KEYFRAME, DELTA, STATS, ERROR
+)
+from simulation import EldoriaSimulation
+
+
+def _split(message):
+    """(kind, payload) of one encoded server message"""
+    return message[4], message[5:]
+
+
+class TestSimulationServer(unittest.TestCase):
+    def run_async(self, coroutine):
+        return asyncio.run(asyncio.wait_for(coroutine, timeout=10))
+
+    def test_viewer_tracks_world(self):
+        async def scenario():
+            server = SimulationServer(EldoriaSimulation(16, 12, seed=8, fast_forward=False), port=0)
+            await server.start()
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            decoder = FrameDecoder()
+            kinds = []
+            for _ in range(2):
+                kind, payload = await read_message(reader)
+                decoder.apply(kind, payload)
+                kinds.append(kind)
+            self.assertEqual(kinds, [HELLO, KEYFRAME])
+            self.assertEqual((decoder.width, decoder.height), (16, 12))
+
+            for _ in range(3):
+                writer.write(json.dumps({"cmd": "step"}).encode() + b"\n")
+                await writer.drain()
+                for expected in (DELTA, STATS):
+                    kind, payload = await read_message(reader)
+                    self.assertEqual(kind, expected)
+                    decoder.apply(kind, payload)
+
+            self.assertEqual(decoder.step, server.simulation.steps)
+            self.assertEqual(bytes(decoder.layer), bytes(server.simulation.grid.type_layer))
+            self.assertEqual(decoder.stats['steps'], 3)
+            writer.close()
+            await server.close()
+
+        self.run_async(scenario())
+
+    def test_slow_viewer_drops_frames(self):
+        async def scenario():
+            server = SimulationServer(EldoriaSimulation(16, 12, seed=8), port=0, queue_size=2)
+            await server.start()
+            # A viewer whose sender never drains its queue
+            stalled = _Client(writer=None, queue_size=2)
+            stalled.needs_keyframe = False
+            server.clients.add(stalled)
+            for _ in range(5):
+                server.control({"cmd": "step"})
+            while server.simulation.steps < 5:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.01)
+
+            self.assertEqual(server.simulation.steps, 5)
+            self.assertEqual(stalled.queue.qsize(), 2)
+            self.assertGreater(stalled.dropped, 0)
+            self.assertTrue(stalled.needs_keyframe)
+            server.clients.discard(stalled)
+            await server.close()
+
+        self.run_async(scenario())
+
+    def test_controls_before_start(self):
+        async def scenario():
+            server = SimulationServer(EldoriaSimulation(16, 12, seed=8), port=0)
+            server.control({"cmd": "step"})
+            await server.start()
+            while server.simulation.steps < 1:
+                await asyncio.sleep(0.01)
+            await server.close()
+
+        self.run_async(scenario())
+
+    def test_malformed_controls_are_refused(self):
+        async def scenario():
+            server = SimulationServer(EldoriaSimulation(16, 12, seed=8), port=0)
+            await server.start()
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            for _ in range(2):
+                await read_message(reader)  # HELLO and KEYFRAME
+
+            decoder = FrameDecoder()
+            malformed = [{"cmd": "speed", "ms": None}, {"cmd": "speed", "ms": "fast"},
+                         {"cmd": "new", "width": 0}, {"cmd": "new", "height": -3},
+                         {"cmd": "new", "width": "wide"}, {"cmd": "jump"}, [1, 2]]
+            for command in malformed:
+                writer.write(json.dumps(command).encode() + b"\n")
+                await writer.drain()
+                kind, payload = await read_message(reader)
+                self.assertEqual(kind, ERROR)
+                decoder.apply(kind, payload)
+                self.assertTrue(decoder.error)
+            self.assertEqual(server.speed, 500)
+            self.assertEqual((server.simulation.grid.width, server.simulation.grid.height), (16, 12))
+
+            # The connection survived and still takes controls
+            writer.write(json.dumps({"cmd": "step"}).encode() + b"\n")
+            await writer.drain()
+            kind, _ = await read_message(reader)
+            self.assertEqual(kind, DELTA)
+            writer.close()
+            await server.close()
+
+        self.run_async(scenario())
+
+    def test_keyframe_carries_world_size(self):
+        async def scenario():
+            server = SimulationServer(EldoriaSimulation(16, 12, seed=8), port=0, queue_size=2)
+            await server.start()
+            # A viewer whose queue is full when the new world's HELLO is sent
+            stalled = _Client(writer=None, queue_size=2)
+            stalled.needs_keyframe = False
+            server.clients.add(stalled)
+            server._offer(stalled, b"old")
+            server._offer(stalled, b"old")
+            server.control({"cmd": "new", "width": 30, "height": 30})
+            self.assertGreater(stalled.dropped, 0)
+            for _ in range(2):
+                stalled.queue.get_nowait()
+
+            server.control({"cmd": "step"})
+            while stalled.queue.empty():
+                await asyncio.sleep(0.01)
+            decoder = FrameDecoder()
+            decoder.apply(*_split(stalled.queue.get_nowait()))
+            self.assertEqual((decoder.width, decoder.height), (30, 30))
+            self.assertEqual(len(decoder.layer), 900)
+            server.clients.discard(stalled)
+            await server.close()
+
+        self.run_async(scenario())
+
+    def test_new_world_keeps_params(self):
+        params = {"width": 16, "height": 12, "seed": 8, "hunters_per_hideout": (0, 0)}
+        server = SimulationServer(EldoriaSimulation(**params), params=params)
+        server.control({"cmd": "new", "width": 20})
+        sim = server.simulation
+        self.assertEqual((sim.grid.width, sim.grid.height), (20, 12))
+        self.assertEqual(sim.hunters_per_hideout, (0, 0))
+        self.assertEqual(sim.get_stats()['hunters'], 0)
+        self.assertEqual(params["width"], 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
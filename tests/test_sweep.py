@@ -0,0 +1,73 @@
+import unittest
+from batch.stats import RunningStats
+from batch.sweep import ParameterSweep, run_simulation
+
+
+class TestRunningStats(unittest.TestCase):
+    def test_mean_and_variance(self):
+        stats = RunningStats()
+        for value in [2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0]:
+            stats.add(value)
+        self.assertEqual(stats.count, 8)
+        self.assertAlmostEqual(stats.mean, 5.0)
+        self.assertAlmostEqual(stats.variance, 32.0 / 7)
+        self.assertEqual((stats.min, stats.max), (2.0, 9.0))
+        self.assertLess(stats.confidence_halfwidth(), 2.0)
+
+    def test_single_sample(self):
+        stats = RunningStats()
+        stats.add(1.0)
+        self.assertEqual(stats.variance, 0.0)
+        self.assertEqual(stats.confidence_halfwidth(), float('inf'))
+
+
+class TestParameterSweep(unittest.TestCase):
+    def setUp(self):
+        self.sweep = ParameterSweep(
+            {'hideout_count': [(1, 1), (2, 2)], 'knight_ratio': [(0.1, 0.1)]},
+            base_params={'width': 14, 'height': 14, 'hunters_per_hideout': (2, 3)},
+            max_steps=40, min_runs=3, max_runs=6, workers=0
+        )
+
+    def test_configurations(self):
+        configs = self.sweep.configurations()
+        self.assertEqual(len(configs), 2)
+        self.assertEqual(configs[1]['hideout_count'], (2, 2))
+        self.assertEqual(configs[1]['width'], 14)
+
+    def test_runs_are_reproducible(self):
+        params = self.sweep.configurations()[0]
+        outcome = run_simulation(params, 9, 40)
+        self.assertEqual(outcome, run_simulation(params, 9, 40))
+        self.assertGreater(outcome['collected_treasures'], 0)
+
+    def test_runs_to_max_without_precision(self):
+        self.sweep.rel_tolerance = 0.01
+        self.sweep.abs_tolerance = 0.01
+        for result in self.sweep.run():
+            self.assertEqual(result.runs, 6)
+            self.assertFalse(result.converged)
+            collected = result.summary()['metrics']['collected_treasures']
+            self.assertGreater(collected['mean'], 0)
+            self.assertGreater(collected['stddev'], 0)
+
+    def test_early_stopping(self):
+        self.sweep.rel_tolerance = 1.0
+        results = self.sweep.run()
+        for result in results:
+            self.assertTrue(result.converged)
+            self.assertGreaterEqual(result.runs, 3)
+            self.assertLess(result.runs, 6)
+
+    def test_parallel_matches_inline(self):
+        for tolerance in (0.3, 0.01):
+            self.sweep.rel_tolerance = tolerance
+            self.sweep.workers = 0
+            inline = [result.summary() for result in self.sweep.run()]
+            self.sweep.workers = 3
+            parallel = [result.summary() for result in self.sweep.run()]
+            self.assertEqual(inline, parallel)
+
+
+if __name__ == "__main__":
+    unittest.main()
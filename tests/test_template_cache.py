@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from analysis.equivalence import world_state
+from simulation import EldoriaSimulation
+from world.template_cache import WorldTemplateCache, SUFFIX
+
+
+class TestWorldTemplateCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = WorldTemplateCache(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_world(self, steps=20, **params):
+        sim = EldoriaSimulation(seed=11, fast_forward=False, **params)
+        start = world_state(sim)
+        for _ in range(steps):
+            sim.step()
+        return start, sim.grid.state_hash(include_attributes=True), sim.rng.random()
+
+    def assertCachedMatchesFresh(self, **params):
+        fresh = self.run_world(**params)
+        stored = self.run_world(template_cache=self.cache, **params)
+        loaded = self.run_world(template_cache=self.cache, **params)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(fresh, stored)
+        self.assertEqual(fresh, loaded)
+
+    def test_dense_world(self):
+        self.assertCachedMatchesFresh(width=20, height=16)
+
+    def test_lazy_sparse_world(self):
+        self.assertCachedMatchesFresh(width=120, height=90, lazy_treasures=True,
+                                      chunk_size=16, backend="sparse", hideout_history='full')
+
+    def test_key_covers_configuration(self):
+        EldoriaSimulation(16, 16, seed=1, template_cache=self.cache)
+        EldoriaSimulation(16, 16, seed=2, template_cache=self.cache)
+        EldoriaSimulation(16, 16, seed=1, knight_ratio=(0.5, 0.5), template_cache=self.cache)
+        EldoriaSimulation(16, 16, template_cache=self.cache)  # Unseeded worlds are not cached
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(len(os.listdir(self.tmp.name)), 3)
+
+    def test_lru_eviction(self):
+        cache = WorldTemplateCache(self.tmp.name, max_entries=2)
+        first = EldoriaSimulation(16, 16, seed=1, template_cache=cache)
+        os.utime(next(e.path for e in os.scandir(self.tmp.name)), (0, 0))
+        EldoriaSimulation(16, 16, seed=2, template_cache=cache)
+        EldoriaSimulation(16, 16, seed=1, template_cache=cache)  # Hit refreshes seed 1
+        EldoriaSimulation(16, 16, seed=3, template_cache=cache)  # Evicts seed 2
+        self.assertEqual(len(os.listdir(self.tmp.name)), 2)
+        EldoriaSimulation(16, 16, seed=1, template_cache=cache)
+        self.assertEqual(cache.hits, 2)
+        self.assertGreater(len(first.grid.entities), 0)
+
+    def test_corrupted_template_is_a_miss(self):
+        fresh = self.run_world(width=20, height=16)
+        self.run_world(template_cache=self.cache, width=20, height=16)
+        path = next(e.path for e in os.scandir(self.tmp.name))
+        with open(path, "rb") as f:
+            data = f.read()
+
+        for corrupted in (b"", data[:40], data[:-3], data[:-8]):
+            with open(path, "wb") as f:
+                f.write(corrupted)
+            misses = self.cache.misses
+            self.assertEqual(self.run_world(template_cache=self.cache, width=20, height=16), fresh)
+            self.assertEqual(self.cache.misses, misses + 1)
+            # Replaced by a good template for the next run
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), data)
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_corrupted_template_is_removed(self):
+        sim = EldoriaSimulation(16, 16, seed=1, template_cache=self.cache)
+        path = next(e.path for e in os.scandir(self.tmp.name))
+        with open(path, "r+b") as f:
+            f.truncate(100)
+        target = EldoriaSimulation(16, 16, seed=1)
+        self.assertFalse(self.cache.load(os.path.basename(path)[:-len(SUFFIX)], target))
+        self.assertFalse(os.path.exists(path))
+        self.assertGreater(len(sim.grid.entities), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
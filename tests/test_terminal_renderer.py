@@ -0,0 +1,71 @@
+import io
+import unittest
+from gui.terminal_renderer import TerminalRenderer
+from world.grid import EldoriaGrid
+from world.sparse_grid import SparseEldoriaGrid
+from entities.treasure import Treasure, TreasureType
+from entities.knight import Knight
+
+
+class TestTerminalRenderer(unittest.TestCase):
+    def setUp(self):
+        self.grid = EldoriaGrid(10, 5)
+        self.grid.add_entity(Treasure((1, 1), TreasureType.GOLD), (1, 1))
+        self.knight = Knight((3, 2))
+        self.grid.add_entity(self.knight, (3, 2))
+        self.stream = io.StringIO()
+        self.renderer = TerminalRenderer(self.grid, viewport=(8, 4), stream=self.stream,
+                                         threaded=False)
+
+    def test_type_rows(self):
+        self.assertEqual(self.grid.get_type_row(1, 0, 4), bytes([0, 1, 0, 0]))
+        # Wraps past the right edge
+        self.assertEqual(self.grid.get_type_row(2, 8, 6), bytes([0, 0, 0, 0, 0, 4]))
+
+    def test_full_then_incremental_frame(self):
+        self.renderer.render(0, "start")
+        first = self.stream.getvalue()
+        self.assertIn("\x1b[2J", first)
+        self.assertIn(".$......", first)
+        self.assertIn("...K....", first)
+
+        self.stream.truncate(0)
+        self.stream.seek(0)
+        self.grid.move_entity((3, 2), (4, 2))
+        self.renderer.render(1)
+        second = self.stream.getvalue()
+        self.assertNotIn("\x1b[2J", second)
+        self.assertIn("\x1b[3;4H.K", second)
+        self.assertNotIn("$", second)
+
+    def test_step_skipping_and_scrolling(self):
+        renderer = TerminalRenderer(self.grid, viewport=(3, 2), every=5,
+                                    stream=self.stream, threaded=False)
+        self.assertFalse(renderer.render(3))
+        self.assertEqual(self.stream.getvalue(), "")
+        renderer.scroll(1, 1)
+        self.assertTrue(renderer.render(5))
+        self.assertIn("$..", self.stream.getvalue())
+
+    def test_jump_past_due_step(self):
+        renderer = TerminalRenderer(self.grid, viewport=(3, 2), every=5,
+                                    stream=self.stream, threaded=False)
+        drawn = [step for step in (0, 3, 7, 9, 10, 26, 29) if renderer.render(step)]
+        self.assertEqual(drawn, [0, 7, 10, 26])
+
+    def test_threaded_writer(self):
+        renderer = TerminalRenderer(self.grid, viewport=(8, 4), stream=self.stream)
+        for step in range(20):
+            renderer.render(step)
+        renderer.close()
+        self.assertGreaterEqual(renderer.frames_drawn, 1)
+        self.assertIn("$", self.stream.getvalue())
+
+    def test_sparse_backend(self):
+        grid = SparseEldoriaGrid(1000, 1000)
+        grid.add_entity(Knight((999, 0)), (999, 0))
+        self.assertEqual(grid.get_type_row(0, 998, 3), bytes([0, 4, 0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
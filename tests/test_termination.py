@@ -0,0 +1,79 @@
+import unittest
+from simulation import EldoriaSimulation
+from world.termination import StepBudget, WallClockBudget, NoCollection, StatsPlateau
+from entities.entity import EntityType
+from entities.hunter import TreasureHunter, HunterSkill
+
+
+def populated_simulation(**kwargs):
+    """A small world with a live hunter, so the built-in checks keep running"""
+    sim = EldoriaSimulation(15, 15, seed=4, **kwargs)
+    hunter = TreasureHunter((0, 0), HunterSkill.NAVIGATION)
+    hunter.resting = True
+    hunter.stamina = 50.0
+    for x in range(15):
+        if sim.grid.add_entity(hunter, (x, 7)):
+            break
+    return sim
+
+
+class TestTerminationPolicies(unittest.TestCase):
+    def test_type_counts_are_incremental(self):
+        sim = populated_simulation()
+        counts = sim.grid.type_counts
+        for entity_type in EntityType:
+            self.assertEqual(counts[entity_type],
+                             sum(1 for e in sim.grid.entities if e.type == entity_type))
+
+    def test_active_hunter_counter(self):
+        sim = populated_simulation()
+
+        def scanned():
+            return sum(1 for e in sim.grid.entities if e.type == EntityType.HUNTER and e.stamina > 0)
+
+        for _ in range(30):
+            sim.step()
+            self.assertEqual(sim.grid.active_hunters, scanned())
+        hunter = next(e for e in sim.grid.entities if e.type == EntityType.HUNTER and e.stamina > 0)
+        hunter.spend_stamina(hunter.stamina + 1, sim.grid)
+        self.assertEqual(sim.grid.active_hunters, scanned())
+        for _ in range(5):
+            sim.step()
+        self.assertNotIn(hunter, sim.grid.entities)
+        self.assertEqual(sim.grid.active_hunters, scanned())
+        self.assertEqual(sim.get_stats()['active_hunters'], scanned())
+
+    def test_step_budget(self):
+        sim = populated_simulation(termination=[StepBudget(7)])
+        while sim.is_running():
+            sim.step()
+        self.assertEqual(sim.steps, 7)
+        self.assertIn("step budget", sim.termination_reason)
+
+    def test_no_collection_stops_dead_world(self):
+        # Only the added hunter, resting until well past the patience window
+        sim = populated_simulation(termination=[NoCollection(20)], hunters_per_hideout=(0, 0))
+        while sim.is_running() and sim.steps < 1000:
+            sim.step()
+        self.assertEqual(sim.steps, 20)
+        self.assertIn("no treasure collected", sim.termination_reason)
+
+    def test_plateau_resets_on_change(self):
+        sim = populated_simulation(fast_forward=False)
+        plateau = StatsPlateau(5)
+        sim.add_termination_policy(plateau)
+        sim.steps = 3
+        sim.grid.type_counts[EntityType.TREASURE] -= 1
+        self.assertIsNone(plateau.check(sim))
+        self.assertEqual(plateau.last_change, 3)
+        sim.steps = 8
+        self.assertIsNotNone(plateau.check(sim))
+
+    def test_wall_clock_budget(self):
+        sim = populated_simulation(termination=[WallClockBudget(0.0)])
+        sim.step()
+        self.assertFalse(sim.is_running())
+
+
+if __name__ == "__main__":
+    unittest.main()
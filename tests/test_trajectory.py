@@ -0,0 +1,74 @@
+import os
+import random
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+    from analysis.trajectory import TrajectoryWriter, TrajectoryReader
+except ImportError:
+    np = None
+
+from world.grid import EldoriaGrid
+from world.sparse_grid import SparseEldoriaGrid
+from entities.knight import Knight
+from entities.treasure import Treasure, TreasureType
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestTrajectoryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "run")
+        self.grid = EldoriaGrid(12, 8)
+        self.knights = []
+        for i in range(4):
+            knight = Knight((i * 3, i))
+            self.grid.add_entity(knight, (i * 3, i))
+            self.knights.append(knight)
+        self.grid.add_entity(Treasure((5, 5), TreasureType.GOLD), (5, 5))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def snapshot(self):
+        types = np.frombuffer(self.grid.type_layer, dtype=np.uint8).reshape(8, 12).copy()
+        ids = np.frombuffer(self.grid.id_layer, dtype=np.int32).reshape(8, 12).copy()
+        return types, ids
+
+    def test_seek_any_step(self):
+        rng = random.Random(1)
+        expected = {}
+        with TrajectoryWriter(self.path, self.grid, keyframe_interval=5) as writer:
+            for step in range(0, 40, 2):
+                knight = rng.choice(self.knights)
+                x, y = knight.position
+                self.grid.move_entity((x, y), ((x + 1) % 12, y))
+                if step == 20:
+                    self.grid.remove_entity((5, 5))
+                writer.record(step)
+                expected[step] = self.snapshot()
+
+        reader = TrajectoryReader(self.path)
+        self.assertEqual(len(reader), 20)
+        for step in [38, 0, 20, 14, 2]:
+            types, ids = reader.frame(step)
+            np.testing.assert_array_equal(types, expected[step][0])
+            np.testing.assert_array_equal(ids, expected[step][1])
+        with self.assertRaises(KeyError):
+            reader.frame(3)
+
+    def test_steps_must_increase(self):
+        writer = TrajectoryWriter(self.path, self.grid)
+        writer.record(1)
+        with self.assertRaises(ValueError):
+            writer.record(1)
+        writer.close()
+
+    def test_requires_dense_layers(self):
+        with self.assertRaises(ValueError):
+            TrajectoryWriter(self.path, SparseEldoriaGrid(10, 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -41,6 +41,20 @@ class TestTreasure(unittest.TestCase):
         self.assertLess(bronze.value, 0.1)
         self.assertGreater(steps, 500)  # Should take many steps to fully decay
 
+    def test_skipping_matches_stepping_exactly(self):
+        stepped = self.treasures[TreasureType.BRONZE]
+        skipped = self.treasures[TreasureType.SILVER]
+        self.assertEqual(stepped.value_after(37), skipped.value_after(37))
+        for _ in range(37):
+            stepped.update(self.grid)
+        skipped.skip_steps(37, self.grid)
+        self.assertEqual(stepped.value, skipped.value)
+
+        # Setting a value restarts the decay from it
+        stepped.value = 50.0
+        stepped.update(self.grid)
+        self.assertEqual(stepped.value, 50.0 * 0.999)
+
     def test_value_increase(self):
         self.assertEqual(
             self.treasures[TreasureType.BRONZE].get_value_increase(),
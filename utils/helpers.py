@@ -1,7 +1,16 @@
 import random
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, List, Dict, Any, Optional, Sequence
 from math import sqrt
 from enum import Enum
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, batch kernels fall back to lists
+    np = None
+
+# Below this many targets a plain loop beats building numpy arrays
+_VECTORIZE_MIN_TARGETS = 32
 
 
 def get_random_position(width: int, height: int) -> Tuple[int, int]:
@@ -19,21 +28,35 @@ def calculate_wrapped_distance(pos1: Tuple[int, int], pos2: Tuple[int, int],
     return sqrt(dx ** 2 + dy ** 2)
 
 
+@lru_cache(maxsize=None)
+def get_offset_stencil(radius: int, metric: str = "chebyshev") -> Tuple[Tuple[int, int], ...]:
+    """
+    Offsets (dx, dy) within radius of the origin, excluding the origin itself,
+    in dx-major order. metric is "chebyshev" (square) or "manhattan" (diamond).
+    Stencils are built once per (radius, metric) and shared by all callers.
+    """
+    if metric not in ("chebyshev", "manhattan"):
+        raise ValueError(f"Unknown metric: {metric}")
+
+    offsets = []
+    for dx in range(-radius, radius + 1):
+        for dy in range(-radius, radius + 1):
+            if dx == 0 and dy == 0:
+                continue
+            if metric == "manhattan" and abs(dx) + abs(dy) > radius:
+                continue
+            offsets.append((dx, dy))
+    return tuple(offsets)
+
+
 def get_adjacent_positions(position: Tuple[int, int],
                            width: int, height: int) -> List[Tuple[int, int]]:
     """
     Get all 8 adjacent positions (including diagonals) with grid wrapping
     """
     x, y = position
-    positions = []
-    for dx in [-1, 0, 1]:
-        for dy in [-1, 0, 1]:
-            if dx == 0 and dy == 0:
-                continue  # Skip current position
-            new_x = (x + dx) % width
-            new_y = (y + dy) % height
-            positions.append((new_x, new_y))
-    return positions
+    return [((x + dx) % width, (y + dy) % height)
+            for dx, dy in get_offset_stencil(1, "chebyshev")]
 
 
 def get_positions_in_radius(position: Tuple[int, int], radius: int,
@@ -42,17 +65,65 @@ def get_positions_in_radius(position: Tuple[int, int], radius: int,
     Get all positions within given radius (Manhattan distance) with wrapping
     """
     x, y = position
-    positions = []
-    for dx in range(-radius, radius + 1):
-        for dy in range(-radius, radius + 1):
-            if dx == 0 and dy == 0:
-                continue  # Skip center position
-            if abs(dx) + abs(dy) > radius:
-                continue  # Manhattan distance check
-            new_x = (x + dx) % width
-            new_y = (y + dy) % height
-            positions.append((new_x, new_y))
-    return positions
+    return [((x + dx) % width, (y + dy) % height)
+            for dx, dy in get_offset_stencil(radius, "manhattan")]
+
+
+def wrapped_distances(origin: Tuple[int, int], positions: Sequence[Tuple[int, int]],
+                      width: int, height: int):
+    """
+    Wrapped distances from one origin to many positions. Returns a numpy
+    array when numpy is available, otherwise a list of floats.
+    """
+    if np is None:
+        return [calculate_wrapped_distance(origin, pos, width, height) for pos in positions]
+
+    points = np.asarray(positions, dtype=np.int64).reshape(-1, 2)
+    dx = np.abs(points[:, 0] - origin[0])
+    dy = np.abs(points[:, 1] - origin[1])
+    dx = np.minimum(dx, width - dx)
+    dy = np.minimum(dy, height - dy)
+    return np.sqrt(dx * dx + dy * dy)
+
+
+def pairwise_wrapped_distances(sources: Sequence[Tuple[int, int]],
+                               targets: Sequence[Tuple[int, int]],
+                               width: int, height: int):
+    """
+    Wrapped distance matrix of shape (len(sources), len(targets)). Returns a
+    numpy array when numpy is available, otherwise a list of lists.
+    """
+    if np is None:
+        return [[calculate_wrapped_distance(src, dst, width, height) for dst in targets]
+                for src in sources]
+
+    src = np.asarray(sources, dtype=np.int64).reshape(-1, 2)
+    dst = np.asarray(targets, dtype=np.int64).reshape(-1, 2)
+    dx = np.abs(src[:, 0, None] - dst[None, :, 0])
+    dy = np.abs(src[:, 1, None] - dst[None, :, 1])
+    dx = np.minimum(dx, width - dx)
+    dy = np.minimum(dy, height - dy)
+    return np.sqrt(dx * dx + dy * dy)
+
+
+def nearest_index(origin: Tuple[int, int], positions: Sequence[Tuple[int, int]],
+                  width: int, height: int) -> Optional[int]:
+    """
+    Index of the position closest to origin (first one on ties),
+    or None if positions is empty
+    """
+    if not positions:
+        return None
+
+    if np is not None and len(positions) >= _VECTORIZE_MIN_TARGETS:
+        return int(np.argmin(wrapped_distances(origin, positions, width, height)))
+
+    best, best_dist = None, float('inf')
+    for i, pos in enumerate(positions):
+        dist = calculate_wrapped_distance(origin, pos, width, height)
+        if dist < best_dist:
+            best, best_dist = i, dist
+    return best
 
 
 def get_direction_towards(source: Tuple[int, int], target: Tuple[int, int],
@@ -78,9 +149,15 @@ def get_direction_towards(source: Tuple[int, int], target: Tuple[int, int],
     return (move_x, move_y)
 
 
-def random_enum_value(enum_class: Enum) -> Enum:
+@lru_cache(maxsize=None)
+def enum_members(enum_class) -> Tuple[Enum, ...]:
+    """Members of an Enum class in declaration order, built once per class"""
+    return tuple(enum_class)
+
+
+def random_enum_value(enum_class: Enum, rng=random) -> Enum:
     """Return a random value from an Enum class"""
-    return random.choice(list(enum_class))
+    return rng.choice(enum_members(enum_class))
 
 
 def clamp(value: float, min_val: float, max_val: float) -> float:
@@ -89,7 +166,10 @@ def clamp(value: float, min_val: float, max_val: float) -> float:
 
 
 def weighted_choice(choices: Dict[Any, float]) -> Any:
-    """Make a random choice with weighted probabilities"""
+    """
+    Make a random choice with weighted probabilities.
+    For repeated draws from the same weights use WeightedSampler instead.
+    """
     total = sum(choices.values())
     r = random.uniform(0, total)
     upto = 0
@@ -97,4 +177,57 @@ def weighted_choice(choices: Dict[Any, float]) -> Any:
         if upto + weight >= r:
             return item
         upto += weight
-    return list(choices.keys())[0]
\ No newline at end of file
+    return list(choices.keys())[0]
+
+
+class WeightedSampler:
+    """
+    Weighted random choice with the weights preprocessed once (Walker's alias
+    method), so every draw costs O(1) regardless of the number of choices.
+    Draws come from rng, the module-level random by default, so seeding
+    random keeps runs reproducible.
+    """
+
+    def __init__(self, choices: Dict[Any, float], rng=random):
+        if not choices:
+            raise ValueError("WeightedSampler needs at least one choice")
+        total = sum(choices.values())
+        if total <= 0 or any(w < 0 for w in choices.values()):
+            raise ValueError("Weights must be non-negative with a positive total")
+
+        self.rng = rng
+        self.items = tuple(choices)
+        n = len(self.items)
+        scaled = [w * n / total for w in choices.values()]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Leftovers are 1.0 up to rounding error and keep prob 1.0
+
+    def sample(self) -> Any:
+        """Draw one item"""
+        u = self.rng.random() * len(self.items)
+        i = int(u)
+        return self.items[i] if u - i < self.prob[i] else self.items[self.alias[i]]
+
+    def sample_many(self, count: int) -> List[Any]:
+        """Draw count items in one call"""
+        if np is None or count < _VECTORIZE_MIN_TARGETS:
+            return [self.sample() for _ in range(count)]
+
+        # Seed a numpy generator from rng so bulk draws stay reproducible
+        generator = np.random.default_rng(self.rng.getrandbits(64))
+        u = generator.random(count) * len(self.items)
+        index = u.astype(np.int64)
+        keep = (u - index) < np.asarray(self.prob)[index]
+        chosen = np.where(keep, index, np.asarray(self.alias)[index])
+        items = self.items
+        return [items[i] for i in chosen.tolist()]
@@ -0,0 +1,60 @@
+from entities.treasure import TreasureType, DECAY
+from utils.helpers import enum_members
+from typing import Dict, Tuple
+import math
+
+# Re-express the stored weights in current units this often, before the
+# scale factor (a power of 1 / DECAY) makes them lose precision
+_REBASE_STEPS = 1000
+
+
+class TreasureValueTotals:
+    """
+    Running total of the value of the treasures on a grid, per TreasureType.
+
+    Every treasure keeps the same fraction DECAY of its value per step,
+    whether it is updated every step, fast-forwarded or caught up after its
+    chunk slept, so the totals decay by that fraction as well. Each treasure
+    is entered once as its value scaled back to a base step, and the current
+    totals are the stored sums scaled forward to grid.time: adding, removing
+    and reading cost O(1), with no per-step work. Treasures in sleeping
+    chunks that would already have expired stay in until their chunk wakes.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.base = grid.time
+        self.sums: Dict[TreasureType, float] = {t: 0.0 for t in enum_members(TreasureType)}
+        self.weights: Dict[int, Tuple[TreasureType, float]] = {}  # By entity id
+
+    def _scale(self) -> float:
+        """Factor from stored units to values at grid.time"""
+        return DECAY ** (self.grid.time - self.base)
+
+    def add(self, treasure):
+        if self.grid.time - self.base > _REBASE_STEPS:
+            self._rebase()
+        weight = treasure.value / self._scale()
+        self.weights[treasure.id] = (treasure.treasure_type, weight)
+        self.sums[treasure.treasure_type] += weight
+
+    def remove(self, treasure):
+        entry = self.weights.pop(treasure.id, None)
+        if entry is not None:
+            self.sums[entry[0]] -= entry[1]
+
+    def totals(self) -> Dict[TreasureType, float]:
+        scale = self._scale()
+        return {t: max(0.0, total * scale) for t, total in self.sums.items()}
+
+    def _rebase(self):
+        # Rebuild the sums from the weights, which also drops the rounding
+        # residue that incremental adds and removes leave behind
+        scale = self._scale()
+        per_type = {t: [] for t in self.sums}
+        for key, (treasure_type, weight) in self.weights.items():
+            weight *= scale
+            self.weights[key] = (treasure_type, weight)
+            per_type[treasure_type].append(weight)
+        self.sums = {t: math.fsum(weights) for t, weights in per_type.items()}
+        self.base = self.grid.time
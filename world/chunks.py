@@ -0,0 +1,207 @@
+from typing import Set, Tuple, Dict, Optional, List
+from entities.entity import Entity, EntityType
+from entities.treasure import Treasure, TreasureType
+from utils.helpers import enum_members, WeightedSampler
+import random
+
+# Mixing constants for per-chunk seeds (large odd 64-bit values)
+_CHUNK_SEED_X = 0x9E3779B97F4A7C15
+_CHUNK_SEED_Y = 0xC2B2AE3D27D4EB4F
+_MASK_64 = (1 << 64) - 1
+
+
+def _axis_chunks(center: int, radius: int, chunk_size: int, size: int) -> List[int]:
+    """Chunk indices along one axis overlapping [center - radius, center + radius], wrapped"""
+    last = (size - 1) // chunk_size
+    if 2 * radius + 1 >= size:
+        return list(range(last + 1))
+    low = (center - radius) % size
+    high = (center + radius) % size
+    if low <= high:
+        return list(range(low // chunk_size, high // chunk_size + 1))
+    # The window wraps: the tail of the axis (possibly a partial last
+    # chunk) and its head are separate runs of chunks
+    return sorted(set(range(low // chunk_size, last + 1)) | set(range(high // chunk_size + 1)))
+
+
+def chunks_in_window(position: Tuple[int, int], radius: int, chunk_size: int,
+                     width: int, height: int) -> List[Tuple[int, int]]:
+    """Chunks overlapping the wrapped square of given radius around position"""
+    xs = _axis_chunks(position[0], radius, chunk_size, width)
+    ys = _axis_chunks(position[1], radius, chunk_size, height)
+    return [(cx, cy) for cx in xs for cy in ys]
+
+
+class ChunkedTreasureField:
+    """
+    Lazily generated treasures for large worlds.
+
+    The map is split into square chunks. A chunk's treasures are generated
+    the first time a hunter or knight can perceive it, from a random stream
+    derived only from the world seed and the chunk coordinates, so the same
+    seed always yields the same treasure layout no matter in which order
+    chunks are explored. Chunks nobody comes near are never materialized.
+    """
+
+    def __init__(self, width: int, height: int, seed: int,
+                 density: Tuple[float, float] = (0.15, 0.25), chunk_size: int = 32,
+                 treasure_weights: Optional[Dict[TreasureType, float]] = None):
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.density = density
+        self.chunk_size = chunk_size
+        self.chunks_x = -(-width // chunk_size)
+        self.chunks_y = -(-height // chunk_size)
+        self.treasure_weights = treasure_weights or {t: 1.0 for t in enum_members(TreasureType)}
+        self.generated: Set[Tuple[int, int]] = set()
+
+    def chunk_of(self, position: Tuple[int, int]) -> Tuple[int, int]:
+        return (position[0] // self.chunk_size, position[1] // self.chunk_size)
+
+    def has_unexplored_chunks(self) -> bool:
+        return len(self.generated) < self.chunks_x * self.chunks_y
+
+    def materialize_around(self, grid, position: Tuple[int, int], radius: int) -> int:
+        """Generate every chunk within radius of position, returns treasures added"""
+        added = 0
+        for cx, cy in chunks_in_window(position, radius, self.chunk_size, self.width, self.height):
+            if (cx, cy) not in self.generated:
+                added += self._generate_chunk(grid, cx, cy)
+        return added
+
+    def _chunk_rng(self, cx: int, cy: int) -> random.Random:
+        mixed = (self.seed ^ (cx * _CHUNK_SEED_X) ^ (cy * _CHUNK_SEED_Y)) & _MASK_64
+        return random.Random(mixed)
+
+    def _generate_chunk(self, grid, cx: int, cy: int) -> int:
+        self.generated.add((cx, cy))
+        rng = self._chunk_rng(cx, cy)
+
+        x0, y0 = cx * self.chunk_size, cy * self.chunk_size
+        x1 = min(x0 + self.chunk_size, self.width)
+        y1 = min(y0 + self.chunk_size, self.height)
+        cells = (x1 - x0) * (y1 - y0)
+        count = int(cells * rng.uniform(*self.density))
+
+        added = 0
+        sampler = WeightedSampler(self.treasure_weights, rng)
+        for treasure_type in sampler.sample_many(count):
+            pos = (rng.randrange(x0, x1), rng.randrange(y0, y1))
+            # Cells already taken by explorers or earlier draws are skipped
+            # rather than resampled, keeping the draw sequence fixed per chunk
+            if grid.is_empty(pos):
+                grid.add_entity(Treasure(pos, treasure_type), pos)
+                added += 1
+        return added
+
+
+class ChunkActivity:
+    """
+    Chunk sleeping for EldoriaGrid.update.
+
+    Treasures are indexed by chunk. A chunk is awake while a hunter or knight
+    is inside it or within radius of it; every other chunk sleeps and its
+    treasures are not updated. Each sleeping chunk remembers the step it fell
+    asleep at, and when it wakes up its treasures are brought up to date in
+    one go (Treasure.skip_steps), so per-step cost follows the active
+    frontier rather than the whole map. Non-treasure entities (the actors)
+    are always updated, in insertion order, before the awake treasures.
+    """
+
+    def __init__(self, grid, chunk_size: int = 32, radius: int = 4):
+        self.grid = grid
+        self.chunk_size = chunk_size
+        self.radius = radius
+        self.actors: List[Entity] = []
+        self.treasures: Dict[Tuple[int, int], Dict[Tuple[int, int], Treasure]] = {}
+        self.awake: Set[Tuple[int, int]] = set()
+        self.asleep_since: Dict[Tuple[int, int], int] = {}
+        self.now = grid.time
+
+        for entity in grid.entities:
+            self.on_add(entity)
+
+    def chunk_of(self, position: Tuple[int, int]) -> Tuple[int, int]:
+        return (position[0] // self.chunk_size, position[1] // self.chunk_size)
+
+    def on_add(self, entity: Entity):
+        if entity.type != EntityType.TREASURE:
+            self.actors.append(entity)
+            return
+
+        chunk = self.chunk_of(entity.position)
+        self.treasures.setdefault(chunk, {})
+        if chunk not in self.awake:
+            # Bring the chunk up to date so the newcomer is not aged with it
+            self._catch_up(chunk)
+            self.asleep_since[chunk] = self.now
+        self.treasures.setdefault(chunk, {})[entity.position] = entity
+
+    def on_remove(self, entity: Entity, position: Tuple[int, int]):
+        if entity.type != EntityType.TREASURE:
+            if entity in self.actors:
+                self.actors.remove(entity)
+            return
+
+        chunk = self.chunk_of(position)
+        chunk_treasures = self.treasures.get(chunk)
+        if chunk_treasures is not None:
+            chunk_treasures.pop(position, None)
+            if not chunk_treasures:
+                del self.treasures[chunk]
+                self.asleep_since.pop(chunk, None)
+
+    def on_move(self, entity: Entity, old_pos: Tuple[int, int]):
+        if entity.type == EntityType.TREASURE:
+            self.on_remove(entity, old_pos)
+            self.on_add(entity)
+
+    def refresh(self, grid):
+        """Wake chunks near hunters and knights, put the rest to sleep"""
+        self.now = grid.time
+        active = set()
+        for entity in self.actors:
+            if entity.type == EntityType.HUNTER or entity.type == EntityType.KNIGHT:
+                active.update(chunks_in_window(entity.position, self.radius,
+                                               self.chunk_size, grid.width, grid.height))
+
+        for chunk in self.awake - active:
+            self.asleep_since[chunk] = self.now
+        for chunk in active - self.awake:
+            self._catch_up(chunk)
+            self.asleep_since.pop(chunk, None)
+        self.awake = active
+
+    def _catch_up(self, chunk: Tuple[int, int]):
+        since = self.asleep_since.get(chunk)
+        elapsed = self.now - since if since is not None else 0
+        chunk_treasures = self.treasures.get(chunk)
+        if elapsed <= 0 or not chunk_treasures:
+            return
+
+        for position, treasure in list(chunk_treasures.items()):
+            if not treasure.skip_steps(elapsed, self.grid):
+                self.grid.retire_entity(treasure)
+        if chunk in self.treasures:
+            self.asleep_since[chunk] = self.now
+
+    def lag(self, position: Tuple[int, int]) -> int:
+        """Steps the treasures of position's chunk are behind the grid (0 if awake)"""
+        since = self.asleep_since.get(self.chunk_of(position))
+        return self.grid.time - since if since is not None else 0
+
+    def settle(self):
+        """Bring every sleeping chunk up to date, e.g. before taking exact stats"""
+        self.now = self.grid.time
+        for chunk in list(self.asleep_since):
+            self._catch_up(chunk)
+
+    def live_entities(self) -> List[Entity]:
+        """Entities to update this step: actors, then awake treasures"""
+        live = list(self.actors)
+        for chunk in sorted(self.awake):
+            chunk_treasures = self.treasures.get(chunk)
+            if chunk_treasures:
+                live.extend(chunk_treasures.values())
+        return live
@@ -0,0 +1,83 @@
+from enum import Enum
+from entities.entity import Entity
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+
+class EventType(Enum):
+    MOVE = 1       # data: the old position
+    PICKUP = 2     # data: the treasure picked up
+    DEPOSIT = 3    # data: the treasure deposited; entity is the hunter
+    DETAIN = 4     # entity is the knight; data: the hunter
+    CHALLENGE = 5  # entity is the knight; data: the hunter
+    RECRUIT = 6    # entity is the hideout; data: the new hunter
+    EXPIRE = 7     # a treasure whose value decayed away
+    DEATH = 8      # a collapsed hunter (or any other entity) leaving the world
+
+
+class Event(NamedTuple):
+    type: EventType
+    step: int
+    entity: Entity
+    position: Tuple[int, int]
+    data: Any = None
+
+
+Handler = Callable[[List[Event]], None]
+
+
+class EventBus:
+    """
+    Typed simulation events, delivered in per-step batches.
+
+    Emitters guard every emit with `if bus.active`, so with nobody subscribed
+    instrumentation costs one attribute check; event types nobody listens to
+    are dropped inside emit() without building an Event. Events are buffered
+    per type and handed to each subscriber as one list when dispatch() runs,
+    which the grid does once at the end of every step.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[EventType, List[Handler]] = {}
+        self._pending: Dict[EventType, List[Event]] = {}
+        self.active = frozenset()  # Event types with at least one subscriber
+
+    def subscribe(self, event_types: Union[EventType, Iterable[EventType]], handler: Handler):
+        if isinstance(event_types, EventType):
+            event_types = [event_types]
+        for event_type in event_types:
+            self._handlers.setdefault(event_type, []).append(handler)
+        self.active = frozenset(self._handlers)
+
+    def unsubscribe(self, event_types: Union[EventType, Iterable[EventType]], handler: Handler):
+        if isinstance(event_types, EventType):
+            event_types = [event_types]
+        for event_type in event_types:
+            handlers = self._handlers.get(event_type, [])
+            if handler in handlers:
+                handlers.remove(handler)
+            if not handlers:
+                self._handlers.pop(event_type, None)
+                self._pending.pop(event_type, None)
+        self.active = frozenset(self._handlers)
+
+    def emit(self, event_type: EventType, step: int, entity: Entity,
+             position: Tuple[int, int], data: Any = None):
+        if event_type in self.active:
+            self._pending.setdefault(event_type, []).append(
+                Event(event_type, step, entity, position, data)
+            )
+
+    def dispatch(self):
+        """Deliver the buffered batches, one call per handler and event type"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        for event_type, batch in pending.items():
+            for handler in list(self._handlers.get(event_type, ())):
+                handler(batch)
+
+    def pending(self, event_type: Optional[EventType] = None) -> int:
+        """Number of buffered, not yet dispatched events"""
+        if event_type is not None:
+            return len(self._pending.get(event_type, ()))
+        return sum(len(batch) for batch in self._pending.values())
@@ -1,68 +1,269 @@
 from typing import Dict, Tuple, List, Optional
+from array import array
 from entities.entity import Entity, EntityType
+from utils.helpers import get_offset_stencil
+from world.chunks import ChunkActivity
+from world.hashing import cell_key, attribute_key
+from world.events import EventBus, EventType
+from entities.treasure import Treasure, MIN_VALUE
+from world.aggregates import TreasureValueTotals
 import random
 
 
+def _is_active_hunter(entity: Entity) -> bool:
+    return entity.type == EntityType.HUNTER and getattr(entity, 'stamina', 0) > 0
+
+
 class EldoriaGrid:
+    """Dense grid backend: one list-of-lists cell per position"""
+
     def __init__(self, width: int = 20, height: int = 20):
         self.width = width
         self.height = height
-        self.grid = [[None for _ in range(height)] for _ in range(width)]
-        self.entities = []
+        self._init_storage()
+        # Entities by id, in insertion order, so that removal is O(1)
+        self._entities: Dict[int, Entity] = {}
+        self.type_counts = {entity_type: 0 for entity_type in EntityType}
+        self.active_hunters = 0  # Hunters on the grid with stamina left
+        self.hunters: Dict[int, Entity] = {}  # Hunters on the grid by id
+        self.time = 0  # Completed update() calls
+        self.activity = None  # ChunkActivity once chunk sleeping is enabled
+        self.zobrist = 0  # XOR of cell_key() over every (position, type) on the grid
+        self.events = EventBus()
+        self.treasure_values = TreasureValueTotals(self)
+        # Source of entity randomness; simulations swap in their own generator
+        self.rng = random
+
+    def _init_storage(self):
+        self.grid = [[None for _ in range(self.height)] for _ in range(self.width)]
+        # EntityType value and entity id per cell, row-major (index y * width + x)
+        self.type_layer = bytearray(self.width * self.height)
+        self.id_layer = array('i', bytes(4 * self.width * self.height))
+
+    @property
+    def entities(self):
+        """Every entity on the grid, in the order they were added"""
+        return self._entities.values()
+
+    def _get_cell(self, x: int, y: int) -> Optional[Entity]:
+        return self.grid[x][y]
+
+    def _set_cell(self, x: int, y: int, entity: Optional[Entity]):
+        self.grid[x][y] = entity
+        index = y * self.width + x
+        if entity is None:
+            self.type_layer[index] = 0
+            self.id_layer[index] = 0
+        else:
+            self.type_layer[index] = entity.type.value
+            self.id_layer[index] = entity.id
 
     def add_entity(self, entity: Entity, position: Tuple[int, int]) -> bool:
         x, y = position
-        if self.grid[x][y] is not None:
+        if self._get_cell(x, y) is not None:
             return False
 
         entity.position = position
-        self.grid[x][y] = entity
-        self.entities.append(entity)
+        self._set_cell(x, y, entity)
+        self._entities[entity.id] = entity
+        self.type_counts[entity.type] += 1
+        if entity.type == EntityType.HUNTER:
+            self.hunters[entity.id] = entity
+            if _is_active_hunter(entity):
+                self.active_hunters += 1
+        elif isinstance(entity, Treasure):
+            self.treasure_values.add(entity)
+        self.zobrist ^= cell_key(position, entity.type)
+        if self.activity is not None:
+            self.activity.on_add(entity)
         return True
 
     def move_entity(self, old_pos: Tuple[int, int], new_pos: Tuple[int, int]) -> bool:
         old_x, old_y = old_pos
         new_x, new_y = new_pos
 
-        entity = self.grid[old_x][old_y]
-        if entity is None or self.grid[new_x][new_y] is not None:
+        entity = self._get_cell(old_x, old_y)
+        if entity is None or self._get_cell(new_x, new_y) is not None:
             return False
 
-        self.grid[old_x][old_y] = None
-        self.grid[new_x][new_y] = entity
+        self._set_cell(old_x, old_y, None)
+        self._set_cell(new_x, new_y, entity)
         entity.position = (new_x, new_y)
+        self.zobrist ^= cell_key(old_pos, entity.type) ^ cell_key(entity.position, entity.type)
+        if self.events.active:
+            self.events.emit(EventType.MOVE, self.time, entity, entity.position, old_pos)
+        if self.activity is not None:
+            self.activity.on_move(entity, old_pos)
         return True
 
     def remove_entity(self, position: Tuple[int, int]) -> bool:
         x, y = position
-        entity = self.grid[x][y]
+        entity = self._get_cell(x, y)
         if entity is None:
             return False
 
-        self.grid[x][y] = None
-        if entity in self.entities:
-            self.entities.remove(entity)
+        self._set_cell(x, y, None)
+        self._entities.pop(entity.id, None)
+        self.type_counts[entity.type] -= 1
+        if entity.type == EntityType.HUNTER:
+            self.hunters.pop(entity.id, None)
+            if _is_active_hunter(entity):
+                self.active_hunters -= 1
+        elif isinstance(entity, Treasure):
+            self.treasure_values.remove(entity)
+        self.zobrist ^= cell_key(position, entity.type)
+        if self.activity is not None:
+            self.activity.on_remove(entity, position)
+        return True
+
+    def hunter_collapsed(self, hunter: Entity):
+        """A hunter on the grid ran out of stamina (it never recovers from 0)"""
+        if self.get_entity(hunter.position) is hunter:
+            self.active_hunters -= 1
+
+    def retire_entity(self, entity: Entity) -> bool:
+        """Remove an entity whose update ended its life (expired or died)"""
+        position = entity.position
+        if not self.remove_entity(position):
+            return False
+        if self.events.active:
+            kind = EventType.EXPIRE if entity.type == EntityType.TREASURE else EventType.DEATH
+            self.events.emit(kind, self.time, entity, position)
         return True
 
     def get_entity(self, position: Tuple[int, int]) -> Optional[Entity]:
         x, y = position
-        return self.grid[x][y]
+        return self._get_cell(x, y)
 
     def is_empty(self, position: Tuple[int, int]) -> bool:
         x, y = position
-        return self.grid[x][y] is None
+        return self._get_cell(x, y) is None
+
+    def get_type_row(self, y: int, x_start: int, count: int) -> bytes:
+        """EntityType values of count cells of row y from x_start, wrapping"""
+        start = y * self.width
+        x_start %= self.width
+        if x_start + count <= self.width:
+            return bytes(self.type_layer[start + x_start:start + x_start + count])
+        row = self.type_layer[start:start + self.width]
+        out = bytearray()
+        while len(out) < count:
+            out += row[x_start:x_start + count - len(out)]
+            x_start = 0
+        return bytes(out)
+
+    def get_entities_in_radius(self, position: Tuple[int, int], radius: int,
+                               entity_type: Optional[EntityType] = None) -> List[Entity]:
+        """
+        Return entities in the square of given radius around position
+        (excluding the center), in the same dx-major scan order entities use
+        """
+        x, y = position
+        found = []
+        for dx, dy in get_offset_stencil(radius):
+            entity = self._get_cell((x + dx) % self.width, (y + dy) % self.height)
+            if entity is not None and (entity_type is None or entity.type == entity_type):
+                found.append(entity)
+        return found
+
+    def state_hash(self, include_attributes: bool = False) -> int:
+        """
+        64-bit hash of the grid state. Occupancy is hashed incrementally, so
+        the default costs O(1); with include_attributes the quantized entity
+        attributes (values, stamina, energy, ...) are folded in with one pass
+        over the entities, since those change inside entity updates.
+        Treasures in sleeping chunks are hashed as if caught up (and left out
+        if they would have expired), without waking anything.
+        """
+        if not include_attributes:
+            return self.zobrist
+        state = self.zobrist
+        for entity in self.entities:
+            lag = self.lag(entity)
+            if not lag:
+                state ^= attribute_key(entity)
+                continue
+            value = entity.value_after(lag)
+            if value > MIN_VALUE:
+                state ^= attribute_key(entity, {'value': value})
+            else:
+                state ^= cell_key(entity.position, entity.type)
+        return state
+
+    def lag(self, entity: Entity) -> int:
+        """Steps entity's updates are behind grid.time: nonzero only in sleeping chunks"""
+        if self.activity is None or entity.type != EntityType.TREASURE:
+            return 0
+        return self.activity.lag(entity.position)
+
+    def treasure_value(self, treasure, position: Tuple[int, int]) -> Optional[float]:
+        """
+        Current value of treasure if it is still at position, else None.
+        Treasures in sleeping chunks are valued as if caught up (and are
+        gone if they would have expired), without waking the chunk.
+        """
+        if self._get_cell(*position) is not treasure:
+            return None
+        lag = self.lag(treasure)
+        if not lag:
+            return treasure.value
+        value = treasure.value_after(lag)
+        return value if value > MIN_VALUE else None
+
+    def enable_chunk_sleeping(self, chunk_size: int = 32, radius: int = 4):
+        """
+        Only update treasures in chunks within radius of a hunter or knight;
+        the rest sleep and are caught up when someone comes near
+        """
+        self.activity = ChunkActivity(self, chunk_size, radius)
+
+    def settle(self):
+        """Bring sleeping chunks up to date (no-op without chunk sleeping)"""
+        if self.activity is not None:
+            self.activity.settle()
+
+    def _live_entities(self) -> List[Entity]:
+        if self.activity is None:
+            return list(self._entities.values())  # Create a copy for iteration
+        self.activity.refresh(self)
+        return self.activity.live_entities()
 
     def update(self):
-        # Update all entities
-        for entity in self.entities[:]:  # Create a copy for iteration
+        # Update all entities (or only those in awake chunks)
+        for entity in self._live_entities():
             if not entity.update(self):
                 # Entity should be removed
-                self.remove_entity(entity.position)
+                self.retire_entity(entity)
+        self.time += 1
+        self.events.dispatch()
+
+    def quiescent_window(self, limit: int) -> int:
+        """
+        Number of upcoming steps (up to limit) that every entity can skip in
+        closed form, 0 as soon as one entity needs a normal update
+        """
+        window = limit
+        entities = self.activity.actors if self.activity is not None else self.entities
+        for entity in entities:
+            idle = entity.idle_steps(self)
+            if idle < window:
+                window = int(idle)
+                if window == 0:
+                    return 0
+        return window
+
+    def fast_forward(self, steps: int):
+        """Advance steps quiescent steps at once (see quiescent_window)"""
+        for entity in self._live_entities():
+            if not entity.skip_steps(steps, self):
+                self.retire_entity(entity)
+        self.time += steps
+        self.events.dispatch()
 
     def display(self):
         for y in range(self.height):
             row = []
             for x in range(self.width):
-                entity = self.grid[x][y]
+                entity = self._get_cell(x, y)
                 row.append(str(entity) if entity else ".")
-            print(" ".join(row))
\ No newline at end of file
+            print(" ".join(row))
@@ -0,0 +1,62 @@
+from entities.entity import Entity, EntityType
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple
+
+MASK64 = (1 << 64) - 1
+
+# Float attributes are rounded to this step before hashing, so the tiny
+# rounding differences of closed-form fast-forwarding do not change the hash
+QUANTUM = 1e-6
+
+# Attributes folded into the hash per entity type: everything that changes
+# how an entity behaves or what it is worth. A carried treasure is hashed
+# with its own attributes.
+HASHED_ATTRIBUTES = {
+    EntityType.TREASURE: ('value', 'treasure_type'),
+    EntityType.HUNTER: ('stamina', 'resting', 'skill', 'carrying'),
+    EntityType.KNIGHT: ('energy', 'resting'),
+    EntityType.HIDEOUT: ('treasure_count',),
+}
+
+
+def splitmix64(x: int) -> int:
+    """SplitMix64 finalizer: a cheap, well-mixed 64-bit hash of an integer"""
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+def cell_key(position: Tuple[int, int], entity_type: EntityType) -> int:
+    """
+    Zobrist key of an entity type on a cell. Keys are derived from the
+    coordinates instead of a random table, so they cost no memory on huge
+    grids and agree across runs, machines and backends.
+    """
+    x, y = position
+    return splitmix64((((x & 0xFFFFFFF) << 28 | (y & 0xFFFFFFF)) << 3) | entity_type.value)
+
+
+def _quantize(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Entity):
+        # Folded from a non-zero seed, so carrying anything differs from None
+        return _fold(value.type.value, value)
+    if isinstance(value, float):
+        return round(value / QUANTUM)
+    return int(value)
+
+
+def _fold(key: int, entity: Entity, overrides: Optional[Dict[str, Any]] = None) -> int:
+    for name in HASHED_ATTRIBUTES.get(entity.type, ()):
+        value = overrides[name] if overrides and name in overrides else getattr(entity, name)
+        key = splitmix64(key ^ (_quantize(value) & MASK64))
+    return key
+
+
+def attribute_key(entity: Entity, overrides: Optional[Dict[str, Any]] = None) -> int:
+    """Hash of an entity's quantized attributes (or overrides), bound to its cell"""
+    return _fold(cell_key(entity.position, entity.type), entity, overrides)
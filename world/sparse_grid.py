@@ -0,0 +1,90 @@
+from typing import Dict, Tuple, List, Optional, Set
+from entities.entity import Entity, EntityType
+from world.grid import EldoriaGrid
+
+
+class SparseEldoriaGrid(EldoriaGrid):
+    """
+    Sparse grid backend for huge, low-density worlds.
+
+    Only occupied cells are stored (a position -> entity hash map), so memory
+    scales with the number of entities instead of width * height. Entities are
+    also indexed per type in coarse spatial buckets so radius queries touch
+    only the few buckets around the query point.
+    """
+
+    def __init__(self, width: int = 20, height: int = 20, bucket_size: int = 16):
+        self.bucket_size = bucket_size
+        super().__init__(width, height)
+
+    def _init_storage(self):
+        self.cells: Dict[Tuple[int, int], Entity] = {}
+        self.buckets: Dict[EntityType, Dict[Tuple[int, int], Set[Tuple[int, int]]]] = {
+            entity_type: {} for entity_type in EntityType
+        }
+
+    def _bucket_of(self, x: int, y: int) -> Tuple[int, int]:
+        return (x // self.bucket_size, y // self.bucket_size)
+
+    def _get_cell(self, x: int, y: int) -> Optional[Entity]:
+        return self.cells.get((x, y))
+
+    def _set_cell(self, x: int, y: int, entity: Optional[Entity]):
+        pos = (x, y)
+        old = self.cells.get(pos)
+        if old is not None:
+            bucket = self.buckets[old.type][self._bucket_of(x, y)]
+            bucket.discard(pos)
+            if not bucket:
+                del self.buckets[old.type][self._bucket_of(x, y)]
+            del self.cells[pos]
+
+        if entity is not None:
+            self.cells[pos] = entity
+            self.buckets[entity.type].setdefault(self._bucket_of(x, y), set()).add(pos)
+
+    def get_type_row(self, y: int, x_start: int, count: int) -> bytes:
+        cells = self.cells
+        width = self.width
+        row = bytearray(count)
+        for i in range(count):
+            entity = cells.get(((x_start + i) % width, y))
+            if entity is not None:
+                row[i] = entity.type.value
+        return bytes(row)
+
+    def get_entities_in_radius(self, position: Tuple[int, int], radius: int,
+                               entity_type: Optional[EntityType] = None) -> List[Entity]:
+        # A window wider than the world visits some cells twice; the plain
+        # cell scan reproduces that exactly
+        span = 2 * radius + 1
+        if span > self.width or span > self.height:
+            return super().get_entities_in_radius(position, radius, entity_type)
+
+        x, y = position
+        types = [entity_type] if entity_type is not None else list(EntityType)
+        bucket_xs = {((x + d) % self.width) // self.bucket_size for d in range(-radius, radius + 1)}
+        bucket_ys = {((y + d) % self.height) // self.bucket_size for d in range(-radius, radius + 1)}
+
+        hits = []
+        for t in types:
+            type_buckets = self.buckets[t]
+            if not type_buckets:
+                continue
+            for bx in bucket_xs:
+                for by in bucket_ys:
+                    for px, py in type_buckets.get((bx, by), ()):
+                        dx = (px - x + radius) % self.width - radius
+                        dy = (py - y + radius) % self.height - radius
+                        if (dx or dy) and abs(dx) <= radius and abs(dy) <= radius:
+                            hits.append((dx, dy, self.cells[(px, py)]))
+
+        # Match the dense backend's dx-major scan order
+        hits.sort(key=lambda hit: (hit[0], hit[1]))
+        return [entity for _, _, entity in hits]
+
+    def display(self):
+        if self.width * self.height > 10000:
+            print(f"<sparse {self.width}x{self.height} grid, {len(self.cells)} occupied cells>")
+            return
+        super().display()
@@ -0,0 +1,227 @@
+from entities.entity import EntityType
+from entities.treasure import Treasure, TreasureType
+from entities.hunter import TreasureHunter, HunterSkill
+from entities.knight import Knight
+from entities.hideout import Hideout
+from typing import Any, Dict, List
+import hashlib
+import json
+import mmap
+import os
+import random
+import struct
+import tempfile
+import time
+
+FORMAT_VERSION = 1
+MAGIC = b"ELDW"
+SUFFIX = ".eldw"
+
+# magic, version, entities, hideouts, hideout hunters, generated chunks,
+# random state version, has gauss_next, gauss_next
+_HEADER = struct.Struct("<4sHIIIIBBd")
+_RANDOM_WORDS = 625  # Mersenne Twister state plus position
+_ENTITY = struct.Struct("<BBII")  # type, treasure type or skill, x, y
+_HIDEOUT = struct.Struct("<I")  # entity record of the hideout
+_HUNTER = struct.Struct("<HBi")  # hideout number, skill, entity record or -1
+_CHUNK = struct.Struct("<II")
+
+
+def template_key(params: Dict[str, Any]) -> str:
+    """Content address of an initialized world: a hash of everything that shapes it"""
+    canonical = json.dumps({'version': FORMAT_VERSION, **params}, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _touch(path: str):
+    # Explicit nanosecond stamps; filesystem clocks can be too coarse to order hits
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+
+class WorldTemplateCache:
+    """
+    On-disk cache of freshly initialized worlds.
+
+    A template holds the entities in grid order (type, subtype, position),
+    the hideouts and their hunters, the lazily generated treasure chunks and
+    the world's random state right after initialization, packed into a flat
+    little-endian file named after its content key. Loading memory-maps the
+    file and rebuilds the world without any placement sampling, and leaves
+    the world's generator in the same state a fresh initialization would, so cached and
+    uncached runs are identical. Hits refresh the file's mtime, and the
+    least recently used templates are evicted beyond max_entries files or
+    max_bytes in total.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 1000, max_bytes: int = 256 * 1024 * 1024):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def store(self, key: str, sim):
+        """Save sim's freshly initialized world under key"""
+        grid = sim.grid
+        index_of = {id(entity): i for i, entity in enumerate(grid.entities)}
+
+        entities = bytearray()
+        for entity in grid.entities:
+            subtype = 0
+            if entity.type == EntityType.TREASURE:
+                subtype = entity.treasure_type.value
+            elif entity.type == EntityType.HUNTER:
+                subtype = entity.skill.value
+            entities += _ENTITY.pack(entity.type.value, subtype, *entity.position)
+
+        hideouts = bytearray()
+        hunters = bytearray()
+        hunter_count = 0
+        for number, hideout in enumerate(sim.hideouts):
+            hideouts += _HIDEOUT.pack(index_of[id(hideout)])
+            for hunter in hideout.hunters:
+                hunters += _HUNTER.pack(number, hunter.skill.value, index_of.get(id(hunter), -1))
+                hunter_count += 1
+
+        chunks = bytearray()
+        generated = sorted(sim.treasure_field.generated) if sim.treasure_field is not None else []
+        for chunk in generated:
+            chunks += _CHUNK.pack(*chunk)
+
+        version, words, gauss = sim.rng.getstate()
+        header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(grid.entities), len(sim.hideouts),
+                              hunter_count, len(generated), version,
+                              gauss is not None, gauss or 0.0)
+        data = header + struct.pack(f"<{_RANDOM_WORDS}I", *words) + entities + hideouts + hunters + chunks
+
+        # Write then rename, so concurrent sweeps never read a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+        _touch(self._path(key))
+        self._evict()
+
+    def load(self, key: str, sim) -> bool:
+        """
+        Populate sim's empty world from the template under key; False on a
+        miss. A truncated or corrupted template counts as a miss and is
+        removed, and sim is left untouched so it can initialize normally.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                template = self._parse(data, sim)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        except (ValueError, IndexError, TypeError, struct.error):
+            # mmap refuses empty files with ValueError, like the parser does bad records
+            self.misses += 1
+            self._discard(path)
+            return False
+        if template is None:
+            self.misses += 1
+            return False
+
+        entities, hideouts, members, chunks, random_state = template
+        sim.rng.setstate(random_state)
+        for entity in entities:
+            sim.grid.add_entity(entity, entity.position)
+        sim.hideouts.extend(hideouts)
+        for hideout, hunter in members:
+            hideout.add_hunter(hunter)
+        if sim.treasure_field is not None:
+            sim.treasure_field.generated.update(chunks)
+
+        _touch(path)  # Mark as recently used
+        self.hits += 1
+        return True
+
+    def _parse(self, data, sim):
+        """The template's contents, None if it has another format; raises if corrupted"""
+        (magic, version, n_entities, n_hideouts, n_hunters, n_chunks,
+         random_version, has_gauss, gauss) = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            return None
+        size = (_HEADER.size + 4 * _RANDOM_WORDS + n_entities * _ENTITY.size
+                + n_hideouts * _HIDEOUT.size + n_hunters * _HUNTER.size + n_chunks * _CHUNK.size)
+        if len(data) != size:
+            raise ValueError("Template size does not match its header")
+
+        offset = _HEADER.size
+        words = struct.unpack_from(f"<{_RANDOM_WORDS}I", data, offset)
+        random_state = (random_version, words, gauss if has_gauss else None)
+        random.Random().setstate(random_state)  # Raises on a corrupted state
+        offset += 4 * _RANDOM_WORDS
+
+        entities = []
+        positions = set()
+        for type_value, subtype, x, y in _ENTITY.iter_unpack(data[offset:offset + n_entities * _ENTITY.size]):
+            if x >= sim.grid.width or y >= sim.grid.height or (x, y) in positions:
+                raise ValueError(f"Bad entity position {(x, y)}")
+            positions.add((x, y))
+            entities.append(self._create(sim, EntityType(type_value), subtype, (x, y)))
+        offset += n_entities * _ENTITY.size
+
+        hideouts = [entities[record] for (record,) in
+                    _HIDEOUT.iter_unpack(data[offset:offset + n_hideouts * _HIDEOUT.size])]
+        if not all(isinstance(hideout, Hideout) for hideout in hideouts):
+            raise ValueError("Hideout record points at another entity")
+        offset += n_hideouts * _HIDEOUT.size
+
+        members = []
+        for number, _, record in _HUNTER.iter_unpack(data[offset:offset + n_hunters * _HUNTER.size]):
+            if record >= 0:  # Hunters never placed on the grid are not members
+                if not isinstance(entities[record], TreasureHunter):
+                    raise ValueError("Hunter record points at another entity")
+                members.append((hideouts[number], entities[record]))
+        offset += n_hunters * _HUNTER.size
+
+        chunks = list(_CHUNK.iter_unpack(data[offset:offset + n_chunks * _CHUNK.size]))
+        return entities, hideouts, members, chunks, random_state
+
+    @staticmethod
+    def _discard(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # Removed by another process
+
+    @staticmethod
+    def _create(sim, entity_type: EntityType, subtype: int, position):
+        if entity_type == EntityType.TREASURE:
+            return Treasure(position, TreasureType(subtype))
+        if entity_type == EntityType.HUNTER:
+            return TreasureHunter(position, HunterSkill(subtype))
+        if entity_type == EntityType.KNIGHT:
+            return Knight(position)
+        if entity_type == EntityType.HIDEOUT:
+            return Hideout(position, sim.hideout_history)
+        raise ValueError(f"Cannot restore entity type {entity_type}")
+
+    def _templates(self) -> List[os.DirEntry]:
+        return [entry for entry in os.scandir(self.directory) if entry.name.endswith(SUFFIX)]
+
+    def _evict(self):
+        entries = sorted(self._templates(), key=lambda entry: entry.stat().st_mtime_ns)
+        total = sum(entry.stat().st_size for entry in entries)
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            oldest = entries.pop(0)
+            total -= oldest.stat().st_size
+            try:
+                os.remove(oldest.path)
+            except FileNotFoundError:
+                pass  # Evicted by another process
+
+    def clear(self):
+        for entry in self._templates():
+            os.remove(entry.path)
@@ -0,0 +1,112 @@
+from entities.entity import EntityType
+from typing import Optional
+import time
+
+
+class TerminationPolicy:
+    """
+    Decides when a simulation should stop on top of the built-in conditions
+    (no treasures or no active hunters left). check() runs after every step
+    and must be cheap: it should only read the simulation's counters.
+    """
+
+    def reset(self, sim):
+        """Called when the policy is attached to a simulation"""
+
+    def check(self, sim) -> Optional[str]:
+        """Return a reason string to stop, or None to keep running"""
+        return None
+
+    def steps_until_due(self, sim) -> Optional[int]:
+        """
+        Steps after which check() could fire if nothing changes, so that
+        fast-forwarding never jumps past it. None if there is no such bound.
+        """
+        return None
+
+
+class StepBudget(TerminationPolicy):
+    def __init__(self, max_steps: int):
+        self.max_steps = max_steps
+
+    def check(self, sim) -> Optional[str]:
+        if sim.steps >= self.max_steps:
+            return f"step budget of {self.max_steps} reached"
+        return None
+
+    def steps_until_due(self, sim) -> Optional[int]:
+        return max(1, self.max_steps - sim.steps)
+
+
+class WallClockBudget(TerminationPolicy):
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.started = time.monotonic()
+
+    def reset(self, sim):
+        self.started = time.monotonic()
+
+    def check(self, sim) -> Optional[str]:
+        if time.monotonic() - self.started >= self.seconds:
+            return f"wall-clock budget of {self.seconds}s used up"
+        return None
+
+
+class NoCollection(TerminationPolicy):
+    """Stop once no treasure has been deposited for the given number of steps"""
+
+    def __init__(self, steps: int):
+        self.steps = steps
+        self.last_collected = 0
+        self.last_change = 0
+
+    def reset(self, sim):
+        self.last_collected = sim.collected_treasures()
+        self.last_change = sim.steps
+
+    def check(self, sim) -> Optional[str]:
+        collected = sim.collected_treasures()
+        if collected != self.last_collected:
+            self.last_collected = collected
+            self.last_change = sim.steps
+        elif sim.steps - self.last_change >= self.steps:
+            return f"no treasure collected in {self.steps} steps"
+        return None
+
+    def steps_until_due(self, sim) -> Optional[int]:
+        return max(1, self.steps - (sim.steps - self.last_change))
+
+
+class StatsPlateau(TerminationPolicy):
+    """Stop once entity counts and collected treasures stay unchanged for a window of steps"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.last_counters = None
+        self.last_change = 0
+
+    @staticmethod
+    def _counters(sim):
+        counts = sim.grid.type_counts
+        return (
+            counts[EntityType.HUNTER],
+            counts[EntityType.KNIGHT],
+            counts[EntityType.TREASURE],
+            sim.collected_treasures(),
+        )
+
+    def reset(self, sim):
+        self.last_counters = self._counters(sim)
+        self.last_change = sim.steps
+
+    def check(self, sim) -> Optional[str]:
+        counters = self._counters(sim)
+        if counters != self.last_counters:
+            self.last_counters = counters
+            self.last_change = sim.steps
+        elif sim.steps - self.last_change >= self.window:
+            return f"stats unchanged for {self.window} steps"
+        return None
+
+    def steps_until_due(self, sim) -> Optional[int]:
+        return max(1, self.window - (sim.steps - self.last_change))